@@ -5,30 +5,63 @@ import threading
 import time
 import signal
 import sys
-import psutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import startup  # 起動時間の基準になるので重いモジュールより先に読み込む
 from websocket import WebSocketApp
-import requests
-from pynput import keyboard
-from PIL import Image
-import pystray
-import winreg
 from urllib.parse import urlparse, urlunparse
 from translation_logger import TranslationLogger
-from tray_controller import TrayController
+from ws_capture import CaptureWriter
+
+# winreg / pynput / pystray は platform_backends の選ばれたバックエンドの中で、
+# requests / psutil / websockets は使う処理の中で初めて読み込む（ヘッドレスや Linux では読み込まない）
+import platform_backends
+from xso_sender import XsoSender
+from subtitle_forwarder import SubtitleForwarder
+from profile_switcher import ProfileSwitchController
+from scheduling import AdaptivePoller, IntervalJob
+from reconnect import LinkHealth, ReconnectPolicy
+from yukacone_sequencer import Command, CommandSequencer
+import config_reload
+from config_reload import ConfigError, ConfigWatcher, ProfileTable
+import metrics
+import profiling
 
 # グローバル変数の定義
 is_running = True
 current_translation_index = 0
 is_muted = True
-translation_profiles_lock = threading.Lock()
+translation_profiles_lock = threading.Lock()  # profile_table の差し替えと current_translation_index の変更（短時間だけ持つ）
+translation_apply_lock = threading.Lock()  # ゆかコネへのプロファイル反映（API 呼び出し中も持つ）を直列化
 APP_NAME = "YncneoXSOBridge"  # デフォルトのアプリ名
-reconnect_attempts = 0  # データ用WebSocketの再接続試行回数
-reconnect_lock = threading.Lock()  # 再接続試行回数を保護するロック
+# WebSocket の再接続間隔（main で config.json の値に置き換える）
+xso_reconnect_policy = ReconnectPolicy("XSOverlay")
+data_ws_reconnect_policy = ReconnectPolicy("Yukacone WebSocket")
+xso_health = LinkHealth("XSOverlay")  # ping/pong・切断・送信失敗の記録（main で on_dead を設定）
 xso_ws = None  # XSOverlayのWebSocketオブジェクトを格納するグローバル変数
+xso_sender = None  # XSOverlay 送信キュー（XsoSender）
+profile_table = None  # 検証・事前計算済みの翻訳プロファイルと XSOverlay フレーム（ProfileTable、再読み込みで丸ごと差し替え）
 data_ws = None  # Yukacone翻訳ログ用WebSocket
 translation_logger = None
+subtitle_forwarder = None  # 訳文を XSOverlay 通知へ流す（xso_notification が true のプロファイルのみ）
+data_ws_capture = None  # DATA_WS_CAPTURE 有効時の CaptureWriter
+yukacone_client = None  # ゆかコネHTTP API 用の共有クライアント（keep-alive 接続プール）
+yukacone_client_lock = threading.Lock()
+yukacone_sequencer = None  # API コマンドを順に実行し、反映を確認してから次へ進む（固定 sleep の代わり）
 last_mute_status_ok = True
+mute_state_lock = threading.Lock()  # is_muted の楽観的更新と確認結果の反映を直列化
+mute_generation = 0  # ミュート操作ごとに増やす。古い操作の確認結果で上書きしないため
+pending_mute_generation = None  # ゆかコネへの反映（apply_mute）待ちの操作。その間は mute-status 同期で補正しない
+background_executor = None  # thread モードで API 呼び出しをキー入力から切り離すワーカー（1本）
+profile_switcher = None  # Next / Previous の連打をまとめて最後のプロファイルだけ反映する
+mute_poller = None  # mute-status の適応ポーリング（AdaptivePoller）
+process_watcher = None  # TARGET_PROCESS の生存確認（PID 固定）
+metrics_server = None  # METRICS_PORT 指定時の /metrics サーバー
+config_watcher = None  # config.json の再読み込み（ConfigWatcher）
+config_restart_pending = {}  # 再起動後に反映されるキー -> 新しい値（同じ警告を再読み込みのたびに出さないため）
+xso_reconnect_job = None  # XSO_RECONNECT_INTERVAL_SEC ごとの予備の再接続（IntervalJob）
+profile_capture = None  # トレイの「Profile capture」/ PROFILE_CAPTURE_ON_START_SEC 用
+startup_timeline = startup.StartupTimeline()  # 起動段階ごとの所要時間（XSOverlay に初期表示が出たらログへ出す）
 
 # 認識言語のデフォルト値を定義する新しいグローバル変数
 DEFAULT_RECOGNITION_LANGUAGE = "ja"
@@ -36,12 +69,15 @@ last_recognition_language = DEFAULT_RECOGNITION_LANGUAGE  # 前回の認識言
 
 # タスクトレイ用
 tray_status = "Initializing..."
-tray_controller = None
+status_display = None  # STATUS_BACKEND の状態表示（トレイ / なし）
+input_backends = []  # INPUT_BACKEND の入力（pynput / 制御 API）
 XSO_PORT = None
 YUKACONE_HTTP_PORT = None
 YUKACONE_WS_PORT = None
 DEBUG_MODE = False
 
+runtime = None  # asyncio モード時の AsyncBridgeRuntime（スレッドモードでは None）
+
 _cleanup_done = False
 _cleanup_lock = threading.Lock()
 xso_io_lock = threading.Lock()
@@ -66,6 +102,34 @@ def cleanup():
     logging.info("クリーンアップ処理を開始します...")
     is_running = False
 
+    # --- プロファイル切り替えの反映待ちを止める ---
+    if profile_switcher is not None:
+        profile_switcher.stop()
+        logging.info(f"プロファイル切り替え統計: {profile_switcher.stats()}")
+
+    # --- config.json の監視を止める ---
+    if config_watcher is not None:
+        config_watcher.stop()
+        logging.info(f"config.json 再読み込み統計: {config_watcher.stats()}")
+
+    if xso_reconnect_job is not None:
+        xso_reconnect_job.stop()
+
+    # --- mute-status ポーリングを止める ---
+    if mute_poller is not None:
+        mute_poller.stop()
+        logging.info(f"mute-status ポーリング統計: {mute_poller.stats()}")
+
+    # --- 字幕転送を停止 ---
+    if subtitle_forwarder is not None:
+        subtitle_forwarder.stop()
+        logging.info(f"字幕転送統計: {subtitle_forwarder.stats()}")
+
+    # --- XSOverlay 送信キューを停止 ---
+    if xso_sender is not None:
+        xso_sender.stop()
+        logging.info(f"XSO送信統計: {xso_sender.stats()}")
+
     # --- WebSocket を明示的にクローズ ---
     # XSOverlay
     with xso_io_lock:
@@ -87,11 +151,25 @@ def cleanup():
         data_ws = None
 
     # トレイアイコン停止
-    if tray_controller is not None:
+    if status_display is not None:
         try:
-            tray_controller.stop()
+            status_display.stop()
         except Exception as e:
-            logging.error(f"TrayController 停止中にエラー: {e}")
+            logging.error(f"状態表示の停止中にエラー: {e}")
+
+    # キー入力・制御 API を止める
+    for backend in input_backends:
+        try:
+            backend.stop()
+        except Exception as e:
+            logging.error(f"入力 {backend.name} の停止中にエラー: {e}")
+
+    # キャプチャファイルを閉じる
+    if data_ws_capture is not None:
+        try:
+            data_ws_capture.close()
+        except Exception as e:
+            logging.error(f"キャプチャファイルのクローズ中にエラー: {e}")
 
     # 翻訳ログの flush とスレッド停止
     if translation_logger is not None:
@@ -100,23 +178,53 @@ def cleanup():
         except Exception as e:
             logging.error(f"TranslationLogger 停止中にエラー: {e}")
 
+    logging.info(f"XSOverlay 再接続統計: {xso_reconnect_policy.stats()}")
+    logging.info(f"XSOverlay 接続状況: {xso_health.stats()}")
+    logging.info(f"Yukacone WebSocket 再接続統計: {data_ws_reconnect_policy.stats()}")
+
+    # 裏で動いている API 呼び出しは待たない
+    if background_executor is not None:
+        background_executor.shutdown(wait=False)
+
+    if yukacone_sequencer is not None:
+        logging.info(f"Yukacone 反映待ち時間: {yukacone_sequencer.stats()}")
+
+    # ゆかコネAPI クライアントの接続プールを閉じる（レイテンシ集計もここで出力）
+    if yukacone_client is not None:
+        logging.info(f"Yukacone API レイテンシ: {yukacone_client.stats()}")
+        yukacone_client.close()
+
+    if metrics_server is not None:
+        metrics_server.stop()
+
+    # 起動が完了しないまま終了した場合も、どこまで進んだかを残す
+    startup_timeline.log_once()
+
+    stage_summary = profiling.stage_summary()
+    if stage_summary:
+        logging.info(f"処理段階ごとの所要時間: {stage_summary}")
+
+    # asyncio モードならイベントループを止める
+    if runtime is not None:
+        runtime.request_stop()
+
     logging.info("プログラムを終了します...")
     sys.exit(0)
 
 # --- 設定ファイル読み込み ---
+def config_path() -> str:
+    """config.json のパス（実行中のプログラムのディレクトリ）"""
+    # PyInstallerなどで実行ファイル化されている場合にも対応
+    if getattr(sys, 'frozen', False):
+        base_dir = os.path.dirname(sys.executable)
+    else:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_dir, "config.json")
+
 def load_config():
     """config.jsonを読み込む"""
     try:
-        # 実行中のプログラムのディレクトリパスを取得する
-        # PyInstallerなどで実行ファイル化されている場合にも対応
-        if getattr(sys, 'frozen', False):
-            base_dir = os.path.dirname(sys.executable)
-        else:
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            
-        config_path = os.path.join(base_dir, "config.json")
-        
-        with open(config_path, "r", encoding="utf-8") as f:
+        with open(config_path(), "r", encoding="utf-8") as f:
             return json.load(f)
     except FileNotFoundError:
         print("[ERROR] config.jsonが見つかりません。")
@@ -139,74 +247,6 @@ def extract_port_from_url(url: str):
         logging.error(f"URLからポート抽出に失敗: url={url}, err={e}")
     return None
 
-# --- Yukarinette WebSocket,HTTP接続先をレジストリから読み込む ---
-def get_registry_hive_from_name(name: str):
-    n = name.upper()
-    mapping = {
-        "HKEY_CURRENT_USER": winreg.HKEY_CURRENT_USER,
-        "HKCU": winreg.HKEY_CURRENT_USER,
-        "HKEY_LOCAL_MACHINE": winreg.HKEY_LOCAL_MACHINE,
-        "HKLM": winreg.HKEY_LOCAL_MACHINE,
-    }
-    if n not in mapping:
-        raise ValueError(f"未知のレジストリハイブ名: {name}")
-    return mapping[n]
-
-def read_yncneo_port(config: dict, value_key_name: str, desc: str) -> int:
-    """
-    config.json の設定を使って YukarinetteConnectorNeo のポートを取得する。
-
-    - Hive     : config["Yncneo_Registry_Hive"]
-    - Path     : config["Yncneo_Registry_Path"]  （例: "Software\\YukarinetteConnectorNeo"）
-    - Value名  : config[value_key_name] （例: "HTTP", "WebSocket"）
-
-    実際のレジストリ構造：
-      [HKEY_CURRENT_USER\Software\YukarinetteConnectorNeo]
-      "HTTP"=dword:...
-      "WebSocket"=dword:...
-    """
-    hive_name = config.get("Yncneo_Registry_Hive")
-    base_path = config.get("Yncneo_Registry_Path")
-    value_name = config.get(value_key_name)
-
-    if not hive_name or not base_path or not value_name:
-        raise ValueError(
-            f"{desc} のレジストリ設定が config.json に不足しています "
-            f"(Hive={hive_name}, Path={base_path}, Value={value_name})"
-        )
-
-    hive = get_registry_hive_from_name(hive_name)
-
-    try:
-        with winreg.OpenKey(hive, base_path) as key:
-            # ★ 値名 value_name ("HTTP" / "WebSocket") を読む
-            value, reg_type = winreg.QueryValueEx(key, value_name)
-
-            if not isinstance(value, int):
-                # 一応、文字列になっていても int に変換を試みる
-                try:
-                    port = int(str(value))
-                except Exception:
-                    raise ValueError(f"{desc} のレジストリ値が整数ではありません: {value}")
-            else:
-                port = value
-
-            logging.info(f"{desc} ポート値取得: {port} (Key={base_path}, Value={value_name})")
-            return port
-
-    except FileNotFoundError as e:
-        # キー自体が無い場合
-        raise RuntimeError(
-            f"{desc} のレジストリキーが見つかりません: "
-            f"{hive_name}\\{base_path} / {e}"
-        )
-    except OSError as e:
-        # 値名が無い場合など
-        raise RuntimeError(
-            f"{desc} のレジストリ値 '{value_name}' の読み出しに失敗: "
-            f"{hive_name}\\{base_path} / {e}"
-        )
-
 # --- 共通: PyInstaller 対応のリソースパス ---
 def resource_path(relative_path: str) -> str:
     """PyInstaller の onefile 実行時でもリソースにアクセスできるパスを返す"""
@@ -218,7 +258,7 @@ def resource_path(relative_path: str) -> str:
 
 def update_tray_status():
     """タスクトレイのタイトル（ホバー時のステータス表示）を更新する"""
-    global tray_status, tray_controller
+    global tray_status
     global XSO_PORT, YUKACONE_HTTP_PORT, YUKACONE_WS_PORT, DEBUG_MODE
     
     status = "Unknown"
@@ -242,9 +282,9 @@ def update_tray_status():
 
     tray_status = " | ".join(parts)
 
-    # 実際のアイコンタイトル更新は TrayController に任せる
-    if tray_controller is not None:
-        tray_controller.update_tooltip(tray_status)
+    # 実際の表示（トレイのツールチップなど）は状態表示バックエンドに任せる
+    if status_display is not None:
+        status_display.update(tray_status)
 
 
 # --- ログの初期化 ---
@@ -264,7 +304,8 @@ def setup_logger(script_name, debug):
     log_file = os.path.join(log_dir, f"{script_name}_{timestamp}.log")
     
     logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG)
+    # debug=false のときはルートも INFO にして、isEnabledFor(DEBUG) で守られた整形処理を丸ごと省く
+    logger.setLevel(logging.DEBUG if debug else logging.INFO)
 
     formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
 
@@ -292,6 +333,11 @@ def get_translated_text(data, source_lang):
             
     return None
 
+# --- 現在の翻訳プロファイル情報（翻訳ログ記録用） ---
+def current_profile_info() -> dict:
+    """現在の翻訳プロファイルの名前・エンジン・言語を返す"""
+    return profile_table[current_translation_index].info()
+
 # --- ゆかコネAPI mute-status ---
 def get_mute_status(base_url: str) -> bool:
     """
@@ -309,140 +355,146 @@ def get_mute_status(base_url: str) -> bool:
         return False
     raise ValueError(f"mute-status 応答が想定外です: {text}")
 
-# --- ゆかコネNEO Mute Status checker ---
-def refresh_mute_status(config):
+# --- ゆかコネAPI mute-status 同期処理（ゆかコネ側 UI でのミュート操作を拾う） ---
+def mute_sync_once(config: dict):
     """
-    /mute-status を呼んで、取れたら is_muted を更新。
-    取れなければ is_muted は変更せず、Unknown状態にする。
+    mute-status を1回取得し、変化があれば XSOverlay / トレイへ反映する。
+    戻り値: 取得失敗 None / ずれを補正した True / 変化なし False（AdaptivePoller の check 用）
     """
     global is_muted, last_mute_status_ok
-
+    with mute_state_lock:
+        generation = mute_generation
     try:
         actual = get_mute_status(config["yukacone_endpoint"])
-        last_mute_status_ok = True
-        is_muted = actual
-        return True
     except Exception as e:
-        last_mute_status_ok = False
+        with mute_state_lock:
+            last_mute_status_ok = False
         logging.warning(f"mute-status取得失敗（状態は維持）: {e}")
-        return False
-
-# --- ゆかコネAPI mute-status 同期処理、不要かもしれない... ---
-def periodic_mute_sync(config: dict, ws):
-    global is_muted
-    interval_sec = 300  # 5分
-    
-    while is_running:
-        try:
-            time.sleep(interval_sec)
-            if not is_running:
-                break
-
-            changed_before = is_muted
-            ok = refresh_mute_status(config)
-
-            if ok and is_muted != changed_before:
-                logging.info(f"mute-status同期: {changed_before} -> {is_muted}")
-                send_xso_status(ws, config, current_translation_index, is_muted)
-            elif ok:
-                logging.debug("mute-status同期: 変化なし")
+        # Unknown をトレイに反映
+        update_tray_status()
+        return None
 
-            # ok / ng に関わらずトレイは更新（Unknown反映もここで）
-            update_tray_status()
+    with mute_state_lock:
+        last_mute_status_ok = True
+        before = is_muted
+        # 取得中にキー操作があった場合や、操作の反映待ちの間は、その操作の確認（apply_mute）に任せる
+        # （まだ反映されていない状態を読んで表示を戻してしまわないように）
+        changed = generation == mute_generation and pending_mute_generation is None and actual != before
+        if changed:
+            is_muted = actual
+    if changed:
+        logging.info(f"mute-status同期: {before} -> {actual}")
+        send_xso_status(xso_ws, config, current_translation_index, actual)
+    else:
+        logging.debug("mute-status同期: 変化なし")
+    update_tray_status()
+    return changed
+
+def init_mute_poller(config: dict, background: bool = True):
+    """mute-status の適応ポーリングを作成して開始する（最初の boost までは待機）"""
+    global mute_poller
+    mute_poller = AdaptivePoller(
+        "MutePoller",
+        lambda: mute_sync_once(config),
+        fast_sec=config.get("MUTE_POLL_FAST_SEC", 1.5),
+        fast_window_sec=config.get("MUTE_POLL_FAST_WINDOW_SEC", 20),
+        idle_sec=config.get("MUTE_POLL_IDLE_SEC", 60),
+        submit=runtime.submit if runtime is not None else None,
+    )
+    mute_poller.start(background=background)
+    return mute_poller
 
-        except Exception as e:
-            logging.warning(f"mute-status同期に失敗: {e}")
+def boost_mute_poller(reason: str):
+    """キー操作・再接続のあと、しばらく mute-status を高速に確認する"""
+    if mute_poller is not None:
+        mute_poller.boost(reason)
 
 # --- ゆかコネのAPI呼び出し ---
+def init_yukacone_client(config: dict):
+    """共有 YukaconeClient を作成する（接続プールとパス別タイムアウト）"""
+    global yukacone_client
+    from yukacone_client import YukaconeClient, parse_timeouts
+
+    with yukacone_client_lock:
+        if yukacone_client is not None:
+            if yukacone_client.base_url == config["yukacone_endpoint"].rstrip("/"):
+                # 既に作成済み（使用中のクライアントを閉じない）
+                return yukacone_client
+            yukacone_client.close()
+        yukacone_client = YukaconeClient(
+            config["yukacone_endpoint"],
+            timeouts=parse_timeouts(config.get("YUKACONE_API_TIMEOUTS")),
+        )
+    return yukacone_client
+
 def call_yukacone_api(base_url, path, params):
-    """ゆかコネAPIを呼び出す。戻り値: (成功bool, response_text or None)"""
-    try:
-        url = f"{base_url}{path}"
-        logging.info(f"{path} 実行: {params}")
-        response = requests.get(url, params=params, timeout=20)
-        response.raise_for_status()
-        text = (response.text or "").strip()
-        # "Stay" も成功としてログに出す
-        logging.info(f"{path} 成功: {text}")
-        return True, text
-    except Exception as e:
-        logging.error(f"{path} 失敗: {e}")
+    """
+    ゆかコネAPIを呼び出す。戻り値: (成功bool, response_text or None)
+    クライアントは init_yukacone_client() でだけ作る（タイムアウト設定なしのクライアントを作らない）。
+    起動直後でまだ作られていなければ、待たずに失敗として返す。
+    """
+    client = yukacone_client
+    if client is None or client.base_url != base_url.rstrip("/"):
+        logging.warning(f"ゆかコネAPI クライアントの準備前のため呼び出しをスキップします: {path}")
         return False, None
+    return client.call(path, params)
+
+def get_yukacone_sequencer(config: dict) -> CommandSequencer:
+    """共有 CommandSequencer を返す（初回に config の YUKACONE_SETTLE_* から作る）"""
+    global yukacone_sequencer
+    if yukacone_sequencer is None:
+        yukacone_sequencer = CommandSequencer.from_config(
+            lambda path, params: call_yukacone_api(config["yukacone_endpoint"], path, params),
+            config,
+        )
+    return yukacone_sequencer
 
 # --- 翻訳設定変更 ---
 def update_translation(config, index):
     """翻訳プロファイルを更新する"""
-    global current_translation_index, last_recognition_language
-    with translation_profiles_lock:
+    global last_recognition_language
+    with translation_apply_lock:
         try:
-            setting = config["translation_profiles"][index]
-            base_url = config["yukacone_endpoint"]
-            
-            new_recognition_language = setting["recognition_language"]
+            setting = profile_table[index]
+            # ゆかコネには設定値を読み出す API が無いので、設定後は API が再び応答するまでを反映待ちとする
+            # ただし API が応答しても認識の再開は終わっていないことがあるので、最低限 YUKACONE_PARAM_SETTLE_SEC は待つ
+            responsive = lambda: get_mute_status(config["yukacone_endpoint"])  # noqa: E731
+            min_wait = config.get("YUKACONE_PARAM_SETTLE_SEC", 0.5)
+            commands = []
+
+            new_recognition_language = setting.recognition_language
             logging.debug(f"認識言語 現:新={last_recognition_language}:{new_recognition_language}")
             
             # 認識言語が前回と異なる場合のみAPIを呼び出す
             if new_recognition_language != last_recognition_language:
                 logging.info(f"認識言語変更: language={new_recognition_language}")
-                call_yukacone_api(base_url, "/setRecognitionParam", {"language": new_recognition_language})
-                time.sleep(0.5)
-                last_recognition_language = new_recognition_language  # 変更を記録
+                commands.append(Command("/setRecognitionParam", {"language": new_recognition_language},
+                                        probe=responsive, min_wait_sec=min_wait))
             else:
                 logging.info(f"認識言語は変更ありません: language={new_recognition_language}")
 
-            logging.info(f"翻訳設定変更: language={setting['translation_param']['language']}, engine={setting['translation_param']['engine']}")
-            call_yukacone_api(base_url, "/setTranslationParam", {
-                "slot": setting["translation_param"]["slot"],
-                "language": setting["translation_param"]["language"],
-                "engine": setting["translation_param"]["engine"]
-            })
-            current_translation_index = index
+            params = setting.translation_params
+            logging.info(f"翻訳設定変更: language={params['language']}, engine={params['engine']}")
+            commands.append(Command("/setTranslationParam", params, probe=responsive, min_wait_sec=min_wait))
+
+            result = get_yukacone_sequencer(config).run(commands)
+            if any(s.name == "/setRecognitionParam" and s.ok for s in result.steps):
+                last_recognition_language = new_recognition_language  # 変更を記録
+            # current_translation_index は表示側（preview_profile）が先に切り替えている
         except IndexError:
             logging.error(f"翻訳プロファイルのインデックスが無効です: {index}")
         except KeyError as e:
             logging.error(f"config.jsonの設定キーが不足しています: {e}")
 
-# --- ホットキー ---
-def to_pynput_hotkey(hotkey: str) -> str:
-    # "alt+ctrl+v" -> "<alt>+<ctrl>+v"
-    parts = [p.strip().lower() for p in hotkey.split("+") if p.strip()]
-    mapped = []
-    for p in parts:
-        if p in ("ctrl", "control"):
-            mapped.append("<ctrl>")
-        elif p == "alt":
-            mapped.append("<alt>")
-        elif p == "shift":
-            mapped.append("<shift>")
-        elif p in ("win", "cmd", "super"):
-            mapped.append("<cmd>")
-        else:
-            # 最後の通常キー想定: "v" など
-            mapped.append(p)
-    return "+".join(mapped)
-
-def start_reconnect_hotkey(config: dict):
-    hotkey_cfg = (config.get("XSO_RECONNECT_HOTKEY") or "").strip()
-    if not hotkey_cfg:
-        logging.info("XSO_RECONNECT_HOTKEY 未設定のためホットキーは無効")
-        return None
-
-    pynput_hotkey = to_pynput_hotkey(hotkey_cfg)
-    logging.info(f"XSO再接続ホットキー: {hotkey_cfg} -> {pynput_hotkey}")
-
-    def on_hotkey():
-        # 他操作（Mute/翻訳切替/タイマー）と競合しないように同じ関数へ
-        reconnect_xso(config, reason=f"hotkey:{hotkey_cfg}")
-
-    gh = keyboard.GlobalHotKeys({pynput_hotkey: on_hotkey})
-    t = threading.Thread(target=gh.run, daemon=True)
-    t.start()
-    return gh  # 停止したいなら保持
-
 # --- XSOverlay Websocket再接続 ---
 def reconnect_xso(config: dict, reason: str):
     global xso_ws
 
+    # asyncio モードでは接続の張り直しはランタイムの XSO タスクが行う
+    if runtime is not None:
+        runtime.request_xso_reconnect(reason)
+        return True
+
     # 既に再接続中なら、ホットキー連打やタイマー競合を抑止
     got = xso_reconnect_lock.acquire(blocking=False)
     if not got:
@@ -454,15 +506,15 @@ def reconnect_xso(config: dict, reason: str):
         with xso_io_lock:
             logging.info(f"XSO再接続開始: {reason}")
 
-            # 切断
+            # 切断（先に xso_ws から外し、run_xso_forever に意図した切断だと分かるようにする）
             if xso_ws is not None:
+                old_ws = xso_ws
+                xso_ws = None
                 try:
-                    xso_ws.close()
+                    old_ws.close()
                     logging.info("XSO切断しました")
                 except Exception as e:
                     logging.warning(f"XSO切断に失敗: {e}")
-                finally:
-                    xso_ws = None
 
             # 再接続（あなたの既存関数を使う）
             ws = connect_to_xsoverlay(config)  # ※あなたの接続関数名に合わせて
@@ -478,153 +530,388 @@ def reconnect_xso(config: dict, reason: str):
     finally:
         xso_reconnect_lock.release()
 
+# --- XSOverlay 送信キュー ---
+def connected_xso_ws():
+    """送信可能な XSOverlay 接続を返す（WebSocketApp は接続完了まで None 扱い）"""
+    ws = xso_ws
+    if ws is None:
+        return None
+    if hasattr(ws, "sock"):
+        sock = ws.sock
+        if sock is None or not sock.connected:
+            return None
+    elif not getattr(ws, "connected", True):
+        # asyncio モードの XsoLoopSink
+        return None
+    return ws
+
+def compile_profile_table(config: dict) -> ProfileTable:
+    """
+    translation_profiles を検証し、API パラメータとプロファイル×ミュート状態ごとの XSOverlay フレームを
+    事前に作って差し替える（起動時・設定再読み込み時）。不正なら ConfigError で、現在のテーブルは変えない
+    """
+    global profile_table
+    table = ProfileTable.from_config(config, APP_NAME)
+    profile_table = table  # 参照の差し替えだけなので読む側はロック不要
+    logging.debug(f"翻訳プロファイルを事前生成しました: {len(table)} 件（XSOフレーム {len(table.frames)} 件）")
+    return table
+
+def init_xso_sender(config: dict, background: bool = True):
+    """XSOverlay 送信キューを作成して開始する"""
+    global xso_sender
+    if profile_table is None:
+        compile_profile_table(config)
+    xso_sender = XsoSender(
+        connected_xso_ws,
+        notification_max=config.get("XSO_NOTIFICATION_QUEUE_MAX", 32),
+        # asyncio モードの送信先はループへ積むだけで失敗しないので、実際の送信結果はランタイムが記録する
+        health=xso_health if runtime is None else None,
+    )
+    xso_sender.start(background=background)
+    return xso_sender
+
 # --- XSOverlay表示更新 ---
 def send_xso_status(ws, config, index, is_muted):
-    """XSOverlayのメディア情報表示を更新する"""
-    global xso_ws
-    with xso_io_lock:
-        ws = xso_ws
-        if ws is None:
-            logging.warning("XSO未接続のため send_xso_status をスキップします")
-            return
-        try:
-            profile = config["translation_profiles"][index]
-            data = {
-                "sender": APP_NAME,
-                "target": "xsoverlay",
-                "command": "UpdateMediaPlayerInformation",
-                "jsonData": json.dumps({
-                    "artist": f'{profile["name"]} ({profile["translation_param"]["engine"]})',
-                    "title": f"{'Mute' if is_muted else 'Online'}",
-                    "album": APP_NAME,
-                    "sourceApp": "ゆかコネ"
-                })
-            }
-            ws.send(json.dumps(data))
-        except Exception as e:
-            logging.error(f"XSOverlayへの表示送信失敗: {e}")
-        
+    """XSOverlayのメディア情報表示の更新を送信キューへ積む（未送信の古い表示は置き換える）"""
+    try:
+        xso_sender.submit_status(profile_table.frames.status(index, is_muted))
+    except Exception as e:
+        logging.error(f"XSOverlayへの表示送信失敗: {e}")
+
 def send_xso_notification(ws, config, content):
-    """XSOverlayに通知を送信する"""
-    global xso_ws
-    ws = xso_ws
-    if ws is None:
-        logging.warning(f"XSO未接続のため send_xso_notification をスキップします")
+    """XSOverlayへの通知を送信キューへ積む"""
+    try:
+        xso_sender.submit_notification(profile_table.frames.notification(content))
+    except Exception as e:
+        logging.error(f"XSOverlayへの通知送信失敗: {e}")
+
+# --- メディアキー操作 ---
+def submit_background(func, *args):
+    """ブロッキング処理を裏で実行する（asyncio モードはランタイムのワーカー、thread モードは専用の1本）"""
+    global background_executor
+    if runtime is not None:
+        runtime.submit(func, *args)
         return
-    with xso_io_lock:
-        try:
-            notification_payload = {
-                "sender": APP_NAME,
-                "target": "xsoverlay",
-                "command": "SendNotification",
-                "jsonData": json.dumps({
-                    "type": 1,
-                    "title": "ゆかコネ翻訳",
-                    "opacity": 0.5,
-                    "volume": 0,
-                    "content": content
-                })
-            }
-            ws.send(json.dumps(notification_payload))
-        except Exception as e:
-            logging.error(f"XSOverlayへの通知送信失敗: {e}")
+    if background_executor is None:
+        background_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bridge-bg")
+    background_executor.submit(func, *args)
 
-# --- メディアキー検出スレッド ---
-def media_key_listener(ws, config):
-    """メディアキーの入力を監視するスレッド"""
-    global current_translation_index, is_muted
-    
-    def on_press(key):
-        global current_translation_index, is_muted
+def toggle_mute(config):
+    """
+    ミュートを楽観的に切り替える。
+    XSOverlay とトレイは要求した状態へ即座に切り替え、API 呼び出しと確認は裏で行う。
+    """
+    global is_muted, mute_generation, pending_mute_generation
+    with mute_state_lock:
+        target_muted = not is_muted
+        is_muted = target_muted
+        mute_generation += 1
+        generation = mute_generation
+        pending_mute_generation = generation
+    send_xso_status(xso_ws, config, current_translation_index, target_muted)
+    update_tray_status()
+    submit_background(apply_mute, config, target_muted, generation)
+    boost_mute_poller("toggle_mute")
+
+def apply_mute(config, target_muted: bool, generation: int):
+    """
+    /mute-on|off を呼び、/mute-status に反映されるまで短い間隔で確認する。
+    食い違ったまま反映待ちの期限が来たときだけ表示を実際の状態へ戻す。
+    """
+    global pending_mute_generation
+    try:
+        _apply_mute(config, target_muted, generation)
+    finally:
+        with mute_state_lock:
+            if pending_mute_generation == generation:
+                pending_mute_generation = None
+
+def _apply_mute(config, target_muted: bool, generation: int):
+    global is_muted, last_mute_status_ok
+    path = "/mute-on" if target_muted else "/mute-off"
+    result = get_yukacone_sequencer(config).run(
+        [Command(path, probe=lambda: get_mute_status(config["yukacone_endpoint"]), expect=target_muted)],
+        # 後から別の操作が入った → そちらの確認に任せる
+        cancelled=lambda: mute_generation != generation,
+    )
+    if result.cancelled:
+        return
+    step = result.last
+    logging.info(f"{path} result: ok={step.ok}, settled={step.settled}, {result.elapsed_ms:.0f}ms")
+
+    if step.observed is not None:
+        actual = step.observed
+    else:
+        # 呼び出し失敗や確認が1度も取れなかった場合は、もう1回だけ実際の状態を読む
         try:
-            if key == keyboard.Key.media_play_pause:
-                target_muted = not is_muted
-                if target_muted:
-                    ok, text = call_yukacone_api(config["yukacone_endpoint"], "/mute-on", {})
-                    logging.info(f"/mute-on result: ok={ok}, body={text}")
-                else:
-                    ok, text = call_yukacone_api(config["yukacone_endpoint"], "/mute-off", {})
-                    logging.info(f"/mute-off result: ok={ok}, body={text}")
-                time.sleep(0.3)
-                actual = get_mute_status(config["yukacone_endpoint"])
-                if actual != is_muted:
-                   logging.info(f"mute-status confirms: {is_muted} -> {actual}")
-                is_muted = actual
-
-                refresh_mute_status(config)
-                send_xso_status(ws, config, current_translation_index, is_muted)
-                update_tray_status()
-            elif key == keyboard.Key.media_next:
-                with translation_profiles_lock:
-                    current_translation_index = (current_translation_index + 1) % len(config["translation_profiles"])
-                update_translation(config, current_translation_index)
-                time.sleep(0.5)
-                ok, text = call_yukacone_api(config["yukacone_endpoint"], "/mute-off", {})
-                logging.info(f"/mute-off result: ok={ok}, body={text}")
-                time.sleep(0.3)
-                actual = get_mute_status(config["yukacone_endpoint"])
-                if actual != is_muted:
-                    logging.info(f"mute-status confirms: {is_muted} -> {actual}")
-                    is_muted = actual
-
-                refresh_mute_status(config)
-                send_xso_status(ws, config, current_translation_index, is_muted)
-                update_tray_status()
-            elif key == keyboard.Key.media_previous:
-                with translation_profiles_lock:
-                    current_translation_index = (current_translation_index - 1) % len(config["translation_profiles"])
-                update_translation(config, current_translation_index)
-                time.sleep(0.5)
-                ok, text = call_yukacone_api(config["yukacone_endpoint"], "/mute-off", {})
-                logging.info(f"/mute-off result: ok={ok}, body={text}")
-                time.sleep(0.3)
-                actual = get_mute_status(config["yukacone_endpoint"])
-                if actual != is_muted:
-                    logging.info(f"mute-status confirms: {is_muted} -> {actual}")
-                    is_muted = actual
-                send_xso_status(ws, config, current_translation_index, is_muted)
-                update_tray_status()
+            actual = get_mute_status(config["yukacone_endpoint"])
         except Exception as e:
-            logging.error(f"キーイベント処理中エラー: {e}")
+            with mute_state_lock:
+                last_mute_status_ok = False
+            logging.warning(f"mute-status取得失敗（状態は維持）: {e}")
+            update_tray_status()
+            return
+
+    with mute_state_lock:
+        last_mute_status_ok = True
+        if generation != mute_generation:
+            # 後から別の操作が入った → そちらの確認に任せる
+            return
+        corrected = actual != is_muted
+        if corrected:
+            logging.info(f"mute-status mismatch: requested={target_muted}, actual={actual}")
+            is_muted = actual
+    if corrected:
+        send_xso_status(xso_ws, config, current_translation_index, actual)
+    update_tray_status()
 
-    with keyboard.Listener(on_press=on_press) as listener:
-        listener.join()
+def preview_profile(config, index: int):
+    """
+    プロファイル切り替えを表示にだけ先に反映する。
+    ゆかコネへの反映（apply_profile）で mute-off するので、表示も Online にしておく。
+    戻り値: この切り替えのミュート操作の世代（apply_profile に渡す）。プロファイルが無ければ None
+    """
+    global current_translation_index, is_muted, mute_generation, pending_mute_generation
+    with translation_profiles_lock:
+        if index >= len(profile_table):
+            # 切り替え中に config.json の再読み込みでプロファイルが減った
+            return None
+        current_translation_index = index
+    with mute_state_lock:
+        is_muted = False
+        mute_generation += 1
+        generation = mute_generation
+        # apply_profile の mute-off が終わるまで mute-status 同期で戻さない
+        pending_mute_generation = generation
+    send_xso_status(xso_ws, config, index, False)
+    update_tray_status()
+    boost_mute_poller("profile_switch")
+    return generation
+
+def apply_profile(config, index: int, generation):
+    """
+    プロファイルをゆかコネへ反映し、mute-off して状態を確認する（ブロッキング）。
+    generation は表示を切り替えた時点（preview_profile）のミュート操作の世代。
+    その後にミュート操作があった場合は、その操作の結果を優先して mute-off しない
+    """
+    update_translation(config, index)
+    with mute_state_lock:
+        if generation is None:
+            generation = mute_generation
+        superseded = generation != mute_generation
+    if superseded:
+        logging.info("プロファイル切り替え後にミュート操作があったため mute-off しません")
+        return
+    apply_mute(config, False, generation)
+
+def init_profile_switcher(config: dict, background: bool = True):
+    """プロファイル切り替えコントローラを作成して開始する"""
+    global profile_switcher
+    profile_switcher = ProfileSwitchController(
+        profile_count=lambda: len(profile_table),
+        current_index=lambda: current_translation_index,
+        preview=lambda index: preview_profile(config, index),
+        apply=lambda index, generation: apply_profile(config, index, generation),
+        # asyncio モードではループを塞がないようワーカーで反映する
+        submit=runtime.submit if runtime is not None else None,
+        debounce_sec=config.get("PROFILE_SWITCH_DEBOUNCE_SEC", 0.35),
+    )
+    profile_switcher.start(background=background)
+    return profile_switcher
+
+def handle_media_action(config, action: str):
+    """
+    メディアキー操作を処理する。
+    action: "toggle_mute"（Play/Pause） / "next" / "previous"
+    """
+    try:
+        with profiling.span("key." + action):
+            if action == "toggle_mute":
+                toggle_mute(config)
+            elif action == "next":
+                profile_switcher.step(+1)
+            elif action == "previous":
+                profile_switcher.step(-1)
+    except Exception as e:
+        logging.error(f"キーイベント処理中エラー: {e}")
+
+def dispatch_media_action(config, action: str):
+    """キーフック（または合成キー入力）からメディアキー操作を受け付ける"""
+    if runtime is not None:
+        # asyncio モード: フックスレッドを塞がずループへ渡す。
+        # ワーカー（1本）はプロファイル反映などの API 呼び出しで埋まることがあるので使わない
+        # （toggle_mute / step は表示を切り替えて API 呼び出しをワーカーへ積むだけで、ブロックしない）
+        runtime.call_soon(handle_media_action, config, action)
+    else:
+        handle_media_action(config, action)
+
+def on_xso_open(ws):
+    logging.info("XSOverlayに接続しました")
+    xso_reconnect_policy.connected()
+    xso_health.opened()
+    startup_mark("xso_connected")
+    # 接続待ちの間に積まれた表示更新を送る
+    if xso_sender is not None:
+        xso_sender.wake()
+
+def on_xso_error(ws, err):
+    logging.error(f"XSOverlayエラー: {err}")
+    xso_health.error(err)
+
+def on_xso_close(ws, code, msg):
+    logging.warning(f"XSOverlay切断 (code={code}, msg={msg})")
+    xso_health.closed()
 
 # --- XSOverlay WebSocket接続 ---
 def connect_to_xsoverlay(config):
-    """XSOverlayに接続する"""
-    ws = None
+    """
+    XSOverlayに接続する（切断されたら xso_reconnect_policy の間隔で自動的に繋ぎ直す）。
+    XSO_PING_INTERVAL_SEC ごとに ping を送り、XSO_PING_TIMEOUT_SEC 以内に pong が無ければ切断扱いにする。
+    作成した WebSocketApp はスレッド開始前に xso_ws へ入れる（run_xso_forever が自分の接続か判定するため）。
+    """
+    global xso_ws
+    base = (config["xso_endpoint"] or "").rstrip("/")
+    websocket_url = f"{base}/?client={APP_NAME}"
+    ws = WebSocketApp(
+        websocket_url,
+        on_open=on_xso_open,
+        on_error=on_xso_error,
+        on_close=on_xso_close,
+        on_pong=lambda ws, data: xso_health.pong(),
+    )
+    ping_interval, ping_timeout = xso_ping_settings(config)
+    xso_ws = ws
+    thread = threading.Thread(target=run_xso_forever, args=(ws, ping_interval, ping_timeout), name="xso-ws")
+    thread.daemon = True
+    thread.start()
+    return ws
+
+def xso_ping_settings(config: dict):
+    """(ping 間隔, pong 待ち秒) を返す。間隔 0 なら ping しない"""
+    interval = float(config.get("XSO_PING_INTERVAL_SEC", 20))
+    timeout = float(config.get("XSO_PING_TIMEOUT_SEC", 10))
+    if interval <= 0:
+        return 0, None
+    # websocket-client は ping 間隔 > pong 待ち を要求する
+    return interval, min(timeout, interval * 0.9)
+
+def run_xso_forever(ws, ping_interval=0, ping_timeout=None):
+    """XSOverlay 接続を維持する。reconnect_xso / cleanup で xso_ws が差し替えられたら終わる"""
     while is_running:
         try:
-            base = (config["xso_endpoint"] or "").rstrip("/")
-            websocket_url = f"{base}/?client={APP_NAME}"
-            ws = WebSocketApp(
-                websocket_url,
-                on_open=lambda ws: logging.info("XSOverlayに接続しました"),
-                on_error=lambda ws, err: logging.error(f"XSOverlayエラー: {err}"),
-                on_close=lambda ws, code, msg: logging.warning("XSOverlay切断"),
-            )
-            thread = threading.Thread(target=ws.run_forever)
-            thread.daemon = True
-            thread.start()
-            return ws
-        except Exception as e:
-            logging.error(f"XSOverlayに接続できませんでした、5秒後に再接続します: {e}")
-            time.sleep(3)
-    return None
+            ws.run_forever(ping_interval=ping_interval, ping_timeout=ping_timeout)
+        except Exception:
+            logging.exception("XSOverlay run_forever crashed")
+        if not is_running or xso_ws is not ws:
+            return
+        xso_reconnect_policy.disconnected()
+        delay = xso_reconnect_policy.next_delay()
+        logging.warning(f"XSOverlayに接続できません、{delay:.1f}秒後に再接続します")
+        time.sleep(delay)
+        if xso_ws is not ws:
+            return
 
 # --- XSOverlayに対して定期的にWebsocketを切断、接続を行う処理 ---
-def periodic_xso_reconnect(config: dict):
-    interval = int(config.get("XSO_RECONNECT_INTERVAL_SEC", 300))
-    if interval <= 0:
-        logging.info("XSO定期再接続は無効 (interval<=0)")
+# 通常は ping/pong と送信失敗で切断を検出するので不要。XSO_RECONNECT_INTERVAL_SEC > 0 のときだけ動く予備
+def init_xso_reconnect_job(config: dict, background: bool = True):
+    """間隔は毎回 config から読むので、config.json の再読み込みで変えられる"""
+    global xso_reconnect_job
+    interval = lambda: config.get("XSO_RECONNECT_INTERVAL_SEC") or 0  # noqa: E731
+    xso_reconnect_job = IntervalJob(
+        "xso-reconnect",
+        interval,
+        lambda: reconnect_xso(config, reason=f"timer:{interval()}s"),
+    )
+    xso_reconnect_job.start(background=background)
+    return xso_reconnect_job
+
+# --- config.json の再読み込み ---
+def apply_config_reload(config: dict, new_config: dict):
+    """
+    ConfigWatcher から呼ばれる。RELOADABLE_KEYS だけを接続を張り直さずに反映する。
+    不正な設定なら ConfigError を投げ、何も変えない（直前の正しい設定のまま動く）
+    """
+    global current_translation_index, profile_table, config_restart_pending
+    # 先に全体を検証・事前計算する（ここで失敗すれば何も変わらない）
+    table = ProfileTable.from_config(new_config, APP_NAME)
+    reloadable, restart_needed = config_reload.changed_keys(config, new_config)
+    # 再起動待ちのキーは、前回の警告から値が変わったものだけ知らせる
+    pending = {key: new_config.get(key) for key in restart_needed}
+    newly = [key for key in restart_needed
+             if key not in config_restart_pending or config_restart_pending[key] != pending[key]]
+    config_restart_pending = pending
+    if newly:
+        logging.warning(f"config.json: 次の変更は再起動後に反映されます: {', '.join(newly)}")
+    if not reloadable:
+        logging.info("config.json: 再起動なしで反映する設定の変更はありません")
         return
 
-    while is_running:
-        time.sleep(interval)
-        if not is_running:
-            break
-        reconnect_xso(config, reason=f"timer:{interval}s")
+    for key in reloadable:
+        if key in new_config:
+            config[key] = new_config[key]
+        else:
+            config.pop(key, None)
+
+    if "translation_profiles" in reloadable:
+        with translation_profiles_lock:
+            old_table = profile_table
+            # 反映待ちの切り替え先が無くなった場合は取り消す（範囲外の index で apply_profile しない）
+            discarded = profile_switcher is not None and profile_switcher.discard_beyond(len(table))
+            index = current_translation_index
+            moved = index >= len(table)
+            if moved:
+                logging.warning(f"現在の翻訳プロファイル {index} が無くなったため 0 番へ切り替えます")
+                index = 0
+                current_translation_index = 0
+            profile_table = table  # 参照の差し替え1回（読む側は古い表か新しい表のどちらかを丸ごと見る）
+        send_xso_status(xso_ws, config, index, is_muted)
+        if discarded:
+            # 取り消した切り替えの表示（Online）に合わせて、現在のプロファイルで mute-off まで行う
+            with mute_state_lock:
+                generation = mute_generation
+            submit_background(apply_profile, config, index, generation)
+        elif moved or old_table[index].api_key() != table[index].api_key():
+            # ゆかコネへの反映は、現在のプロファイルの設定値が変わったときだけ
+            submit_background(update_translation, config, index)
+
+    if "XSO_RECONNECT_HOTKEY" in reloadable:
+        for backend in input_backends:
+            if hasattr(backend, "set_hotkey"):
+                backend.set_hotkey(config.get("XSO_RECONNECT_HOTKEY"))
+
+    if "XSO_RECONNECT_INTERVAL_SEC" in reloadable and xso_reconnect_job is not None:
+        xso_reconnect_job.reschedule()
+
+    logging.info(f"config.json を再読み込みしました: {', '.join(reloadable)}")
+
+def init_config_watcher(config: dict, background: bool = True):
+    """CONFIG_RELOAD が有効なら config.json の監視を開始する"""
+    global config_watcher
+    if not config.get("CONFIG_RELOAD", True):
+        logging.info("config.json の再読み込みは無効 (CONFIG_RELOAD=false)")
+        return None
+    config_watcher = ConfigWatcher(
+        config_path(),
+        lambda new_config: apply_config_reload(config, new_config),
+        interval_sec=config.get("CONFIG_RELOAD_INTERVAL_SEC", 1.0),
+    )
+    config_watcher.start(background=background)
+    return config_watcher
+
+# --- データ用 WebSocket 受信処理 ---
+def handle_data_ws_message(message):
+    """Yukacone 翻訳ログ WebSocket の1フレームを TranslationLogger へ渡す"""
+    try:
+        with profiling.span("ws.on_message"):
+            # 記録モード: 生フレームをそのままキャプチャファイルへ
+            if data_ws_capture is not None:
+                data_ws_capture.write(message)
+
+            if translation_logger:
+                translation_logger.add_raw_frame(message)
+
+    except Exception:
+        logging.exception("on_message failed")
 
 # --- データ用 WebSocket接続 ---
 def connect_to_data_ws(config, xso_ws):
@@ -634,29 +921,11 @@ def connect_to_data_ws(config, xso_ws):
 
     def on_open(ws):
         logging.info("Yukacone WebSocket connected")
+        data_ws_reconnect_policy.connected()
+        boost_mute_poller("data_ws_connected")
 
     def on_message(ws, message):
-        try:
-            if isinstance(message, (bytes, bytearray)):
-                msg_text = message.decode("utf-8", errors="replace")
-            else:
-                msg_text = str(message)
-
-            logging.info("TranslationLog WS received (len=%d)", len(msg_text))
-            logging.debug("WS raw head: %r", msg_text[:300])
-
-            data = json.loads(msg_text)
-
-            if isinstance(data, list):
-                for item in data:
-                    if translation_logger:
-                        translation_logger.add_yukacone_message(item)
-            else:
-                if translation_logger:
-                    translation_logger.add_yukacone_message(data)
-
-        except Exception:
-            logging.exception("on_message failed")
+        handle_data_ws_message(message)
 
     def on_close(ws, code, msg):
         logging.warning("Yukacone WebSocket closed (code=%s, msg=%s)", code, msg)
@@ -678,83 +947,351 @@ def connect_to_data_ws(config, xso_ws):
         except Exception:
             logging.exception("connect_to_data_ws crashed")
 
+        data_ws_reconnect_policy.disconnected()
         if not is_running:
             break
-        time.sleep(3)
+        delay = data_ws_reconnect_policy.next_delay()
+        logging.info("Yukacone WebSocket: %.1f 秒後に再接続します", delay)
+        time.sleep(delay)
 
 # --- 初期化処理 ---
 def initialize(config, ws):
-    """プログラムの初期化処理を行う"""
+    """
+    プログラムの初期化処理を行う。
+    翻訳プロファイルの反映と mute-status の取得は互いに依存しないので同時に行い、
+    mute-status が取れた時点で XSOverlay に表示する（反映後にミュート状態が変わった場合は
+    startup の高速ポーリングで拾う）。ゆかコネの起動直後で応答が無い間は STARTUP_READY_TIMEOUT_SEC まで取り直す。
+    """
     global is_muted
-    global last_recognition_language
     logging.info("初期化処理を開始します。")
 
     # 認識言語の初期設定をupdate_translationに任せる
     # 翻訳プロファイルの設定
-    update_translation(config, current_translation_index)
-    
-    time.sleep(3.0)
+    def apply_initial_profile():
+        with startup_timeline.phase("initial_profile"):
+            update_translation(config, current_translation_index)
+
+    profile_thread = threading.Thread(target=apply_initial_profile, name="startup-profile", daemon=True)
+    profile_thread.start()
+
     # mute-status取得、XSOverlayに反映
-    is_muted = get_mute_status(config["yukacone_endpoint"])
-    send_xso_status(ws, config, current_translation_index, is_muted)
+    with startup_timeline.phase("mute_status"):
+        muted = startup.wait_until(
+            lambda: get_mute_status(config["yukacone_endpoint"]),
+            timeout_sec=config.get("STARTUP_READY_TIMEOUT_SEC", 3.0),
+            interval_sec=config.get("STARTUP_READY_POLL_SEC", 0.1),
+        )
+    with mute_state_lock:
+        is_muted = muted
+    send_xso_status(ws, config, current_translation_index, muted)
+    startup_mark("initial_status")
     update_tray_status()
+
+    profile_thread.join()
+    boost_mute_poller("startup")
     logging.info("初期化処理が完了しました。")
 
-def is_process_running(process_name: str) -> bool:
-    """psutil で指定プロセス名が存在するか判定"""
-    if not process_name:
-        return True  # 空なら監視しない扱い
-    try:
-        target = process_name.lower()
-        for p in psutil.process_iter(["name"]):
-            name = p.info.get("name")
-            if name and name.lower() == target:
-                return True
-    except Exception as e:
-        logging.warning(f"プロセス監視中に例外: {e}")
-    return False
+def startup_mark(name: str):
+    """
+    起動の到達点を記録する。XSOverlay 接続と初期表示の両方が済んだら overlay_ready とし、
+    起動処理（bringup_done）も終わっていれば起動時間をログへ出す。
+    """
+    t = startup_timeline
+    t.mark(name)
+    if t.elapsed("xso_connected") is not None and t.elapsed("initial_status") is not None:
+        t.mark("overlay_ready")
+    if t.elapsed("overlay_ready") is not None and t.elapsed("bringup_done") is not None:
+        t.log_once()
+
+def get_process_watcher(config: dict):
+    """TARGET_PROCESS の ProcessWatcher を返す（未設定なら None）"""
+    global process_watcher
+    target = (config.get("TARGET_PROCESS") or "").strip()
+    if not target:
+        return None
+    if process_watcher is None or process_watcher.process_name != target:
+        from process_watcher import ProcessWatcher
+        process_watcher = ProcessWatcher(target)
+    return process_watcher
 
 # --- ゆかコネNEOプロセス監視 ---
 def process_monitor_thread(config: dict, interval_sec: int = 10):
     """
-    config['TARGET_PROCESS'] を interval_sec 秒おきに監視し、
-    見つからなければログを出して終了する。
+    config['TARGET_PROCESS'] の終了を待ち、同名のプロセスも無くなったらログを出して終了する。
+    プロセスは PID で固定して終了を待つので、interval_sec は is_running を見直す間隔にだけ使う。
     """
     global is_running
-    target = (config.get("TARGET_PROCESS") or "").strip()
+    watcher = get_process_watcher(config)
 
     # 監視対象が未設定なら監視しない（要件に合わせてここは厳格にしてもOK）
-    if not target:
+    if watcher is None:
         logging.info("TARGET_PROCESS 未設定のためプロセス監視は行いません")
         return
 
-    logging.info(f"プロセス監視開始: TARGET_PROCESS={target}, interval={interval_sec}s")
+    logging.info(f"プロセス監視開始: TARGET_PROCESS={watcher.process_name}")
 
     while is_running:
-        time.sleep(interval_sec)
+        alive = watcher.wait_exit(timeout=interval_sec)
         if not is_running:
             break
+        if not alive:
+            target_process_gone(watcher)
+            break
+
+def check_target_process(config: dict) -> bool:
+    """TARGET_PROCESS の存在を確認し、見つからなければ cleanup() する。存在すれば True"""
+    watcher = get_process_watcher(config)
+    if watcher is None or watcher.is_alive():
+        return True
+    target_process_gone(watcher)
+    return False
+
+def target_process_gone(watcher):
+    logging.error(f"プロセス監視による終了: {watcher.process_name} が見つかりません ({watcher.stats()})")
+    # 終了処理は既存の cleanup() に寄せる
+    cleanup()
+
+# --- メトリクス（METRICS_PORT 指定時のみ） ---
+def collect_bridge_metrics():
+    """各コンポーネントの stats() を Prometheus 形式の値にする（/metrics 取得時に呼ばれる）"""
+    fam = metrics.family
+    out = [fam("bridge_threads", "gauge", "Active Python threads", threading.active_count())]
 
-        if not is_process_running(target):
-            logging.error(f"プロセス監視による終了: {target} が見つかりません")
-            # 終了処理は既存の cleanup() に寄せる
+    if translation_logger is not None:
+        out += [
+            fam("yukacone_ws_frames_total", "counter", "Translation-log websocket frames received",
+                translation_logger.frames_received),
+            fam("yukacone_ws_bytes_total", "counter", "Translation-log websocket bytes received",
+                translation_logger.bytes_received),
+            fam("translation_inflight", "gauge", "Messages waiting to be committed",
+                translation_logger.pending_count()),
+            fam("translation_writer_queue", "gauge", "Log lines waiting to be written",
+                translation_logger.writer_queue_size()),
+        ]
+
+    if yukacone_client is not None:
+        api = yukacone_client.stats()
+        out.append(fam("yukacone_api_errors_total", "counter", "Failed Yukacone API calls",
+                       [({"path": p}, s["errors"]) for p, s in api.items()]))
+
+    if xso_sender is not None:
+        s = xso_sender.stats()
+        out += [
+            fam("xso_send_total", "counter", "XSOverlay frames by outcome",
+                [({"result": "sent"}, s["sent"]), ({"result": "skipped"}, s["skipped"]),
+                 ({"result": "failed"}, s["failed"]), ({"result": "coalesced"}, s["status_coalesced"]),
+                 ({"result": "dropped"}, s["notifications_dropped"])]),
+            fam("xso_send_queue", "gauge", "XSOverlay frames waiting to be sent", s["depth"]),
+        ]
+
+    policies = (("xso", xso_reconnect_policy), ("data", data_ws_reconnect_policy))
+    stats = [(name, p.stats()) for name, p in policies]
+    out += [
+        fam("ws_connected", "gauge", "Websocket connected (1) or not (0)",
+            [({"socket": n}, 1 if s["connected"] else 0) for n, s in stats]),
+        fam("ws_connects_total", "counter", "Successful websocket connects",
+            [({"socket": n}, s["connects"]) for n, s in stats]),
+        fam("ws_reconnect_attempts_total", "counter", "Websocket reconnect attempts",
+            [({"socket": n}, s["attempts"]) for n, s in stats]),
+        fam("ws_downtime_seconds_total", "counter", "Time spent disconnected",
+            [({"socket": n}, s["downtime_total_sec"]) for n, s in stats]),
+    ]
+    h = xso_health.stats()
+    out.append(fam("xso_pongs_total", "counter", "XSOverlay pongs received", h["pongs"]))
+
+    if mute_poller is not None:
+        s = mute_poller.stats()
+        out += [
+            fam("mute_poll_interval_seconds", "gauge", "Current mute-status poll interval", s["interval_sec"]),
+            fam("mute_poll_drift_corrections_total", "counter", "Mute state corrected by polling",
+                s["drift_corrections"]),
+        ]
+    if subtitle_forwarder is not None:
+        s = subtitle_forwarder.stats()
+        out.append(fam("subtitle_sent_total", "counter", "Subtitle notifications sent", s["sent"]))
+    return out
+
+def init_metrics(config: dict):
+    """METRICS_PORT が 1 以上なら 127.0.0.1 で /metrics を公開する"""
+    global metrics_server
+    port = int(config.get("METRICS_PORT", 0) or 0)
+    if port <= 0:
+        return None
+    registry = metrics.Registry()
+    if translation_logger is not None:
+        registry.register(translation_logger.commits)
+        registry.register(translation_logger.commit_latency)
+    if yukacone_client is not None:
+        registry.register(yukacone_client.latency)
+    registry.register(get_yukacone_sequencer(config).settle_time)
+    registry.register(profiling.STAGE_DURATION)
+    registry.add_collector(collect_bridge_metrics)
+    try:
+        metrics_server = metrics.MetricsServer(registry, port).start()
+    except OSError as e:
+        logging.error(f"メトリクス公開に失敗しました（port={port}）: {e}")
+        metrics_server = None
+    return metrics_server
+
+def init_profiling(config: dict, program_dir: str):
+    """PROFILING_SPANS で段階別の計測を有効にし、PROFILE_CAPTURE_ON_START_SEC 秒の取得を起動直後に始める"""
+    global profile_capture
+    profiling.enable_spans(bool(config.get("PROFILING_SPANS", False)))
+    profile_capture = profiling.ProfileCapture(os.path.join(program_dir, "log"))
+    on_start = float(config.get("PROFILE_CAPTURE_ON_START_SEC", 0) or 0)
+    if on_start > 0:
+        profile_capture.capture(on_start)
+
+def start_profile_capture(config: dict):
+    """トレイメニューから PROFILE_CAPTURE_SEC 秒のプロファイル取得を始める"""
+    if profile_capture is not None:
+        profile_capture.capture(float(config.get("PROFILE_CAPTURE_SEC", 30)))
+
+def init_yukacone_client_and_metrics(config: dict):
+    """API クライアント（requests の読み込みを含む）と /metrics を準備する"""
+    init_yukacone_client(config)
+    init_metrics(config)
+
+def start_status_display(config: dict):
+    """
+    状態表示（STATUS_BACKEND）を開始する。
+    トレイは pystray の読み込みを含むので、起動時は他の処理と並行して呼ぶ。
+    """
+    global status_display
+
+    # まず現在の状態からステータス文字列を組み立てる（この時点では status_display は None なので単に tray_status を作るだけ）
+    update_tray_status()
+
+    display = platform_backends.create_status_display(
+        config,
+        APP_NAME,
+        on_exit=cleanup,
+        extra_items=[("Profile capture", lambda: start_profile_capture(config))],
+    )
+    display.start(tray_status)
+    status_display = display
+    # 表示準備の間に変わった状態（ミュート状態など）を反映する
+    update_tray_status()
+
+def bridge_status(config: dict) -> dict:
+    """制御 API の GET /status で返す現在の状態"""
+    return {
+        "status": tray_status,
+        "muted": is_muted,
+        "mute_status_ok": last_mute_status_ok,
+        "profile": current_profile_info(),
+        "xso": xso_health.stats(),
+    }
+
+def start_inputs(config: dict):
+    """INPUT_BACKEND の入力（メディアキー・ホットキー / 制御 API）を開始する"""
+    actions = {
+        action: (lambda source, action=action: dispatch_media_action(config, action))
+        for action in ("toggle_mute", "next", "previous")
+    }
+    actions["reconnect"] = lambda source: reconnect_xso(config, reason=source)
+    actions["profile_capture"] = lambda source: start_profile_capture(config)
+    actions["exit"] = lambda source: threading.Thread(target=cleanup, name="exit", daemon=True).start()
+
+    backends = platform_backends.create_inputs(config, actions, status_provider=lambda: bridge_status(config))
+    for backend in backends:
+        try:
+            backend.start()
+        except Exception as e:
+            logging.error(f"入力 {backend.name} を開始できませんでした: {e}")
+            continue
+        input_backends.append(backend)
+    if not input_backends:
+        logging.info("入力バックエンドなし（INPUT_BACKEND=none）")
+
+# --- asyncio モード ---
+def run_asyncio_mode(config: dict):
+    """
+    WebSocket 2本・定期処理・翻訳ログの安定チェックを1つのイベントループで動かす。
+    pynput のキーフックとトレイは自前のスレッドを持つため、そこからは runtime 経由で処理を渡す。
+    """
+    global runtime, xso_ws
+    import async_runtime
+
+    def xso_opened():
+        startup_mark("xso_connected")
+        # 切断中の送信は捨てているので、現在の表示を送り直す（保持中の通知も一緒に送られる）
+        send_xso_status(xso_ws, config, current_translation_index, is_muted)
+        xso_sender.wake()
+
+    runtime = async_runtime.AsyncBridgeRuntime(
+        config,
+        APP_NAME,
+        on_data_message=handle_data_ws_message,
+        on_xso_open=xso_opened,
+        on_data_open=lambda: boost_mute_poller("data_ws_connected"),
+        xso_policy=xso_reconnect_policy,
+        data_policy=data_ws_reconnect_policy,
+        xso_health=xso_health,
+    )
+    # 既存の send_xso_* はこのアダプタ経由でループ上の XSO 接続へ送る
+    xso_ws = runtime.xso_sink
+    init_xso_sender(config, background=False)
+    runtime.add_deadline_job("xso_sender", xso_sender.poll, xso_sender.set_waker)
+    init_profile_switcher(config, background=False)
+    runtime.add_deadline_job("profile_switch", profile_switcher.poll, profile_switcher.set_waker)
+
+    def run_startup():
+        try:
+            initialize(config, xso_ws)
+        except Exception as e:
+            logging.error(f"初期化処理に失敗しました。終了します: {e}")
             cleanup()
-            break
+            return
+        startup_mark("bringup_done")
+
+    runtime.add_startup(run_startup)
+    init_mute_poller(config, background=False)
+    runtime.add_deadline_job("mute_poller", mute_poller.poll, mute_poller.set_waker)
+    # 再接続の要求はループ上で済む（張り直しは XSO タスクが行う）のでワーカーへ渡さない
+    init_xso_reconnect_job(config, background=False)
+    runtime.add_deadline_job("xso_reconnect", xso_reconnect_job.poll, xso_reconnect_job.set_waker)
+    init_config_watcher(config, background=False)
+    if config_watcher is not None:
+        runtime.add_deadline_job("config_watch", config_watcher.poll, config_watcher.set_waker)
+    # 固定したプロセスの確認は軽いので短い間隔で見る
+    runtime.add_periodic(
+        "process_monitor", config.get("PROCESS_CHECK_INTERVAL_SEC", 2),
+        lambda: check_target_process(config),
+    )
+    runtime.add_deadline_job("translation_log", translation_logger.poll, translation_logger.set_waker)
+    runtime.add_deadline_job("subtitle", subtitle_forwarder.poll, subtitle_forwarder.set_waker)
+
+    start_inputs(config)
+
+    runtime.run()
 
 # --- メイン処理 ---
 def main():
     global APP_NAME, DEBUG_MODE
     global XSO_PORT, YUKACONE_HTTP_PORT, YUKACONE_WS_PORT
-    global translation_logger
-    global xso_ws
+    global translation_logger, data_ws_capture, subtitle_forwarder
+    global xso_ws, xso_reconnect_policy, data_ws_reconnect_policy
 
-    config = load_config()
+    with startup_timeline.phase("config"):
+        config = load_config()
+        # 型の誤った任意キーは既定値で起動する（再読み込み時は拒否する）
+        invalid_keys = config_reload.drop_invalid_optional(config)
 
-    APP_NAME = config.get("app_name", "YncneoXSOBridge")
-    DEBUG_MODE = bool(config.get("debug", False))
+        APP_NAME = config.get("app_name", "YncneoXSOBridge")
+        DEBUG_MODE = bool(config.get("debug", False))
 
-    log_path = setup_logger(APP_NAME, DEBUG_MODE)
+        log_path = setup_logger(APP_NAME, DEBUG_MODE)
     logging.info(f"開始: {APP_NAME}")
+    for message in invalid_keys:
+        logging.warning(f"config.json: {message}（既定値で起動します）")
+
+    # 翻訳プロファイルの検証と事前計算（再読み込み時と同じ検証。プロファイルが不正なら終了する）
+    try:
+        compile_profile_table(config)
+    except ConfigError as e:
+        logging.error(f"config.jsonの設定が不正です: {e}")
+        sys.exit(1)
 
     # --- PROGRAM_DIR 相当（実行ファイルのあるディレクトリ） ---
     if getattr(sys, 'frozen', False):
@@ -762,6 +1299,33 @@ def main():
     else:
         program_dir = os.path.dirname(os.path.abspath(__file__))
 
+    # --- 実行モード（thread: 従来のスレッド構成 / asyncio: 単一イベントループ） ---
+    use_asyncio = str(config.get("RUNTIME_MODE", "thread")).lower() == "asyncio"
+    if use_asyncio:
+        import async_runtime
+        if not async_runtime.is_available():
+            logging.warning("websockets パッケージが無いため asyncio モードは使えません。thread モードで起動します")
+            use_asyncio = False
+    logging.info(f"実行モード: {'asyncio' if use_asyncio else 'thread'}")
+
+    init_profiling(config, program_dir)
+
+    # --- WebSocket 再接続の間隔（指数バックオフ＋ゆらぎ） ---
+    xso_reconnect_policy = ReconnectPolicy.from_config("XSOverlay", config)
+    data_ws_reconnect_policy = ReconnectPolicy.from_config("Yukacone WebSocket", config)
+    xso_health.max_send_failures = max(1, int(config.get("XSO_MAX_SEND_FAILURES", 3)))
+    xso_health.on_dead = lambda reason: reconnect_xso(config, reason=reason)
+
+    # --- 字幕（訳文の XSOverlay 通知）---
+    subtitle_forwarder = SubtitleForwarder(
+        send=lambda text: send_xso_notification(xso_ws, config, text),
+        profile_provider=lambda: profile_table[current_translation_index].source,
+        debounce_sec=config.get("XSO_SUBTITLE_DEBOUNCE_SEC", 0.4),
+        max_wait_sec=config.get("XSO_SUBTITLE_MAX_WAIT_SEC", 1.5),
+        max_fps=config.get("XSO_SUBTITLE_MAX_FPS", 1.0),
+    )
+    subtitle_forwarder.start(background=not use_asyncio)
+
     # --- TranslationLogger 初期化 ---
     stable_sec = config.get("PROCESS_STABLE_SEC", 10)
     flush_interval = config.get("FLUSH_INTERVAL_SEC", 5)
@@ -770,26 +1334,50 @@ def main():
         base_dir=program_dir,
         stable_sec=stable_sec,
         flush_interval=flush_interval,
+        max_inflight=config.get("TRANSLATION_MAX_INFLIGHT", 16),
+        fixed_grace_sec=config.get("TRANSLATION_FIXED_GRACE_SEC", 1.0),
+        writer_options={
+            "batch_size": config.get("TRANSLATION_LOG_BATCH_SIZE", 32),
+            "batch_age_sec": config.get("TRANSLATION_LOG_BATCH_AGE_SEC", 0.5),
+            "durability": config.get("TRANSLATION_LOG_DURABILITY", "flush"),
+            "queue_max": config.get("TRANSLATION_LOG_QUEUE_MAX", 1024),
+        },
+        log_format=config.get("TRANSLATION_LOG_FORMAT", "legacy"),
+        profile_provider=current_profile_info,
+        frame_log_interval=config.get("DATA_WS_LOG_INTERVAL_SEC", 10),
+        message_listener=subtitle_forwarder.offer,
     )
-    translation_logger.start()
-    logging.info(
-        f"TranslationLogger started (stable={stable_sec}s, flush={flush_interval}s, dir={os.path.join(program_dir, 'log')})"
-    )
-    
+    # asyncio モードでは確定チェックもループ上のタスクで行う
+    translation_logger.start(background=not use_asyncio)
+
+    # --- 翻訳ログ WebSocket の記録モード（ws_capture.py replay で再生できる） ---
+    if config.get("DATA_WS_CAPTURE", False):
+        ts = datetime.now().strftime("%Y-%m-%d-%H%M%S")
+        capture_path = os.path.join(program_dir, "log", f"capture-{ts}.yxcap")
+        data_ws_capture = CaptureWriter(capture_path)
+        logging.info(f"翻訳ログ WebSocket を記録します: {capture_path}")
+    startup_timeline.mark("components_ready")
+
+    # thread モードでは XSOverlay への接続をゆかコネのポート取得より先に始める（互いに依存しない）
+    if not use_asyncio:
+        init_xso_sender(config)
+        init_profile_switcher(config)
+        with startup_timeline.phase("xso_connect"):
+            xso_ws = connect_to_xsoverlay(config) # グローバル変数に格納
+        if xso_ws is None:
+            logging.error("XSOverlayへの接続に失敗しました。プログラムを終了します。")
+            cleanup()
+
     # XSOはそのまま config から抜く
     try:
         XSO_PORT = urlparse(config.get("xso_endpoint")).port
     except Exception:
         XSO_PORT = None
 
-    # ---- レジストリから Yukacone ポート読み込み ----
+    # ---- Yukacone ポート読み込み（PORT_SOURCE: レジストリ / config.json / 環境変数） ----
     try:
-        YUKACONE_HTTP_PORT = read_yncneo_port(config,
-                                              "Yncneo_Registry_Value_Http",
-                                              "Yukacone HTTP")
-        YUKACONE_WS_PORT   = read_yncneo_port(config,
-                                              "Yncneo_Registry_Value_Websocket",
-                                              "Yukacone WebSocket")
+        with startup_timeline.phase("ports"):
+            YUKACONE_HTTP_PORT, YUKACONE_WS_PORT = platform_backends.discover_ports(config)
     except Exception as e:
         logging.error(f"ポート取得失敗。終了します: {e}")
         sys.exit(1)
@@ -801,39 +1389,37 @@ def main():
     logging.info(f"Yukacone HTTP Endpoint      : {config['yukacone_endpoint']}")
     logging.info(f"Yukacone WebSocket Endpoint : {config['yukacone_translationlog_ws']}")
 
-    # --- トレイ起動 ---
-    global tray_controller, tray_status
-
-    # まず現在の状態からステータス文字列を組み立てる（この時点では tray_controller は None なので単に tray_status を作るだけ）
-    update_tray_status()
-
-    # TrayController を初期化してアイコンを表示
-    tray_controller = TrayController(
-        app_name=APP_NAME,
-        on_exit_callback=cleanup,   # Exit メニューから cleanup() を呼ぶ
-        icon_filename="icon.ico",
-    )
-    tray_controller.start(tray_status)
-
-    # --- XSOverlay への接続 ---
-    xso_ws = connect_to_xsoverlay(config) # グローバル変数に格納
-    if xso_ws is None:
-        logging.error("XSOverlayへの接続に失敗しました。プログラムを終了します。")
+    if use_asyncio:
+        # 状態表示と API クライアントの準備は互いに依存しないので同時に行う
+        startup_timeline.run_parallel({
+            "status_display": lambda: start_status_display(config),
+            "yukacone_client": lambda: init_yukacone_client_and_metrics(config),
+        })
+        run_asyncio_mode(config)
         cleanup()
-    logging.info("XSOverlayへ接続しました。")
+        return
 
     data_ws_thread = threading.Thread(target=connect_to_data_ws, args=(config, xso_ws,), daemon=True)
     data_ws_thread.start()
 
-    initialize(config, xso_ws)
-    sync_thread = threading.Thread(target=periodic_mute_sync, args=(config, xso_ws), daemon=True)
-    sync_thread.start()
+    init_mute_poller(config)
+
+    # 状態表示・ゆかコネの初期化（プロファイル反映と mute-status）・入力（キーフック / 制御 API）の開始を同時に行う
+    def initialize_yukacone():
+        init_yukacone_client_and_metrics(config)
+        initialize(config, xso_ws)
 
-    key_listener_thread = threading.Thread(target=media_key_listener, args=(xso_ws, config), daemon=True)
-    key_listener_thread.start()
+    errors = startup_timeline.run_parallel({
+        "status_display": lambda: start_status_display(config),
+        "initialize": initialize_yukacone,
+        "inputs": lambda: start_inputs(config),
+    })
+    if errors.get("initialize") is not None:
+        logging.error(f"初期化処理に失敗しました。終了します: {errors['initialize']}")
+        cleanup()
 
-    reconws_thread = threading.Thread(target=periodic_xso_reconnect, args=(config,), daemon=True)
-    reconws_thread.start()
+    init_xso_reconnect_job(config)
+    init_config_watcher(config)
 
     # --- プロセス監視スレッド ---
     proc_mon_thread = threading.Thread(
@@ -842,8 +1428,7 @@ def main():
         daemon=True,
     )
     proc_mon_thread.start()
-
-    start_reconnect_hotkey(config)
+    startup_mark("bringup_done")
 
     while is_running:
         try:
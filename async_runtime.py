@@ -0,0 +1,375 @@
+# async_runtime.py
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from reconnect import LinkHealth, ReconnectPolicy
+
+try:
+    import websockets
+except ImportError:  # asyncio モードを使わない場合は不要
+    websockets = None
+
+
+def is_available() -> bool:
+    """asyncio ランタイムに必要なライブラリ（websockets）が使えるか"""
+    return websockets is not None
+
+
+class XsoLoopSink:
+    """
+    XSOverlay 送信用のアダプタ。
+
+    既存の send_xso_status / send_xso_notification からは WebSocketApp と同じく
+    send() / close() で扱える。実際の送信はランタイムのループ上で行うため、
+    任意のスレッドから呼んでもブロックしない。
+    未接続の間は connected が False になり、XsoSender は送らずに保持する（再接続時に送る）。
+    """
+
+    def __init__(self, runtime: "AsyncBridgeRuntime") -> None:
+        self._runtime = runtime
+
+    @property
+    def connected(self) -> bool:
+        return self._runtime._xso is not None
+
+    def send(self, text: str) -> None:
+        self._runtime.call_soon(self._runtime._xso_enqueue, text)
+
+    def close(self) -> None:
+        self._runtime.request_xso_reconnect("close")
+
+
+class AsyncBridgeRuntime:
+    """
+    1つの asyncio イベントループで以下をタスクとして動かすランタイム。
+
+    - Yukacone 翻訳ログ WebSocket の受信
+    - XSOverlay WebSocket の接続維持と送信
+    - 定期処理（mute-status 同期、XSO 定期再接続、プロセス監視、翻訳ログの安定チェック）
+    - ゆかコネ HTTP API 呼び出し（requests はブロッキングなので 1 本のワーカースレッドで直列実行）
+
+    pynput / pystray のコールバックなど別スレッドからは submit() / call_soon() /
+    request_stop() を使ってループへ処理を渡す。
+    """
+
+    def __init__(
+        self,
+        config: dict,
+        app_name: str,
+        on_data_message: Callable[[object], None],
+        on_xso_open: Optional[Callable[[], None]] = None,
+        on_data_open: Optional[Callable[[], None]] = None,
+        xso_policy: Optional[ReconnectPolicy] = None,
+        data_policy: Optional[ReconnectPolicy] = None,
+        xso_health: Optional[LinkHealth] = None,
+    ) -> None:
+        if websockets is None:
+            raise RuntimeError("asyncio モードには websockets パッケージが必要です")
+
+        self.config = config
+        self.app_name = app_name
+        self.on_data_message = on_data_message
+        self.on_xso_open = on_xso_open
+        self.on_data_open = on_data_open
+        self.xso_policy = xso_policy or ReconnectPolicy.from_config("XSOverlay", config)
+        self.data_policy = data_policy or ReconnectPolicy.from_config("Yukacone WebSocket", config)
+        self.xso_health = xso_health or LinkHealth("XSOverlay")
+        self.xso_sink = XsoLoopSink(self)
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._worker = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="bridge-worker"
+        )
+        self._periodic: List[Tuple[str, float, Callable[[], None], bool]] = []
+        self._deadline_jobs: List[Tuple[str, Callable[[], Optional[float]], Callable]] = []
+        self._startup: List[Callable[[], None]] = []
+        self._tasks: List[asyncio.Task] = []
+
+        self._xso = None
+        self._xso_queue: Optional[asyncio.Queue] = None
+        self._xso_reconnect_now: Optional[asyncio.Event] = None
+
+    # -------------------------
+    # 構成（run() 前に呼ぶ）
+    # -------------------------
+    def add_periodic(self, name: str, interval_sec: float, func: Callable[[], None], blocking: bool = True) -> None:
+        """interval_sec ごとに func を実行する。blocking=True ならワーカースレッドで実行"""
+        if interval_sec <= 0:
+            logging.info(f"定期処理 {name} は無効 (interval<=0)")
+            return
+        self._periodic.append((name, float(interval_sec), func, blocking))
+
+    def add_deadline_job(
+        self,
+        name: str,
+        poll: Callable[[], Optional[float]],
+        set_waker: Callable[[Callable[[], None]], None],
+    ) -> None:
+        """
+        期限駆動の処理をループ上で動かす（scheduling.DeadlineWorker の asyncio 版）。
+        poll() は次回時刻（monotonic、無ければ None）を返し、set_waker() で渡した
+        コールバックが呼ばれると即座に poll() し直す。
+        """
+        self._deadline_jobs.append((name, poll, set_waker))
+
+    def add_startup(self, func: Callable[[], None]) -> None:
+        """ループ開始直後にワーカースレッドで実行する処理（初期化など）"""
+        self._startup.append(func)
+
+    # -------------------------
+    # スレッドセーフな入口
+    # -------------------------
+    def call_soon(self, func: Callable, *args) -> None:
+        """任意のスレッドから、ループ上で func(*args) を実行する"""
+        loop = self.loop
+        if loop is None or loop.is_closed() or self._stopping:
+            return
+        if self._in_loop_thread():
+            func(*args)
+        else:
+            loop.call_soon_threadsafe(func, *args)
+
+    def submit(self, func: Callable, *args) -> None:
+        """任意のスレッドから、ブロッキング処理 func(*args) をワーカーで実行する"""
+        self.call_soon(self._spawn_blocking, "submit", func, args)
+
+    def request_xso_reconnect(self, reason: str) -> None:
+        """XSOverlay 接続を切断し、すぐに再接続させる"""
+        self.call_soon(self._xso_reconnect, reason)
+
+    def request_stop(self) -> None:
+        """ランタイムを停止する（任意のスレッドから呼べる）"""
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            self._stopping = True
+            return
+        if self._in_loop_thread():
+            self._set_stop()
+        else:
+            loop.call_soon_threadsafe(self._set_stop)
+
+    # -------------------------
+    # 実行
+    # -------------------------
+    def run(self) -> None:
+        """イベントループを回す（停止までブロック）"""
+        try:
+            asyncio.run(self._main())
+        finally:
+            self._worker.shutdown(wait=False, cancel_futures=True)
+
+    async def _main(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop_event = asyncio.Event()
+        self._xso_queue = asyncio.Queue()
+        self._xso_reconnect_now = asyncio.Event()
+        if self._stopping:
+            return
+
+        self._tasks.append(asyncio.create_task(self._xso_task(), name="xso"))
+        self._tasks.append(asyncio.create_task(self._data_ws_task(), name="data_ws"))
+        for name, interval, func, blocking in self._periodic:
+            self._tasks.append(
+                asyncio.create_task(self._periodic_task(name, interval, func, blocking), name=name)
+            )
+        for name, poll, set_waker in self._deadline_jobs:
+            self._tasks.append(
+                asyncio.create_task(self._deadline_task(name, poll, set_waker), name=name)
+            )
+        for func in self._startup:
+            self._spawn_blocking("startup", func, ())
+
+        logging.info("asyncio ランタイム開始 (tasks=%d)", len(self._tasks))
+        await self._stop_event.wait()
+
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        logging.info("asyncio ランタイム停止")
+
+    # -------------------------
+    # 内部: タスク
+    # -------------------------
+    async def _periodic_task(self, name: str, interval: float, func: Callable[[], None], blocking: bool) -> None:
+        while not self._stopping:
+            if await self._sleep_or_stop(interval):
+                break
+            try:
+                if blocking:
+                    await self.loop.run_in_executor(self._worker, func)
+                else:
+                    func()
+            except asyncio.CancelledError:
+                raise
+            except SystemExit:
+                break
+            except Exception as e:
+                logging.warning(f"定期処理 {name} でエラー: {e}")
+
+    async def _deadline_task(self, name: str, poll: Callable[[], Optional[float]], set_waker: Callable) -> None:
+        woken = asyncio.Event()
+        set_waker(lambda: self.call_soon(woken.set))
+        while not self._stopping:
+            try:
+                deadline = poll()
+            except Exception as e:
+                logging.warning(f"期限処理 {name} でエラー: {e}")
+                deadline = None
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                await asyncio.wait_for(woken.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            woken.clear()
+
+    async def _data_ws_task(self) -> None:
+        url = self.config.get("yukacone_translationlog_ws")
+        while not self._stopping:
+            try:
+                async with websockets.connect(url, max_size=None, ping_interval=None) as ws:
+                    logging.info("Yukacone WebSocket connected")
+                    self.data_policy.connected()
+                    if self.on_data_open is not None:
+                        self.on_data_open()
+                    async for message in ws:
+                        self.on_data_message(message)
+                logging.warning("Yukacone WebSocket closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error("Yukacone WebSocket error: %s", e)
+            self.data_policy.disconnected()
+            delay = self.data_policy.next_delay()
+            logging.info("Yukacone WebSocket: %.1f 秒後に再接続します", delay)
+            if await self._sleep_or_stop(delay):
+                break
+
+    async def _xso_task(self) -> None:
+        base = (self.config["xso_endpoint"] or "").rstrip("/")
+        url = f"{base}/?client={self.app_name}"
+        # ping/pong で死活監視する（pong が来なければ websockets が切断する）
+        ping_interval = float(self.config.get("XSO_PING_INTERVAL_SEC", 20)) or None
+        ping_timeout = float(self.config.get("XSO_PING_TIMEOUT_SEC", 10)) if ping_interval else None
+        while not self._stopping:
+            self._xso_reconnect_now.clear()
+            try:
+                async with websockets.connect(url, ping_interval=ping_interval, ping_timeout=ping_timeout) as ws:
+                    self._xso = ws
+                    logging.info("XSOverlayに接続しました")
+                    self.xso_policy.connected()
+                    self.xso_health.opened()
+                    if self.on_xso_open is not None:
+                        self.on_xso_open()
+                    sender = asyncio.create_task(self._xso_sender(ws))
+                    reader = asyncio.create_task(self._xso_reader(ws))
+                    kick = asyncio.create_task(self._xso_reconnect_now.wait())
+                    try:
+                        await asyncio.wait({sender, reader, kick}, return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        for t in (sender, reader, kick):
+                            t.cancel()
+                    for t in (sender, reader):
+                        if t.done() and not t.cancelled() and t.exception() is not None:
+                            # 送信失敗・pong タイムアウトなど
+                            self.xso_health.error(t.exception())
+                logging.warning("XSOverlay切断")
+                self.xso_health.closed()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"XSOverlayエラー: {e}")
+                self.xso_health.error(e)
+            finally:
+                self._xso = None
+                # 送れなかったフレームを次の接続へ持ち越さない（最新の表示は再接続時に送り直す）
+                self._drain_xso_queue()
+
+            self.xso_policy.disconnected()
+            if self._xso_reconnect_now.is_set():
+                continue
+            delay = self.xso_policy.next_delay()
+            logging.warning(f"XSOverlayに接続できません、{delay:.1f}秒後に再接続します")
+            if await self._sleep_or_stop(delay):
+                break
+
+    async def _xso_sender(self, ws) -> None:
+        while True:
+            text = await self._xso_queue.get()
+            try:
+                await ws.send(text)
+            except websockets.exceptions.ConnectionClosed as e:
+                self.xso_health.send_failed(e)
+                raise
+            except Exception as e:
+                logging.error(f"XSOverlayへの送信失敗: {e}")
+                # 失敗が続けば xso_health.on_dead から再接続される
+                self.xso_health.send_failed(e)
+                continue
+            self.xso_health.send_ok()
+
+    async def _xso_reader(self, ws) -> None:
+        # XSOverlay からの受信は使わないが、読み捨てて切断を検知する
+        async for _ in ws:
+            pass
+
+    # -------------------------
+    # 内部: ループ上で呼ばれるヘルパ
+    # -------------------------
+    def _xso_enqueue(self, text: str) -> None:
+        if self._xso is None:
+            logging.warning("XSO未接続のため送信をスキップします")
+            return
+        self._xso_queue.put_nowait(text)
+
+    def _drain_xso_queue(self) -> None:
+        dropped = 0
+        while True:
+            try:
+                self._xso_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            dropped += 1
+        if dropped:
+            logging.info(f"XSO切断時の未送信フレームを破棄しました: {dropped} 件")
+
+    def _xso_reconnect(self, reason: str) -> None:
+        logging.info(f"XSO再接続開始: {reason}")
+        self._xso_reconnect_now.set()
+
+    def _spawn_blocking(self, name: str, func: Callable, args: tuple) -> None:
+        if self._stopping:
+            return
+        fut = self.loop.run_in_executor(self._worker, func, *args)
+        fut.add_done_callback(lambda f: self._log_failure(name, f))
+
+    @staticmethod
+    def _log_failure(name: str, fut: asyncio.Future) -> None:
+        if fut.cancelled():
+            return
+        exc = fut.exception()
+        if exc is not None and not isinstance(exc, SystemExit):
+            logging.error(f"ワーカー処理 {name} でエラー: {exc}")
+
+    def _set_stop(self) -> None:
+        self._stopping = True
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    async def _sleep_or_stop(self, seconds: float) -> bool:
+        """seconds 待つ。停止要求が来たら True を返す"""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=seconds)
+            return True
+        except asyncio.TimeoutError:
+            return self._stopping
+
+    def _in_loop_thread(self) -> bool:
+        return self._loop_thread_id == threading.get_ident()
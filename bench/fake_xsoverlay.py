@@ -0,0 +1,176 @@
+# bench/fake_xsoverlay.py
+"""
+XSOverlay WebSocket API のスタンドイン（ベンチマーク・動作確認用）。
+
+標準ライブラリだけで最小限の WebSocket サーバーを実装し、受信したテキストフレームを
+受信時刻（time.perf_counter）付きで記録する。ping には pong を返す。
+
+  python bench/fake_xsoverlay.py --port 42070
+"""
+import argparse
+import base64
+import hashlib
+import socket
+import struct
+import threading
+import time
+
+_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class FakeXSOverlay:
+    def __init__(self, port: int = 0):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("127.0.0.1", port))
+        self._sock.listen(8)
+        self.port = self._sock.getsockname()[1]
+        self.frames = []  # (受信時刻 perf_counter, text)
+        self.connections = 0
+        self._cond = threading.Condition()
+        self._stop = False
+
+    def start(self) -> "FakeXSOverlay":
+        threading.Thread(target=self._accept_loop, name="fake-xso", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._stop = True
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+    def wait_for(self, predicate, after: float, timeout: float = 10.0):
+        """after 以降に受信した、predicate(text) を満たす最初のフレームの受信時刻を返す（無ければ None）"""
+        deadline = time.perf_counter() + timeout
+        with self._cond:
+            while True:
+                for t, text in self.frames:
+                    if t >= after and predicate(text):
+                        return t
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    # -------------------------
+    # 内部処理
+    # -------------------------
+    def _accept_loop(self):
+        while not self._stop:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: socket.socket):
+        try:
+            if not self._handshake(conn):
+                return
+            self.connections += 1
+            while True:
+                opcode, payload = self._read_frame(conn)
+                if opcode is None or opcode == 0x8:
+                    self._send_frame(conn, 0x8, b"")
+                    return
+                if opcode == 0x9:
+                    self._send_frame(conn, 0xA, payload)
+                elif opcode == 0x1:
+                    t = time.perf_counter()
+                    with self._cond:
+                        self.frames.append((t, payload.decode("utf-8", errors="replace")))
+                        self._cond.notify_all()
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _handshake(conn: socket.socket) -> bool:
+        data = b""
+        while b"\r\n\r\n" not in data:
+            chunk = conn.recv(4096)
+            if not chunk:
+                return False
+            data += chunk
+        key = None
+        for line in data.decode("latin-1").split("\r\n"):
+            if line.lower().startswith("sec-websocket-key:"):
+                key = line.split(":", 1)[1].strip()
+        if key is None:
+            return False
+        accept = base64.b64encode(hashlib.sha1((key + _GUID).encode()).digest()).decode()
+        conn.sendall(
+            (
+                "HTTP/1.1 101 Switching Protocols\r\n"
+                "Upgrade: websocket\r\n"
+                "Connection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+            ).encode()
+        )
+        return True
+
+    @staticmethod
+    def _recv_exact(conn: socket.socket, n: int) -> bytes:
+        buf = b""
+        while len(buf) < n:
+            chunk = conn.recv(n - len(buf))
+            if not chunk:
+                raise OSError("closed")
+            buf += chunk
+        return buf
+
+    def _read_frame(self, conn: socket.socket):
+        try:
+            b1, b2 = self._recv_exact(conn, 2)
+        except OSError:
+            return None, b""
+        opcode = b1 & 0x0F
+        length = b2 & 0x7F
+        if length == 126:
+            length = struct.unpack(">H", self._recv_exact(conn, 2))[0]
+        elif length == 127:
+            length = struct.unpack(">Q", self._recv_exact(conn, 8))[0]
+        mask = self._recv_exact(conn, 4) if b2 & 0x80 else None
+        payload = self._recv_exact(conn, length) if length else b""
+        if mask:
+            payload = bytes(c ^ mask[i % 4] for i, c in enumerate(payload))
+        return opcode, payload
+
+    @staticmethod
+    def _send_frame(conn: socket.socket, opcode: int, payload: bytes):
+        header = bytes([0x80 | opcode])
+        if len(payload) < 126:
+            header += bytes([len(payload)])
+        elif len(payload) < 65536:
+            header += bytes([126]) + struct.pack(">H", len(payload))
+        else:
+            header += bytes([127]) + struct.pack(">Q", len(payload))
+        try:
+            conn.sendall(header + payload)
+        except OSError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XSOverlay WebSocket のスタンドイン")
+    parser.add_argument("--port", type=int, default=42070)
+    args = parser.parse_args()
+    server = FakeXSOverlay(args.port).start()
+    print(f"fake xsoverlay: ws://127.0.0.1:{server.port}")
+    seen = 0
+    try:
+        while True:
+            time.sleep(0.5)
+            for t, text in server.frames[seen:]:
+                print(f"{t:.6f} {text}")
+            seen = len(server.frames)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# bench/fake_yukacone.py
+"""
+ゆかコネNEO HTTP API のスタンドイン（ベンチマーク・動作確認用）。
+
+/api/mute-on, /api/mute-off, /api/mute-status, /api/setTranslationParam, /api/setRecognitionParam
+に応答する。応答遅延（delay_ms）と、mute 操作が /mute-status に反映されるまでの遅れ（apply_lag_ms）を設定できる。
+
+  python bench/fake_yukacone.py --port 15000 --delay-ms 20 --apply-lag-ms 100
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeYukaconeState:
+    def __init__(self, delay_ms: float = 0.0, apply_lag_ms: float = 0.0, muted: bool = True):
+        self.delay_ms = float(delay_ms)
+        self.apply_lag_ms = float(apply_lag_ms)
+        self._muted = muted
+        self._pending = None  # (反映時刻, 値)
+        self._lock = threading.Lock()
+        self.calls = []  # (path, params, 受信時刻 perf_counter)
+
+    def set_muted(self, value: bool) -> None:
+        with self._lock:
+            if self.apply_lag_ms > 0:
+                self._pending = (time.perf_counter() + self.apply_lag_ms / 1000.0, value)
+            else:
+                self._muted = value
+                self._pending = None
+
+    def muted(self) -> bool:
+        with self._lock:
+            if self._pending is not None and time.perf_counter() >= self._pending[0]:
+                self._muted = self._pending[1]
+                self._pending = None
+            return self._muted
+
+
+def make_handler(state: FakeYukaconeState):
+    class Handler(BaseHTTPRequestHandler):
+        # keep-alive を有効にする（YukaconeClient の接続プールが効くように）
+        protocol_version = "HTTP/1.1"
+        # ヘッダと本体の書き込みが分かれるため、Nagle と遅延 ACK で 40ms 待たされないようにする
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            path = url.path[4:] if url.path.startswith("/api") else url.path
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            state.calls.append((path, params, time.perf_counter()))
+
+            if state.delay_ms > 0:
+                time.sleep(state.delay_ms / 1000.0)
+
+            if path == "/mute-status":
+                body = "true" if state.muted() else "false"
+            elif path == "/mute-on":
+                state.set_muted(True)
+                body = "OK"
+            elif path == "/mute-off":
+                state.set_muted(False)
+                body = "OK"
+            elif path in ("/setTranslationParam", "/setRecognitionParam"):
+                body = "OK"
+            else:
+                self.send_error(404)
+                return
+
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_fake_yukacone(port: int = 0, delay_ms: float = 0.0, apply_lag_ms: float = 0.0):
+    """バックグラウンドで起動し (server, state, 実ポート) を返す"""
+    state = FakeYukaconeState(delay_ms=delay_ms, apply_lag_ms=apply_lag_ms)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-yukacone", daemon=True).start()
+    return server, state, server.server_address[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ゆかコネNEO HTTP API のスタンドイン")
+    parser.add_argument("--port", type=int, default=15000)
+    parser.add_argument("--delay-ms", type=float, default=0.0)
+    parser.add_argument("--apply-lag-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    server, _state, port = start_fake_yukacone(args.port, args.delay_ms, args.apply_lag_ms)
+    print(f"fake yukacone: http://127.0.0.1:{port}/api")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
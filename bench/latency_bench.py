@@ -0,0 +1,153 @@
+# bench/latency_bench.py
+"""
+メディアキー操作 → XSOverlay 表示更新（UpdateMediaPlayerInformation 受信）までの
+エンドツーエンド遅延を測るベンチマーク。
+
+- ゆかコネNEO HTTP API のスタンドイン（fake_yukacone.py、応答遅延を指定可能）
+- XSOverlay WebSocket のスタンドイン（fake_xsoverlay.py、受信時刻を記録）
+- 合成キー入力（pynput の代わりに dispatch_media_action を呼ぶ）
+
+winreg / pynput / pystray は使わないので Linux でもヘッドレスで動く。
+
+  python bench/latency_bench.py --iterations 20 --api-delay-ms 10
+"""
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import YncneoXSOBridge as bridge  # noqa: E402
+from fake_xsoverlay import FakeXSOverlay  # noqa: E402
+from fake_yukacone import start_fake_yukacone  # noqa: E402
+
+ACTIONS = ("toggle_mute", "next", "previous")
+
+
+class SyntheticKeyInjector:
+    """pynput のフックスレッドの代わりに、別スレッドからメディアキー操作を発生させる"""
+
+    def __init__(self, config: dict):
+        self.config = config
+
+    def press(self, action: str) -> threading.Thread:
+        t = threading.Thread(
+            target=bridge.dispatch_media_action, args=(self.config, action), name="synthetic-key"
+        )
+        t.start()
+        return t
+
+
+def percentile(values, pct: float) -> float:
+    """最近傍順位法によるパーセンタイル"""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+def build_config(api_port: int, xso_port: int) -> dict:
+    return {
+        "app_name": "YncneoXSOBridgeBench",
+        "xso_endpoint": f"ws://127.0.0.1:{xso_port}",
+        "yukacone_endpoint": f"http://127.0.0.1:{api_port}/api",
+        "translation_profiles": [
+            {
+                "name": f"bench-{i}",
+                "recognition_language": "ja" if i % 2 == 0 else "en",
+                "xso_notification": False,
+                "translation_param": {"slot": 1, "language": "en-US", "engine": "google"},
+            }
+            for i in range(3)
+        ],
+    }
+
+
+def run(iterations: int, api_delay_ms: float, apply_lag_ms: float, gap_sec: float) -> dict:
+    xso = FakeXSOverlay().start()
+    _server, api_state, api_port = start_fake_yukacone(delay_ms=api_delay_ms, apply_lag_ms=apply_lag_ms)
+    config = build_config(api_port, xso.port)
+
+    bridge.APP_NAME = config["app_name"]
+    bridge.init_yukacone_client(config)
+    bridge.init_xso_sender(config)
+    bridge.init_profile_switcher(config)
+    bridge.xso_ws = bridge.connect_to_xsoverlay(config)
+    deadline = time.perf_counter() + 5.0
+    while xso.connections == 0 and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    if xso.connections == 0:
+        raise RuntimeError("fake XSOverlay に接続できませんでした")
+    bridge.is_muted = api_state.muted()
+
+    injector = SyntheticKeyInjector(config)
+    is_status = lambda text: "UpdateMediaPlayerInformation" in text  # noqa: E731
+
+    results = {action: [] for action in ACTIONS}
+    timeouts = {action: 0 for action in ACTIONS}
+    for _ in range(iterations):
+        for action in ACTIONS:
+            t0 = time.perf_counter()
+            worker = injector.press(action)
+            t1 = xso.wait_for(is_status, after=t0, timeout=10.0)
+            if t1 is None:
+                timeouts[action] += 1
+            else:
+                results[action].append((t1 - t0) * 1000.0)
+            worker.join(timeout=30.0)
+            time.sleep(gap_sec)
+
+    xso.stop()
+    bridge.profile_switcher.stop()
+    bridge.xso_sender.stop()
+    return {
+        "latency_ms": results,
+        "timeouts": timeouts,
+        "api_stats": bridge.yukacone_client.stats() if bridge.yukacone_client else {},
+        "xso_stats": bridge.xso_sender.stats(),
+        "settle_stats": bridge.yukacone_sequencer.stats() if bridge.yukacone_sequencer else {},
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="メディアキー → XSOverlay 表示更新の遅延ベンチマーク")
+    parser.add_argument("--iterations", type=int, default=10, help="各操作の試行回数")
+    parser.add_argument("--api-delay-ms", type=float, default=0.0, help="ゆかコネAPI スタンドインの応答遅延")
+    parser.add_argument("--apply-lag-ms", type=float, default=0.0, help="mute 操作が mute-status に反映されるまでの遅れ")
+    parser.add_argument("--gap-sec", type=float, default=0.2, help="操作間の待ち時間")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+    )
+
+    result = run(args.iterations, args.api_delay_ms, args.apply_lag_ms, args.gap_sec)
+
+    print(f"{'action':<12} {'n':>4} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  timeouts")
+    for action in ACTIONS:
+        values = result["latency_ms"][action]
+        print(
+            f"{action:<12} {len(values):>4} "
+            f"{percentile(values, 50):>8.1f}ms {percentile(values, 95):>8.1f}ms "
+            f"{percentile(values, 99):>8.1f}ms {max(values, default=float('nan')):>8.1f}ms  "
+            f"{result['timeouts'][action]}"
+        )
+    print("Yukacone API:")
+    for path, stats in sorted(result["api_stats"].items()):
+        print(f"  {path:<22} {stats}")
+    print(f"XSO sender: {result['xso_stats']}")
+    print("Yukacone settle time:")
+    for name, stats in sorted(result["settle_stats"].items()):
+        print(f"  {name:<22} {stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+# config_reload.py
+"""
+config.json の再読み込み（再起動なしで反映）。
+
+- ProfileTable.from_config(): translation_profiles を検証し、API に渡すパラメータと
+  XSOverlay フレームを事前に組み立てた変更不可のテーブルにする。
+  使う側は global の参照を1回読むだけ（差し替えは参照の代入1回なのでロック不要）。
+- ConfigWatcher: config.json の更新時刻とサイズを監視し、書き込みが落ち着いたら読み込んで
+  on_reload() に渡す。JSON の誤りや検証エラーはログに出して無視し、直前の正しい設定のまま動く。
+
+再起動なしで反映するキーは RELOADABLE_KEYS のみ。それ以外が変わった場合は警告だけ出す。
+起動時は drop_invalid_optional() で型の誤った任意キーを警告して既定値に戻すだけにし、起動は止めない
+（translation_profiles の誤りは起動時も ConfigError）。
+"""
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from scheduling import DeadlineWorker
+from xso_frames import XsoFrameCache
+
+# 再起動なしで反映するキー
+RELOADABLE_KEYS = ("translation_profiles", "XSO_RECONNECT_INTERVAL_SEC", "XSO_RECONNECT_HOTKEY")
+
+# true/false で指定するキー（"false" のような文字列は真と扱われてしまうので拒否する）
+BOOL_KEYS = ("HEADLESS", "CONFIG_RELOAD", "PROFILING_SPANS", "DATA_WS_CAPTURE", "debug")
+
+# 起動後に main() が書き込むキー（ファイルには無いので差分から除く）
+RUNTIME_KEYS = ("yukacone_endpoint", "yukacone_translationlog_ws")
+
+
+class ConfigError(ValueError):
+    """config.json の内容が不正"""
+
+
+class CompiledProfile:
+    """1つの翻訳プロファイル（作成後に変更しない）"""
+
+    __slots__ = ("index", "name", "recognition_language", "translation_params", "xso_notification", "source")
+
+    def __init__(self, index: int, profile: dict) -> None:
+        where = f"translation_profiles[{index}]"
+        if not isinstance(profile, dict):
+            raise ConfigError(f"{where} がオブジェクトではありません")
+        param = profile.get("translation_param")
+        if not isinstance(param, dict):
+            raise ConfigError(f"{where}.translation_param がありません")
+
+        self.index = index
+        self.name = _require_str(profile, "name", where)
+        self.recognition_language = _require_str(profile, "recognition_language", where)
+        slot = param.get("slot")
+        if not isinstance(slot, int) or isinstance(slot, bool):
+            raise ConfigError(f"{where}.translation_param.slot が整数ではありません: {slot!r}")
+        # /setTranslationParam にそのまま渡す（呼び出し側で書き換えないこと）
+        self.translation_params = {
+            "slot": slot,
+            "language": _require_str(param, "language", f"{where}.translation_param"),
+            "engine": _require_str(param, "engine", f"{where}.translation_param"),
+        }
+        notification = profile.get("xso_notification", False)
+        if not isinstance(notification, bool):
+            raise ConfigError(f"{where}.xso_notification が true/false ではありません: {notification!r}")
+        self.xso_notification = notification
+        # 字幕転送（pick_translation）などは元の dict の形で読むので、複製を持っておく
+        self.source = copy.deepcopy(profile)
+
+    def api_key(self) -> tuple:
+        """ゆかコネへ反映する値（これが変わったときだけ API を呼び直す）"""
+        p = self.translation_params
+        return self.recognition_language, p["slot"], p["language"], p["engine"]
+
+    def info(self) -> dict:
+        """翻訳ログ記録用のプロファイル情報"""
+        return {
+            "index": self.index,
+            "name": self.name,
+            "recognition_language": self.recognition_language,
+            "language": self.translation_params["language"],
+            "engine": self.translation_params["engine"],
+        }
+
+
+class ProfileTable:
+    """検証・事前計算済みの翻訳プロファイル一覧と XSOverlay フレーム"""
+
+    __slots__ = ("profiles", "frames")
+
+    def __init__(self, profiles: Tuple[CompiledProfile, ...], frames: XsoFrameCache) -> None:
+        self.profiles = profiles
+        self.frames = frames
+
+    @classmethod
+    def from_config(cls, config: dict, app_name: str) -> "ProfileTable":
+        """config を検証してテーブルを作る（不正なら ConfigError）"""
+        validate_config(config)
+        raw = config["translation_profiles"]
+        profiles = tuple(CompiledProfile(i, p) for i, p in enumerate(raw))
+        return cls(profiles, XsoFrameCache(app_name, [p.source for p in profiles]))
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def __getitem__(self, index: int) -> CompiledProfile:
+        return self.profiles[index]
+
+
+def validate_config(config: dict) -> None:
+    """再読み込みで反映するキーと、数値設定の型を確認する（不正なら ConfigError）"""
+    if not isinstance(config, dict):
+        raise ConfigError("config.json の最上位がオブジェクトではありません")
+    profiles = config.get("translation_profiles")
+    if not isinstance(profiles, list) or not profiles:
+        raise ConfigError("translation_profiles が空、または配列ではありません")
+    for _key, message in _optional_key_errors(config):
+        raise ConfigError(message)
+
+
+def drop_invalid_optional(config: dict) -> list:
+    """
+    起動時用: 型が不正な任意キー（数値・true/false・ホットキー）を config から取り除き、既定値で動かす。
+    再読み込み（validate_config）と違って拒否はしない。戻り値: 取り除いた理由（警告用）
+    """
+    if not isinstance(config, dict):
+        return []
+    errors = _optional_key_errors(config)
+    for key, _message in errors:
+        config.pop(key, None)
+    return [message for _key, message in errors]
+
+
+def _optional_key_errors(config: dict) -> list:
+    """任意キーの型の誤り: [(キー, メッセージ), ...]"""
+    errors = []
+    for key, value in config.items():
+        # null は既定値の意味
+        if key.endswith(("_SEC", "_MAX", "_FPS")) and value is not None and not _is_number(value):
+            errors.append((key, f"{key} が数値ではありません: {value!r}"))
+    for key in BOOL_KEYS:
+        value = config.get(key)
+        if value is not None and not isinstance(value, bool):
+            errors.append((key, f"{key} が true/false ではありません: {value!r}"))
+    interval = config.get("XSO_RECONNECT_INTERVAL_SEC")
+    if _is_number(interval) and interval < 0:
+        errors.append(("XSO_RECONNECT_INTERVAL_SEC", f"XSO_RECONNECT_INTERVAL_SEC が負の値です: {interval!r}"))
+    hotkey = config.get("XSO_RECONNECT_HOTKEY")
+    if hotkey is not None and not isinstance(hotkey, str):
+        errors.append(("XSO_RECONNECT_HOTKEY", f"XSO_RECONNECT_HOTKEY が文字列ではありません: {hotkey!r}"))
+    return errors
+
+
+def changed_keys(old: dict, new: dict) -> Tuple[list, list]:
+    """(再起動なしで反映するキー, 再起動が必要なキー) のうち値が変わったもの"""
+    keys = (set(old) | set(new)) - set(RUNTIME_KEYS)
+    changed = sorted(k for k in keys if old.get(k) != new.get(k))
+    return [k for k in changed if k in RELOADABLE_KEYS], [k for k in changed if k not in RELOADABLE_KEYS]
+
+
+class ConfigWatcher:
+    """
+    config.json の変更を interval_sec ごとに確認する。
+
+    - 更新時刻・サイズが変わってから settle_sec 変化が無くなったら読み込む（エディタの書きかけを読まない）
+    - 読み込んだ dict を on_reload() に渡す。on_reload() が例外（ConfigError など）を出したら拒否扱い
+    - poll() / set_waker() は DeadlineWorker・AsyncBridgeRuntime.add_deadline_job 用
+    """
+
+    def __init__(
+        self,
+        path: str,
+        on_reload: Callable[[dict], None],
+        interval_sec: float = 1.0,
+        settle_sec: float = 0.3,
+    ) -> None:
+        self.path = path
+        self._on_reload = on_reload
+        self.interval_sec = max(0.05, float(interval_sec))
+        self.settle_sec = max(0.0, float(settle_sec))
+
+        self._lock = threading.Lock()
+        self._applied = self._signature()  # 起動時に読み込んだ版
+        self._pending: Optional[tuple] = None
+        self._pending_since = 0.0
+        self._worker: Optional[DeadlineWorker] = None
+
+        # 統計
+        self.reloads = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+
+    def start(self, background: bool = True) -> None:
+        """監視スレッドを開始。background=False の場合は呼び出し側が poll() を駆動する"""
+        if self._worker is not None:
+            return
+        if background:
+            self._worker = DeadlineWorker("config-watch", self.poll)
+            self._worker.start()
+
+    def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.stop()
+            self._worker = None
+
+    def set_waker(self, waker: Callable[[], None]) -> None:
+        # 外から起こす必要は無い（一定間隔で確認するだけ）
+        pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"reloads": self.reloads, "rejected": self.rejected, "last_error": self.last_error}
+
+    def poll(self) -> Optional[float]:
+        now = time.monotonic()
+        sig = self._signature()
+        with self._lock:
+            if sig == self._applied or sig is None:
+                self._pending = None
+                return now + self.interval_sec
+            if sig != self._pending:
+                # 書き込み中かもしれないので、変化が止まるまで待つ
+                self._pending = sig
+                self._pending_since = now
+                return now + min(self.interval_sec, self.settle_sec)
+            if now - self._pending_since < self.settle_sec:
+                return self._pending_since + self.settle_sec
+            self._applied = sig
+            self._pending = None
+        self._reload()
+        return time.monotonic() + self.interval_sec
+
+    # -------------------------
+    # 内部処理
+    # -------------------------
+    def _signature(self) -> Optional[tuple]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            # 保存時に一旦消えるエディタがあるので、見えない間は何もしない
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _reload(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            self._on_reload(config)
+        except (OSError, ValueError) as e:
+            with self._lock:
+                self.rejected += 1
+                self.last_error = str(e)
+            logging.error(f"config.json の再読み込みを拒否しました（直前の設定のまま動作します）: {e}")
+            return
+        except Exception as e:
+            with self._lock:
+                self.rejected += 1
+                self.last_error = str(e)
+            logging.exception("config.json の再読み込みに失敗しました（直前の設定のまま動作します）")
+            return
+        with self._lock:
+            self.reloads += 1
+            self.last_error = None
+
+
+def _require_str(d: dict, key: str, where: str) -> str:
+    value = d.get(key)
+    if not isinstance(value, str) or not value:
+        raise ConfigError(f"{where}.{key} が文字列ではありません: {value!r}")
+    return value
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
@@ -0,0 +1,235 @@
+# metrics.py
+"""
+ブリッジ内部の計測値を Prometheus のテキスト形式で出す（外部ライブラリ不要）。
+
+- Counter / Gauge / Histogram: 各コンポーネントが持ち、イベント発生時に更新する
+- Registry.add_collector(): 既存の stats() などを取得時に読み出して値にする関数を登録する
+- MetricsServer: 127.0.0.1 の HTTP で GET /metrics に応答する（config.json の METRICS_PORT で有効化）
+
+  curl http://127.0.0.1:9464/metrics
+"""
+import bisect
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# 1つのメトリクス: (名前, 種別, 説明, [(名前の接尾辞, ラベル, 値), ...])
+Sample = Tuple[str, Dict[str, str], float]
+Family = Tuple[str, str, str, List[Sample]]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Metric:
+    TYPE = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _labels(self, key: tuple) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+
+class Counter(_Metric):
+    TYPE = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def collect(self) -> Family:
+        with self._lock:
+            items = list(self._values.items())
+        return self.name, self.TYPE, self.help, [("", self._labels(k), v) for k, v in items]
+
+
+class Gauge(Counter):
+    TYPE = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # ラベル -> [各バケットの件数..., +Inf の件数], 合計
+        self._counts: Dict[tuple, List[int]] = {}
+        self._sums: Dict[tuple, float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    def snapshot(self, **labels) -> Tuple[int, float]:
+        """(件数, 合計) を返す"""
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.get(key)
+            return (sum(counts), self._sums[key]) if counts else (0, 0.0)
+
+    def collect(self) -> Family:
+        samples: List[Sample] = []
+        with self._lock:
+            items = [(k, list(c), self._sums[k]) for k, c in self._counts.items()]
+        for key, counts, total in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                samples.append(("_bucket", dict(labels, le=_format_value(bound)), cumulative))
+            cumulative += counts[-1]
+            samples.append(("_bucket", dict(labels, le="+Inf"), cumulative))
+            samples.append(("_sum", labels, total))
+            samples.append(("_count", labels, cumulative))
+        return self.name, self.TYPE, self.help, samples
+
+
+class Registry:
+    """メトリクスと収集関数の登録先"""
+
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, func: Callable[[], Iterable[Family]]) -> None:
+        """取得時に呼ばれ、(名前, 種別, 説明, サンプル) を返す関数を登録する"""
+        with self._lock:
+            self._collectors.append(func)
+
+    def collect(self) -> List[Family]:
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+        families = [m.collect() for m in metrics]
+        for func in collectors:
+            try:
+                families.extend(func())
+            except Exception:
+                logging.exception("metrics: collector failed")
+        return families
+
+    def render(self) -> str:
+        """Prometheus テキスト形式（0.0.4）"""
+        lines = []
+        for name, kind, help, samples in self.collect():
+            lines.append(f"# HELP {name} {_escape_help(help)}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def family(name: str, kind: str, help: str, values) -> Family:
+    """収集関数用: values は値1つ、または [(ラベル dict, 値), ...]"""
+    if isinstance(values, (int, float)):
+        return name, kind, help, [("", {}, values)]
+    return name, kind, help, [("", labels, value) for labels, value in values]
+
+
+class MetricsServer:
+    """GET /metrics に Registry.render() の結果を返す HTTP サーバー（デーモンスレッド）"""
+
+    def __init__(self, registry: Registry, port: int, host: str = "127.0.0.1") -> None:
+        self.registry = registry
+        self.host = host
+        self.port = int(port)
+        self._server = None  # ThreadingHTTPServer
+
+    def start(self) -> "MetricsServer":
+        # http.server は METRICS_PORT 有効時にしか使わないので、ここで初めて読み込む
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        logging.info(f"メトリクス公開: http://{self.host}:{self.port}/metrics")
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for k, v in labels.items():
+        v = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
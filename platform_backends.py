@@ -0,0 +1,438 @@
+# platform_backends.py
+"""
+OS / GUI に依存する部分の差し替え口。
+
+- ポート取得 (PORT_SOURCE)      : "registry"（Windows 既定） / "config" / "env"
+- 入力 (INPUT_BACKEND)          : "pynput"（メディアキー・ホットキー、既定） / "control_api"（127.0.0.1 の HTTP） / "none"
+- 状態表示 (STATUS_BACKEND)     : "tray"（既定） / "none"
+
+HEADLESS: true のときは入力 "control_api"・状態表示 "none" を既定にする。
+winreg / pynput / pystray / PIL は選ばれたバックエンドの start() / read() の中でだけ読み込むので、
+ヘッドレスでは読み込まれない（常駐メモリとスレッド数が減り、Linux でも本体を動かせる）。
+"""
+import json
+import logging
+import os
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 入力バックエンドから呼ぶ操作: 名前 -> callback(source)。source は "media_key" や "hotkey:alt+ctrl+v" など
+Actions = Dict[str, Callable[[str], None]]
+
+
+def is_headless(config: dict) -> bool:
+    # "false" などの文字列を真と扱わないよう、true（JSON の真偽値）だけを有効とする
+    return config.get("HEADLESS", False) is True
+
+
+def _names(value, default: List[str]) -> List[str]:
+    """設定値（文字列・リスト・未指定）をバックエンド名のリストにする"""
+    if value is None or value == "":
+        return list(default)
+    if isinstance(value, str):
+        value = [value]
+    return [str(v).strip().lower() for v in value if str(v).strip()]
+
+
+# =========================
+# ポート取得
+# =========================
+class RegistryPortSource:
+    """
+    config.json の設定を使って YukarinetteConnectorNeo のポートをレジストリから取得する。
+
+    - Hive     : config["Yncneo_Registry_Hive"]
+    - Path     : config["Yncneo_Registry_Path"]  （例: "Software\\YukarinetteConnectorNeo"）
+    - Value名  : config["Yncneo_Registry_Value_Http"] / config["Yncneo_Registry_Value_Websocket"]
+
+    実際のレジストリ構造：
+      [HKEY_CURRENT_USER\\Software\\YukarinetteConnectorNeo]
+      "HTTP"=dword:...
+      "WebSocket"=dword:...
+    """
+
+    name = "registry"
+
+    def read(self, config: dict) -> Tuple[int, int]:
+        http_port = self._read_port(config, "Yncneo_Registry_Value_Http", "Yukacone HTTP")
+        ws_port = self._read_port(config, "Yncneo_Registry_Value_Websocket", "Yukacone WebSocket")
+        return http_port, ws_port
+
+    @staticmethod
+    def _hive(winreg, name: str):
+        mapping = {
+            "HKEY_CURRENT_USER": winreg.HKEY_CURRENT_USER,
+            "HKCU": winreg.HKEY_CURRENT_USER,
+            "HKEY_LOCAL_MACHINE": winreg.HKEY_LOCAL_MACHINE,
+            "HKLM": winreg.HKEY_LOCAL_MACHINE,
+        }
+        n = name.upper()
+        if n not in mapping:
+            raise ValueError(f"未知のレジストリハイブ名: {name}")
+        return mapping[n]
+
+    def _read_port(self, config: dict, value_key_name: str, desc: str) -> int:
+        try:
+            import winreg
+        except ImportError:
+            raise RuntimeError("レジストリは Windows でのみ使えます（PORT_SOURCE に config / env を指定してください）")
+
+        hive_name = config.get("Yncneo_Registry_Hive")
+        base_path = config.get("Yncneo_Registry_Path")
+        value_name = config.get(value_key_name)
+
+        if not hive_name or not base_path or not value_name:
+            raise ValueError(
+                f"{desc} のレジストリ設定が config.json に不足しています "
+                f"(Hive={hive_name}, Path={base_path}, Value={value_name})"
+            )
+
+        hive = self._hive(winreg, hive_name)
+
+        try:
+            with winreg.OpenKey(hive, base_path) as key:
+                # ★ 値名 value_name ("HTTP" / "WebSocket") を読む
+                value, reg_type = winreg.QueryValueEx(key, value_name)
+
+                if not isinstance(value, int):
+                    # 一応、文字列になっていても int に変換を試みる
+                    try:
+                        port = int(str(value))
+                    except Exception:
+                        raise ValueError(f"{desc} のレジストリ値が整数ではありません: {value}")
+                else:
+                    port = value
+
+                logging.info(f"{desc} ポート値取得: {port} (Key={base_path}, Value={value_name})")
+                return port
+
+        except FileNotFoundError as e:
+            # キー自体が無い場合
+            raise RuntimeError(
+                f"{desc} のレジストリキーが見つかりません: "
+                f"{hive_name}\\{base_path} / {e}"
+            )
+        except OSError as e:
+            # 値名が無い場合など
+            raise RuntimeError(
+                f"{desc} のレジストリ値 '{value_name}' の読み出しに失敗: "
+                f"{hive_name}\\{base_path} / {e}"
+            )
+
+
+class ConfigPortSource:
+    """config.json の YUKACONE_HTTP_PORT / YUKACONE_WS_PORT"""
+
+    name = "config"
+
+    def read(self, config: dict) -> Tuple[int, int]:
+        return _parse_ports(config.get("YUKACONE_HTTP_PORT"), config.get("YUKACONE_WS_PORT"), "config.json")
+
+
+class EnvPortSource:
+    """環境変数 YUKACONE_HTTP_PORT / YUKACONE_WS_PORT"""
+
+    name = "env"
+
+    def read(self, config: dict) -> Tuple[int, int]:
+        return _parse_ports(os.environ.get("YUKACONE_HTTP_PORT"), os.environ.get("YUKACONE_WS_PORT"), "環境変数")
+
+
+def _parse_ports(http_port, ws_port, desc: str) -> Tuple[int, int]:
+    if http_port in (None, "") or ws_port in (None, ""):
+        raise ValueError(f"{desc} に YUKACONE_HTTP_PORT / YUKACONE_WS_PORT がありません")
+    try:
+        return int(http_port), int(ws_port)
+    except (TypeError, ValueError):
+        raise ValueError(f"{desc} のポート値が整数ではありません: HTTP={http_port}, WS={ws_port}")
+
+
+PORT_SOURCES = {
+    "registry": RegistryPortSource,
+    "config": ConfigPortSource,
+    "env": EnvPortSource,
+}
+
+
+def discover_ports(config: dict) -> Tuple[int, int]:
+    """
+    PORT_SOURCE に並べた順にゆかコネのポートを探し、最初に取れた (HTTP, WebSocket) を返す。
+    未指定時は Windows なら registry、それ以外は env → config。どれも取れなければ最後の例外を投げる。
+    """
+    default = ["registry"] if sys.platform == "win32" else ["env", "config"]
+    last_error: Optional[Exception] = None
+    for name in _names(config.get("PORT_SOURCE"), default):
+        source_cls = PORT_SOURCES.get(name)
+        if source_cls is None:
+            last_error = ValueError(f"未知の PORT_SOURCE: {name}")
+            logging.warning(str(last_error))
+            continue
+        try:
+            ports = source_cls().read(config)
+        except Exception as e:
+            last_error = e
+            logging.info(f"ポート取得（{name}）に失敗: {e}")
+            continue
+        logging.info(f"ゆかコネのポートを {name} から取得しました: HTTP={ports[0]}, WS={ports[1]}")
+        return ports
+    raise last_error or ValueError("PORT_SOURCE が空です")
+
+
+# =========================
+# 入力
+# =========================
+class PynputInput:
+    """メディアキー（Play/Pause・Next・Previous）と XSO_RECONNECT_HOTKEY をグローバルフックで拾う"""
+
+    name = "pynput"
+
+    def __init__(self, config: dict, actions: Actions) -> None:
+        self.hotkey = (config.get("XSO_RECONNECT_HOTKEY") or "").strip()
+        self.actions = actions
+        self._listener = None
+        self._hotkeys = None
+
+    def start(self) -> None:
+        try:
+            from pynput import keyboard
+        except Exception as e:  # pynput は表示環境が無いと ImportError 以外も投げる
+            logging.error(f"pynput を読み込めないためキー入力は無効です: {e}")
+            return
+
+        key_actions = {
+            keyboard.Key.media_play_pause: "toggle_mute",
+            keyboard.Key.media_next: "next",
+            keyboard.Key.media_previous: "previous",
+        }
+
+        def on_press(key):
+            action = key_actions.get(key)
+            if action is None:
+                return
+            self.actions[action]("media_key")
+
+        # Listener / GlobalHotKeys はそれぞれ自前のデーモンスレッドで動く
+        self._listener = keyboard.Listener(on_press=on_press)
+        self._listener.start()
+        self._start_hotkey(keyboard)
+
+    def set_hotkey(self, hotkey: str) -> None:
+        """XSO_RECONNECT_HOTKEY を差し替える（config.json 再読み込み時。メディアキーのフックはそのまま）"""
+        hotkey = (hotkey or "").strip()
+        if hotkey == self.hotkey:
+            return
+        self.hotkey = hotkey
+        if self._listener is None:
+            # 未開始、または pynput が使えない
+            return
+        if self._hotkeys is not None:
+            try:
+                self._hotkeys.stop()
+            except Exception as e:
+                logging.error(f"ホットキーの停止中にエラー: {e}")
+            self._hotkeys = None
+        from pynput import keyboard
+        self._start_hotkey(keyboard)
+
+    def _start_hotkey(self, keyboard) -> None:
+        if not self.hotkey:
+            logging.info("XSO_RECONNECT_HOTKEY 未設定のためホットキーは無効")
+            return
+        pynput_hotkey = to_pynput_hotkey(self.hotkey)
+        logging.info(f"XSO再接続ホットキー: {self.hotkey} -> {pynput_hotkey}")
+        reason = f"hotkey:{self.hotkey}"
+        # 他操作（Mute/翻訳切替/タイマー）と競合しないように同じ関数へ
+        self._hotkeys = keyboard.GlobalHotKeys({pynput_hotkey: lambda: self.actions["reconnect"](reason)})
+        self._hotkeys.start()
+
+    def stop(self) -> None:
+        for listener in (self._listener, self._hotkeys):
+            if listener is not None:
+                try:
+                    listener.stop()
+                except Exception as e:
+                    logging.error(f"キー入力の停止中にエラー: {e}")
+        self._listener = None
+        self._hotkeys = None
+
+
+def to_pynput_hotkey(hotkey: str) -> str:
+    # "alt+ctrl+v" -> "<alt>+<ctrl>+v"
+    parts = [p.strip().lower() for p in hotkey.split("+") if p.strip()]
+    mapped = []
+    for p in parts:
+        if p in ("ctrl", "control"):
+            mapped.append("<ctrl>")
+        elif p == "alt":
+            mapped.append("<alt>")
+        elif p == "shift":
+            mapped.append("<shift>")
+        elif p in ("win", "cmd", "super"):
+            mapped.append("<cmd>")
+        else:
+            # 最後の通常キー想定: "v" など
+            mapped.append(p)
+    return "+".join(mapped)
+
+
+class ControlApiInput:
+    """
+    127.0.0.1 の HTTP で操作を受け付ける（キーフックの代わり。Stream Deck やスクリプトから呼ぶ）。
+
+      curl -X POST http://127.0.0.1:9465/toggle_mute     （next / previous / reconnect / profile_capture / exit）
+      curl http://127.0.0.1:9465/status
+
+    ブラウザ上のページから叩かれないよう、Origin ヘッダ付きのリクエストは拒否する。
+    """
+
+    name = "control_api"
+
+    def __init__(
+        self,
+        config: dict,
+        actions: Actions,
+        status_provider: Optional[Callable[[], dict]] = None,
+    ) -> None:
+        self.port = int(config.get("CONTROL_API_PORT", 9465))
+        self.host = "127.0.0.1"
+        self.actions = actions
+        self.status_provider = status_provider
+        self._server = None
+
+    def start(self) -> None:
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/status":
+                    self.send_error(404)
+                    return
+                status = backend.status_provider() if backend.status_provider else {}
+                self._reply(200, status)
+
+            def do_POST(self):
+                if self.headers.get("Origin"):
+                    self.send_error(403)
+                    return
+                name = self.path.split("?", 1)[0].strip("/")
+                action = backend.actions.get(name)
+                if action is None:
+                    self.send_error(404)
+                    return
+                try:
+                    action("control_api")
+                except Exception as e:
+                    logging.error(f"制御 API {name} の実行中にエラー: {e}")
+                    self._reply(500, {"ok": False, "error": str(e)})
+                    return
+                self._reply(200, {"ok": True, "action": name})
+
+            def _reply(self, code: int, body: dict):
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="control-api", daemon=True).start()
+        logging.info(f"制御 API: http://{self.host}:{self.port}/ （{', '.join(sorted(self.actions))}）")
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def create_inputs(
+    config: dict,
+    actions: Actions,
+    status_provider: Optional[Callable[[], dict]] = None,
+) -> list:
+    """INPUT_BACKEND（文字列またはリスト、"none" で無効）から入力バックエンドを作る（未開始）"""
+    default = ["control_api"] if is_headless(config) else ["pynput"]
+    backends = []
+    for name in _names(config.get("INPUT_BACKEND"), default):
+        if name == "none":
+            continue
+        if name == "pynput":
+            backends.append(PynputInput(config, actions))
+        elif name == "control_api":
+            backends.append(ControlApiInput(config, actions, status_provider))
+        else:
+            logging.warning(f"未知の INPUT_BACKEND: {name}")
+    return backends
+
+
+# =========================
+# 状態表示
+# =========================
+class TrayStatus:
+    """タスクトレイアイコン（ツールチップに状態を出す）"""
+
+    name = "tray"
+
+    def __init__(
+        self,
+        app_name: str,
+        on_exit: Callable[[], None],
+        extra_items: Optional[List[Tuple[str, Callable[[], None]]]] = None,
+    ) -> None:
+        from tray_controller import TrayController
+
+        self._controller = TrayController(
+            app_name=app_name,
+            on_exit_callback=on_exit,   # Exit メニューから cleanup() を呼ぶ
+            icon_filename="icon.ico",
+            extra_items=extra_items,
+        )
+
+    def start(self, text: str) -> None:
+        self._controller.start(text)
+
+    def update(self, text: str) -> None:
+        self._controller.update_tooltip(text)
+
+    def stop(self) -> None:
+        self._controller.stop()
+
+
+class NullStatus:
+    """状態を表示しない（ヘッドレス用。状態は制御 API の /status やログで確認する）"""
+
+    name = "none"
+
+    def start(self, text: str) -> None:
+        logging.info(f"状態表示なし（STATUS_BACKEND=none）: {text}")
+
+    def update(self, text: str) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+def create_status_display(
+    config: dict,
+    app_name: str,
+    on_exit: Callable[[], None],
+    extra_items: Optional[List[Tuple[str, Callable[[], None]]]] = None,
+):
+    """STATUS_BACKEND から状態表示を作る（未開始）"""
+    default = "none" if is_headless(config) else "tray"
+    name = str(config.get("STATUS_BACKEND") or default).strip().lower()
+    if name == "tray":
+        return TrayStatus(app_name, on_exit, extra_items)
+    if name != "none":
+        logging.warning(f"未知の STATUS_BACKEND: {name}（表示なしで起動します）")
+    return NullStatus()
@@ -0,0 +1,117 @@
+# process_watcher.py
+import logging
+import time
+from typing import Optional
+
+import psutil
+
+
+class ProcessWatcher:
+    """
+    監視対象プロセス（TARGET_PROCESS）の生存確認。
+
+    - 最初に1回だけプロセス一覧を走査し、見つけたプロセスを PID と起動時刻で固定する
+    - 以降は固定したプロセスだけを確認する（is_running() は起動時刻も照合するので PID 再利用に騙されない）
+    - wait_exit() は固定したプロセスの終了をブロッキングで待つ（ポーリング不要）
+    - 固定したプロセスが消えたときだけ一覧を走査し直し、同名の別プロセスがあればそれを固定し直す
+    """
+
+    def __init__(self, process_name: str) -> None:
+        self.process_name = process_name
+        self._target = process_name.lower()
+        self._proc: Optional[psutil.Process] = None
+        self._last_alive = None  # 最後に生存を確認した時刻（monotonic）
+
+        # 統計
+        self.scans = 0
+        self.checks = 0
+        self.repins = 0
+        self.last_detect_method = None
+        self.last_detect_latency_ms = None
+
+    @property
+    def pid(self) -> Optional[int]:
+        return None if self._proc is None else self._proc.pid
+
+    def is_alive(self) -> bool:
+        """対象プロセスが存在するか（固定済みなら走査しない）"""
+        self.checks += 1
+        if self._proc is not None:
+            try:
+                if self._proc.is_running():
+                    self._last_alive = time.monotonic()
+                    return True
+            except psutil.Error:
+                pass
+            self._record_exit("check")
+            self._proc = None
+        return self._rescan()
+
+    def wait_exit(self, timeout: Optional[float] = None) -> bool:
+        """
+        対象プロセスの終了を最大 timeout 秒待つ。
+        終了して同名の別プロセスも無ければ False、まだ生きていれば（または別プロセスを固定し直したら）True。
+        """
+        if self._proc is None and not self._rescan():
+            return False
+        try:
+            self._proc.wait(timeout=timeout)
+        except psutil.TimeoutExpired:
+            self._last_alive = time.monotonic()
+            return True
+        except psutil.Error:
+            pass
+        self._record_exit("wait")
+        self._proc = None
+        return self._rescan()
+
+    def stats(self) -> dict:
+        return {
+            "pid": self.pid,
+            "scans": self.scans,
+            "checks": self.checks,
+            "repins": self.repins,
+            "last_detect_method": self.last_detect_method,
+            "last_detect_latency_ms": self.last_detect_latency_ms,
+        }
+
+    # -------------------------
+    # 内部処理
+    # -------------------------
+    def _rescan(self) -> bool:
+        """プロセス一覧を走査して対象を固定し直す。見つからなければ False"""
+        self.scans += 1
+        started = time.perf_counter()
+        found = None
+        try:
+            for p in psutil.process_iter(["name", "create_time"]):
+                name = p.info.get("name")
+                if name and name.lower() == self._target:
+                    found = p
+                    break
+        except Exception as e:
+            logging.warning(f"プロセス監視中に例外: {e}")
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        if found is None:
+            logging.debug("プロセス走査: %s なし (%.1f ms)", self.process_name, elapsed_ms)
+            return False
+
+        if self.scans > 1:
+            self.repins += 1
+        self._proc = found
+        self._last_alive = time.monotonic()
+        logging.info("プロセス監視: %s を固定しました (pid=%d, 走査 %.1f ms)",
+                     self.process_name, found.pid, elapsed_ms)
+        return True
+
+    def _record_exit(self, method: str) -> None:
+        """
+        終了検出の記録。wait は終了と同時に戻るので遅延はほぼ 0、
+        check は最後に生存を確認してからの経過時間が検出遅延の上限になる。
+        """
+        now = time.monotonic()
+        latency = 0.0 if method == "wait" or self._last_alive is None else (now - self._last_alive) * 1000.0
+        self.last_detect_method = method
+        self.last_detect_latency_ms = round(latency, 1)
+        logging.info("プロセス監視: %s (pid=%s) の終了を検出 (method=%s, 遅延<=%.0f ms)",
+                     self.process_name, self.pid, method, latency)
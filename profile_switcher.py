@@ -0,0 +1,162 @@
+# profile_switcher.py
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from scheduling import DeadlineWorker
+
+
+class ProfileSwitchController:
+    """
+    翻訳プロファイル切り替え（Next / Previous キー）の連打をまとめる。
+
+    - step() はすぐに preview(index) を呼んで表示だけ切り替え、ゆかコネへの反映は debounce_sec 待つ
+    - 待っている間に次のキーが来たら待ち直し、最後のプロファイルだけを apply(index, context) で反映する
+      context は最後の preview() の戻り値（表示を切り替えた時点の状態を反映時に使うため）
+    - 反映待ちのまま新しい切り替えが来たもの（まだ送っていないもの）は取り消す
+    - apply() はブロッキングなので submit() 経由で実行する（省略時は poll() を呼んだスレッドで実行）
+    """
+
+    def __init__(
+        self,
+        profile_count: Callable[[], int],
+        current_index: Callable[[], int],
+        preview: Callable[[int], object],
+        apply: Callable[[int, object], None],
+        submit: Optional[Callable] = None,
+        debounce_sec: float = 0.35,
+    ) -> None:
+        self._profile_count = profile_count
+        self._current_index = current_index
+        self._preview = preview
+        self._apply = apply
+        self._submit = submit
+        self.debounce_sec = max(0.0, float(debounce_sec))
+
+        self._lock = threading.Lock()
+        self._target: Optional[int] = None  # 反映待ちのプロファイル
+        self._deadline = 0.0
+        self._first_press = 0.0
+        self._generation = 0
+        self._context: object = None  # 最後の preview() の戻り値
+        self._previewing = 0  # 実行中の preview() の数（終わるまで反映しない）
+        self._pending_target: Optional[int] = None  # submit 済みでまだ反映していない切り替え先
+        self._worker: Optional[DeadlineWorker] = None
+        self._waker: Optional[Callable[[], None]] = None
+
+        # 統計
+        self.presses = 0
+        self.applied = 0
+        self.cancelled = 0
+
+    # -------------------------
+    # 公開 API
+    # -------------------------
+    def start(self, background: bool = True) -> None:
+        """反映用スレッドを開始。background=False の場合は呼び出し側が poll() を駆動する"""
+        if self._worker is not None:
+            return
+        if background:
+            self._worker = DeadlineWorker("ProfileSwitch", self.poll)
+            self.set_waker(self._worker.wake)
+            self._worker.start()
+
+    def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.stop()
+            self._worker = None
+
+    def set_waker(self, waker: Callable[[], None]) -> None:
+        self._waker = waker
+
+    def step(self, delta: int) -> int:
+        """現在（反映待ちがあればそれ）から delta 個ずらしたプロファイルへ切り替える"""
+        now = time.monotonic()
+        with self._lock:
+            count = self._profile_count()
+            base = self._target if self._target is not None else self._current_index()
+            target = (base + delta) % count
+            if self._target is None:
+                self._first_press = now
+            self._target = target
+            self._deadline = now + self.debounce_sec
+            self._generation += 1
+            generation = self._generation
+            self._context = None
+            self._previewing += 1
+            self.presses += 1
+        context = None
+        try:
+            context = self._preview(target)
+        finally:
+            with self._lock:
+                self._previewing -= 1
+                if generation == self._generation:
+                    self._context = context
+            if self._waker is not None:
+                self._waker()
+        return target
+
+    def poll(self) -> Optional[float]:
+        """待ち時間が過ぎた切り替えを反映し、次の期限（無ければ None）を返す"""
+        with self._lock:
+            if self._target is None:
+                return None
+            if time.monotonic() < self._deadline:
+                return self._deadline
+            if self._previewing:
+                # preview() の戻り値を待つ（終わったら step() が起こす）
+                return None
+            target, context = self._target, self._context
+            generation, first_press = self._generation, self._first_press
+            self._target = None
+            self._pending_target = target
+
+        if self._submit is not None:
+            self._submit(self._run_apply, target, context, generation, first_press)
+        else:
+            self._run_apply(target, context, generation, first_press)
+        return None
+
+    def discard_beyond(self, count: int) -> bool:
+        """
+        プロファイル数が count に減ったとき、範囲外の切り替え先を取り消す（config.json 再読み込み時）。
+        反映待ちのもの・submit 済みでまだ実行されていないものの両方が対象。取り消したら True
+        """
+        with self._lock:
+            if self._target is not None and self._target >= count:
+                self._target = None
+                self.cancelled += 1
+            elif self._pending_target is not None and self._pending_target >= count:
+                # submit 済みのものは _run_apply が世代の違いで取り消す（件数もそこで数える）
+                self._pending_target = None
+            else:
+                return False
+            self._generation += 1
+        logging.info("ProfileSwitch: プロファイル数の変更により反映待ちの切り替えを取り消しました")
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"presses": self.presses, "applied": self.applied, "cancelled": self.cancelled}
+
+    # -------------------------
+    # 内部処理
+    # -------------------------
+    def _run_apply(self, target: int, context: object, generation: int, first_press: float) -> None:
+        with self._lock:
+            if generation != self._generation:
+                # 送る前に次の切り替えが来た → 最後のものだけ送る
+                self.cancelled += 1
+                return
+            self._pending_target = None
+        try:
+            self._apply(target, context)
+        except Exception:
+            logging.exception("ProfileSwitch: apply failed")
+            return
+        with self._lock:
+            self.applied += 1
+        logging.info("プロファイル反映完了: index=%d（最初のキー入力から %.0f ms）",
+                     target, (time.monotonic() - first_press) * 1000.0)
@@ -0,0 +1,208 @@
+# profiling.py
+"""
+ホットパスの計測（任意で有効化）。
+
+- span("stage"): 処理段階ごとの所要時間を metrics.Histogram（bridge_stage_duration_seconds）に集計する。
+  無効時は何もしない共有オブジェクトを返すだけなので、呼び出し側に残しておいてよい。
+- ProfileCapture.capture(sec): sec 秒間だけ cProfile と tracemalloc を有効にし、log/ に結果を書く。
+  cProfile はスレッドごとなので、span に入ったスレッドでその都度プロファイラを有効にする
+  （計測対象は span で囲んだ処理とそこから呼ばれる関数）。
+
+  出力: log/profile-YYYY-MM-DD-hhmmss.pstats / .txt（上位関数）, log/tracemalloc-YYYY-MM-DD-hhmmss.txt
+"""
+import io
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+from metrics import Histogram
+
+STAGE_DURATION = Histogram(
+    "bridge_stage_duration_seconds", "Time spent per processing stage",
+    labelnames=("stage",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+
+_spans_enabled = False
+_capture = None  # 実行中の ProfileCapture
+_local = threading.local()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("stage", "start", "profiler")
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+        self.profiler = None
+
+    def __enter__(self):
+        capture = _capture
+        if capture is not None:
+            self.profiler = capture._enter_thread()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        STAGE_DURATION.observe(time.perf_counter() - self.start, stage=self.stage)
+        if self.profiler is not None:
+            _capture_exit_thread(self.profiler)
+        return False
+
+
+def span(stage: str):
+    """with span("xso.send"): ... の形で使う"""
+    if _spans_enabled or _capture is not None:
+        return _Span(stage)
+    return _NULL_SPAN
+
+
+def enable_spans(enabled: bool = True) -> None:
+    global _spans_enabled
+    _spans_enabled = bool(enabled)
+
+
+def stage_summary() -> dict:
+    """段階ごとの {count, avg_ms}（終了時のログ用）"""
+    counts, sums = {}, {}
+    for suffix, labels, value in STAGE_DURATION.collect()[3]:
+        if suffix == "_count":
+            counts[labels["stage"]] = value
+        elif suffix == "_sum":
+            sums[labels["stage"]] = value
+    return {
+        stage: {"count": int(n), "avg_ms": round(sums[stage] / n * 1000.0, 3) if n else 0.0}
+        for stage, n in sorted(counts.items())
+    }
+
+
+def _capture_exit_thread(profiler) -> None:
+    depth = getattr(_local, "depth", 1) - 1
+    _local.depth = depth
+    if depth == 0:
+        profiler.disable()
+
+
+class ProfileCapture:
+    """時間を区切った cProfile + tracemalloc の取得（同時に1つだけ）"""
+
+    def __init__(self, log_dir: str) -> None:
+        self.log_dir = log_dir
+        self._lock = threading.Lock()
+        self._profilers = []
+        self._token = None  # 取得1回ごとの目印（前回の取得で作ったスレッドのプロファイラを使い回さない）
+
+    def capture(self, duration_sec: float = 30.0, background: bool = True) -> bool:
+        """取得を開始する。既に実行中なら False"""
+        global _capture
+        with self._lock:
+            if _capture is not None:
+                logging.info("プロファイル取得は実行中です")
+                return False
+            self._profilers = []
+            self._token = object()
+            _capture = self
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+        logging.info(f"プロファイル取得開始: {duration_sec} 秒")
+        if background:
+            threading.Thread(target=self._finish_after, args=(duration_sec,), name="profile-capture", daemon=True).start()
+        else:
+            self._finish_after(duration_sec)
+        return True
+
+    # -------------------------
+    # 内部処理
+    # -------------------------
+    def _enter_thread(self):
+        """span に入ったスレッドのプロファイラを有効にする（入れ子の span では何もしない）"""
+        profiler = getattr(_local, "profiler", None)
+        token = self._token
+        if profiler is None or getattr(_local, "owner", None) is not token:
+            import cProfile
+            profiler = cProfile.Profile()
+            _local.profiler = profiler
+            _local.owner = token
+            _local.depth = 0
+            with self._lock:
+                self._profilers.append(profiler)
+        if _local.depth == 0:
+            try:
+                profiler.enable()
+            except ValueError:
+                # 別のプロファイラが動いている（Python 3.12 以降の cProfile は全スレッド共通で1つだけ）
+                return None
+        _local.depth += 1
+        return profiler
+
+    def _finish_after(self, duration_sec: float) -> None:
+        global _capture
+        time.sleep(max(0.0, float(duration_sec)))
+        with self._lock:
+            _capture = None
+            profilers = list(self._profilers)
+            self._profilers = []
+        # span の途中で抜けたスレッドのプロファイラが止まるのを少し待つ
+        time.sleep(0.2)
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        tracemalloc.stop()
+
+        os.makedirs(self.log_dir, exist_ok=True)
+        ts = datetime.now().strftime("%Y-%m-%d-%H%M%S")
+        try:
+            self._write_profile(profilers, os.path.join(self.log_dir, f"profile-{ts}"))
+            if snapshot is not None:
+                self._write_tracemalloc(snapshot, os.path.join(self.log_dir, f"tracemalloc-{ts}.txt"))
+        except Exception:
+            logging.exception("プロファイル結果の書き込みに失敗")
+
+    @staticmethod
+    def _write_profile(profilers, base: str) -> None:
+        import pstats
+
+        stats = None
+        for profiler in profilers:
+            profiler.disable()
+            try:
+                if stats is None:
+                    stats = pstats.Stats(profiler)
+                else:
+                    stats.add(profiler)
+            except TypeError:
+                # 一度も有効にならなかったプロファイラ（統計なし）
+                continue
+        if stats is None:
+            logging.info("プロファイル取得終了: 計測対象の処理は実行されませんでした")
+            return
+        stats.dump_stats(base + ".pstats")
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats("cumulative").print_stats(40)
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(out.getvalue())
+        logging.info(f"プロファイル取得終了: {base}.pstats / .txt（{len(profilers)} スレッド）")
+
+    @staticmethod
+    def _write_tracemalloc(snapshot, path: str) -> None:
+        top = snapshot.statistics("lineno")
+        total = sum(s.size for s in top)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"total: {total / 1024:.1f} KiB in {len(top)} locations\n\n")
+            for s in top[:50]:
+                f.write(f"{s}\n")
+        logging.info(f"tracemalloc スナップショット: {path}")
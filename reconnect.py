@@ -0,0 +1,178 @@
+# reconnect.py
+import logging
+import random
+import threading
+import time
+
+
+class ReconnectPolicy:
+    """
+    WebSocket 再接続の待ち時間（XSOverlay・翻訳ログ WebSocket 共通、thread / asyncio 両モード）。
+
+    - 失敗が続くたびに base_delay_sec の 2 倍ずつ延ばし、max_delay_sec で頭打ちにする
+    - 待ち時間には jitter（割合）ぶんのゆらぎを入れ、相手の再起動時に一斉に繋ぎに行かない
+    - stable_sec 以上つながっていた接続が切れた場合は、待ち時間を最初からやり直す
+    - 再接続の試行回数と切断していた時間を集計する
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_delay_sec: float = 5.0,
+        max_delay_sec: float = 60.0,
+        stable_sec: float = 30.0,
+        jitter: float = 0.3,
+    ) -> None:
+        self.name = name
+        self.base_delay_sec = max(0.1, float(base_delay_sec))
+        self.max_delay_sec = max(self.base_delay_sec, float(max_delay_sec))
+        self.stable_sec = max(0.0, float(stable_sec))
+        self.jitter = min(max(0.0, float(jitter)), 1.0)
+
+        self._lock = threading.Lock()
+        self._failures = 0  # 連続失敗回数（待ち時間の計算用）
+        self._connected_at = None
+        self._down_since = None
+
+        # 統計
+        self.attempts = 0
+        self.connects = 0
+        self.downtime_total_sec = 0.0
+        self.last_downtime_sec = 0.0
+
+    @classmethod
+    def from_config(cls, name: str, config: dict) -> "ReconnectPolicy":
+        """config.json の WS_RECONNECT_DELAY_SEC / WS_MAX_RECONNECT_SEC / WS_STABLE_SEC から作る"""
+        return cls(
+            name,
+            base_delay_sec=config.get("WS_RECONNECT_DELAY_SEC", 5),
+            max_delay_sec=config.get("WS_MAX_RECONNECT_SEC", 60),
+            stable_sec=config.get("WS_STABLE_SEC", 30),
+        )
+
+    def connected(self) -> None:
+        """接続が確立したときに呼ぶ"""
+        now = time.monotonic()
+        with self._lock:
+            self.connects += 1
+            self._connected_at = now
+            if self._down_since is None:
+                return
+            downtime = now - self._down_since
+            self._down_since = None
+            self.last_downtime_sec = downtime
+            self.downtime_total_sec += downtime
+            failures = self._failures
+        logging.info("%s: 再接続しました（切断 %.1f 秒、試行 %d 回）", self.name, downtime, failures)
+
+    def disconnected(self) -> None:
+        """接続が切れた（または接続に失敗した）ときに呼ぶ"""
+        now = time.monotonic()
+        with self._lock:
+            if self._connected_at is not None:
+                if now - self._connected_at >= self.stable_sec:
+                    self._failures = 0
+                self._connected_at = None
+            if self._down_since is None:
+                self._down_since = now
+
+    def next_delay(self) -> float:
+        """次の再接続までの待ち秒数を返す（呼ぶたびに試行回数を数える）"""
+        with self._lock:
+            self.attempts += 1
+            exponent = min(self._failures, 16)
+            self._failures += 1
+        delay = min(self.max_delay_sec, self.base_delay_sec * (2 ** exponent))
+        return delay * (1.0 - self.jitter * random.random())
+
+    def stats(self) -> dict:
+        with self._lock:
+            down = 0.0 if self._down_since is None else time.monotonic() - self._down_since
+            return {
+                "connected": self._connected_at is not None,
+                "connects": self.connects,
+                "attempts": self.attempts,
+                "consecutive_failures": self._failures,
+                "downtime_total_sec": round(self.downtime_total_sec + down, 1),
+                "last_downtime_sec": round(self.last_downtime_sec, 1),
+            }
+
+
+class LinkHealth:
+    """
+    接続の生存状況（pong 受信・切断・エラー・送信失敗）を記録する。
+
+    ping/pong のタイムアウト自体は WebSocket ライブラリが検出して切断するので、ここでは
+    送信失敗が max_send_failures 回続いたときに on_dead(reason) を1回だけ呼ぶ（接続し直すまで再通知しない）。
+    """
+
+    def __init__(self, name: str, max_send_failures: int = 3, on_dead=None) -> None:
+        self.name = name
+        self.max_send_failures = max(1, int(max_send_failures))
+        self.on_dead = on_dead
+
+        self._lock = threading.Lock()
+        self._send_failures = 0  # 連続送信失敗回数
+        self._dead_reported = False
+        self.last_pong = None  # monotonic
+
+        # 統計
+        self.opens = 0
+        self.closes = 0
+        self.errors = 0
+        self.pongs = 0
+        self.send_failures_total = 0
+        self.dead_reports = 0
+        self.last_error = None
+
+    def opened(self) -> None:
+        with self._lock:
+            self.opens += 1
+            self._send_failures = 0
+            self._dead_reported = False
+
+    def closed(self) -> None:
+        with self._lock:
+            self.closes += 1
+
+    def error(self, err) -> None:
+        with self._lock:
+            self.errors += 1
+            self.last_error = str(err)
+
+    def pong(self) -> None:
+        with self._lock:
+            self.pongs += 1
+            self.last_pong = time.monotonic()
+
+    def send_ok(self) -> None:
+        with self._lock:
+            self._send_failures = 0
+
+    def send_failed(self, err) -> None:
+        with self._lock:
+            self._send_failures += 1
+            self.send_failures_total += 1
+            self.last_error = str(err)
+            report = self._send_failures >= self.max_send_failures and not self._dead_reported
+            if report:
+                self._dead_reported = True
+                self.dead_reports += 1
+        if report:
+            logging.warning("%s: 送信失敗が %d 回続いたため接続を張り直します", self.name, self.max_send_failures)
+            if self.on_dead is not None:
+                self.on_dead("send_failures")
+
+    def stats(self) -> dict:
+        with self._lock:
+            since_pong = None if self.last_pong is None else round(time.monotonic() - self.last_pong, 1)
+            return {
+                "opens": self.opens,
+                "closes": self.closes,
+                "errors": self.errors,
+                "pongs": self.pongs,
+                "sec_since_pong": since_pong,
+                "send_failures": self.send_failures_total,
+                "dead_reports": self.dead_reports,
+                "last_error": self.last_error,
+            }
@@ -0,0 +1,302 @@
+# scheduling.py
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+
+class DeadlineWorker:
+    """
+    期限駆動のワーカースレッド。
+
+    poll() を呼び、戻り値（次に処理すべき時刻 = time.monotonic() 基準、無ければ None）まで眠る。
+    None の間は wake() されるまで完全に待機し、定期的には起きない。
+    新しい仕事が入ったら wake() で起こす（先に wake() されていた場合は待たずに poll() する）。
+    """
+
+    def __init__(self, name: str, poll: Callable[[], Optional[float]]) -> None:
+        self.name = name
+        self._poll = poll
+        self._cond = threading.Condition()
+        self._woken = False
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def wake(self) -> None:
+        """poll() を即座に再実行させる（任意のスレッドから呼べる）"""
+        with self._cond:
+            self._woken = True
+            self._cond.notify()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            try:
+                deadline = self._poll()
+            except Exception:
+                logging.exception("%s: poll failed", self.name)
+                deadline = None
+
+            with self._cond:
+                while not self._stop and not self._woken:
+                    if deadline is None:
+                        self._cond.wait()
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                if self._stop:
+                    return
+                self._woken = False
+
+
+class AdaptivePoller:
+    """
+    状態確認（ポーリング）の間隔を状況に合わせて変える。
+
+    - boost() されたら（キー操作・再接続など）fast_window_sec の間は fast_sec 間隔で確認する
+    - その後は間隔を backoff 倍ずつ延ばし、idle_sec で頭打ちにする
+    - check() が None（相手に繋がらない）を返したら高速ポーリングをやめ、idle_sec 間隔の再確認だけにする
+    - check() が True（ずれを検出して補正した）を返したら、外部で操作されている可能性が高いので boost する
+
+    poll() / set_waker() は DeadlineWorker・AsyncBridgeRuntime.add_deadline_job 用。
+    check() はブロッキングなので、submit を渡した場合はそちらで実行する。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        check: Callable[[], Optional[bool]],
+        fast_sec: float = 1.5,
+        fast_window_sec: float = 20.0,
+        idle_sec: float = 60.0,
+        backoff: float = 2.0,
+        submit: Optional[Callable] = None,
+    ) -> None:
+        self.name = name
+        self._check = check
+        self.fast_sec = max(0.1, float(fast_sec))
+        self.idle_sec = max(self.fast_sec, float(idle_sec))
+        self.fast_window_sec = max(0.0, float(fast_window_sec))
+        self.backoff = max(1.0, float(backoff))
+        self._submit = submit
+
+        self._lock = threading.Lock()
+        self._interval = self.fast_sec
+        self._fast_until = 0.0
+        # 最初の boost() まではポーリングしない（初期化完了前に確認しないため）
+        self._next: Optional[float] = None
+        self._running = False
+        self._paused = False
+        self._worker: Optional[DeadlineWorker] = None
+        self._waker: Optional[Callable[[], None]] = None
+
+        # 統計
+        self.polls = 0
+        self.errors = 0
+        self.drift_corrections = 0
+        self.boosts = 0
+        self._interval_total = 0.0
+        self._last_poll_at: Optional[float] = None
+
+    def start(self, background: bool = True) -> None:
+        """確認用スレッドを開始。background=False の場合は呼び出し側が poll() を駆動する"""
+        if self._worker is not None:
+            return
+        if background:
+            self._worker = DeadlineWorker(self.name, self.poll)
+            self.set_waker(self._worker.wake)
+            self._worker.start()
+
+    def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.stop()
+            self._worker = None
+
+    def set_waker(self, waker: Callable[[], None]) -> None:
+        self._waker = waker
+
+    def boost(self, reason: str = "") -> None:
+        """しばらく高速ポーリングに戻す（停止中なら再開する）"""
+        now = time.monotonic()
+        with self._lock:
+            self.boosts += 1
+            self._fast_until = now + self.fast_window_sec
+            self._interval = self.fast_sec
+            self._paused = False
+            if not self._running:
+                due = now + self.fast_sec
+                if self._next is None or due < self._next:
+                    self._next = due
+        logging.debug("%s: boost (%s)", self.name, reason)
+        if self._waker is not None:
+            self._waker()
+
+    def poll(self) -> Optional[float]:
+        with self._lock:
+            if self._running or self._next is None:
+                return None
+            if time.monotonic() < self._next:
+                return self._next
+            self._running = True
+            self._next = None
+
+        if self._submit is not None:
+            self._submit(self._run_check)
+            return None
+        self._run_check()
+        with self._lock:
+            return self._next
+
+    def stats(self) -> dict:
+        with self._lock:
+            intervals = self.polls - 1
+            return {
+                "interval_sec": round(self._interval, 2),
+                "avg_interval_sec": round(self._interval_total / intervals, 2) if intervals > 0 else 0.0,
+                "paused": self._paused,
+                "polls": self.polls,
+                "errors": self.errors,
+                "drift_corrections": self.drift_corrections,
+                "boosts": self.boosts,
+            }
+
+    def _run_check(self) -> None:
+        try:
+            result = self._check()
+        except Exception as e:
+            logging.warning("%s: check failed: %s", self.name, e)
+            result = None
+
+        now = time.monotonic()
+        with self._lock:
+            self.polls += 1
+            if self._last_poll_at is not None:
+                self._interval_total += now - self._last_poll_at
+            self._last_poll_at = now
+
+            if result is None:
+                self.errors += 1
+                if not self._paused:
+                    logging.info("%s: 応答が無いため高速ポーリングを停止します", self.name)
+                self._paused = True
+                self._interval = self.idle_sec
+            else:
+                if result:
+                    self.drift_corrections += 1
+                    self._fast_until = now + self.fast_window_sec
+                self._paused = False
+                if now < self._fast_until:
+                    self._interval = self.fast_sec
+                else:
+                    self._interval = min(self._interval * self.backoff, self.idle_sec)
+            self._next = now + self._interval
+            self._running = False
+
+        if self._submit is not None and self._waker is not None:
+            self._waker()
+
+
+class IntervalJob:
+    """
+    interval_sec() 秒ごとに func() を呼ぶ。interval_sec() が 0 以下の間は止まっている。
+
+    間隔は呼ぶたびに interval_sec() から読み直すので、設定を変えたら reschedule() するだけで
+    次回から新しい間隔になる（スレッドやタスクを作り直さない）。
+    poll() / set_waker() は DeadlineWorker・AsyncBridgeRuntime.add_deadline_job 用。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        interval_sec: Callable[[], float],
+        func: Callable[[], None],
+        submit: Optional[Callable] = None,
+    ) -> None:
+        self.name = name
+        self._interval_sec = interval_sec
+        self._func = func
+        self._submit = submit
+
+        self._lock = threading.Lock()
+        self._next: Optional[float] = None
+        self._interval = 0.0
+        self._worker: Optional[DeadlineWorker] = None
+        self._waker: Optional[Callable[[], None]] = None
+
+        # 統計
+        self.runs = 0
+
+    def start(self, background: bool = True) -> None:
+        """実行用スレッドを開始。background=False の場合は呼び出し側が poll() を駆動する"""
+        if self._worker is not None:
+            return
+        if background:
+            self._worker = DeadlineWorker(self.name, self.poll)
+            self.set_waker(self._worker.wake)
+            self._worker.start()
+
+    def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.stop()
+            self._worker = None
+
+    def set_waker(self, waker: Callable[[], None]) -> None:
+        self._waker = waker
+
+    def reschedule(self) -> None:
+        """間隔を読み直し、今から数え直す"""
+        with self._lock:
+            self._next = None
+        if self._waker is not None:
+            self._waker()
+
+    def poll(self) -> Optional[float]:
+        now = time.monotonic()
+        interval = float(self._interval_sec() or 0)
+        with self._lock:
+            if interval != self._interval:
+                if interval <= 0:
+                    logging.info("%s は無効 (interval<=0)", self.name)
+                else:
+                    logging.info("%s: %.0f 秒ごと", self.name, interval)
+                self._interval = interval
+                self._next = None
+            if interval <= 0:
+                self._next = None
+                return None
+            if self._next is None:
+                self._next = now + interval
+                return self._next
+            if now < self._next:
+                return self._next
+            self._next = now + interval
+            self.runs += 1
+            next_deadline = self._next
+
+        if self._submit is not None:
+            self._submit(self._run)
+        else:
+            self._run()
+        return next_deadline
+
+    def _run(self) -> None:
+        try:
+            self._func()
+        except Exception:
+            logging.exception("%s failed", self.name)
@@ -0,0 +1,112 @@
+# startup.py
+"""
+起動時間の計測と、起動処理の並行実行。
+
+- StartupTimeline.phase(name): 段階ごとの開始時刻（プロセス起動から）と所要時間を記録する
+- StartupTimeline.mark(name): 「XSOverlay 接続」「初期表示送信」などの到達時刻を記録する（最初の1回だけ）
+- StartupTimeline.run_parallel(): 互いに依存しない段階をスレッドで同時に実行して全部終わるのを待つ
+- wait_until(): 固定の sleep の代わりに、条件が満たされるまで短い間隔で確認する
+
+起動完了時に report() をログへ出すので、起動が遅くなったときにどの段階かを追える。
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+# このモジュールを最初に読み込んだ時刻（ほぼプロセス起動時刻）
+PROCESS_START = time.perf_counter()
+
+
+class StartupTimeline:
+    def __init__(self, origin: Optional[float] = None) -> None:
+        self.origin = PROCESS_START if origin is None else origin
+        self._lock = threading.Lock()
+        self._phases = []  # (名前, 開始秒, 所要秒, スレッド名, 成否)
+        self._marks: Dict[str, float] = {}
+        self._reported = False
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self._phases.append((name, start - self.origin, end - start, threading.current_thread().name, ok))
+
+    def mark(self, name: str) -> None:
+        """到達時刻を記録する（再接続などで2回目以降に呼ばれても最初の時刻を残す）"""
+        now = time.perf_counter() - self.origin
+        with self._lock:
+            self._marks.setdefault(name, now)
+
+    def elapsed(self, name: str) -> Optional[float]:
+        with self._lock:
+            return self._marks.get(name)
+
+    def run_parallel(self, steps: Dict[str, Callable[[], None]]) -> Dict[str, Optional[BaseException]]:
+        """
+        steps の各処理を別スレッドで同時に実行し、すべて終わるまで待つ。
+        戻り値: 名前 -> 発生した例外（成功なら None）。例外はログに出すだけで他の段階は止めない。
+        """
+        errors: Dict[str, Optional[BaseException]] = {}
+
+        def run(name: str, func: Callable[[], None]) -> None:
+            try:
+                with self.phase(name):
+                    func()
+                errors[name] = None
+            except BaseException as e:
+                logging.exception(f"起動処理 {name} に失敗しました")
+                errors[name] = e
+
+        threads = [
+            threading.Thread(target=run, args=(name, func), name=f"startup-{name}", daemon=True)
+            for name, func in steps.items()
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return errors
+
+    def report(self) -> str:
+        with self._lock:
+            phases = sorted(self._phases, key=lambda p: p[1])
+            marks = sorted(self._marks.items(), key=lambda m: m[1])
+        lines = ["起動時間:"]
+        for name, start, duration, thread, ok in phases:
+            status = "" if ok else " (失敗)"
+            lines.append(f"  {name:<20} +{start * 1000:7.0f} ms  {duration * 1000:7.0f} ms  [{thread}]{status}")
+        for name, at in marks:
+            lines.append(f"  * {name:<18} +{at * 1000:7.0f} ms")
+        return "\n".join(lines)
+
+    def log_once(self) -> bool:
+        """report() を1回だけ INFO で出す。既に出していれば False"""
+        with self._lock:
+            if self._reported:
+                return False
+            self._reported = True
+        logging.info(self.report())
+        return True
+
+
+def wait_until(check: Callable[[], object], timeout_sec: float, interval_sec: float = 0.1):
+    """
+    check() が例外を出さずに値を返すまで interval_sec ごとに呼び直す（最大 timeout_sec）。
+    戻り値: check() の結果。期限までに成功しなければ最後の例外をそのまま投げる。
+    """
+    deadline = time.monotonic() + max(0.0, float(timeout_sec))
+    while True:
+        try:
+            return check()
+        except Exception:
+            if time.monotonic() + interval_sec > deadline:
+                raise
+        time.sleep(interval_sec)
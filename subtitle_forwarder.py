@@ -0,0 +1,177 @@
+# subtitle_forwarder.py
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from scheduling import DeadlineWorker
+
+
+def pick_translation(texts: dict, profile: dict) -> Optional[str]:
+    """
+    翻訳ログの Texts（言語キー -> 文字列）から、プロファイルの翻訳先言語の文字列を選ぶ。
+    完全一致 → 主言語（"en-US" と "en"）の一致 → 認識言語以外の最初のキー、の順で探す。
+    """
+    source = str(profile.get("recognition_language") or "").lower()
+    target = str((profile.get("translation_param") or {}).get("language") or "").lower()
+    if target:
+        target_main = target.split("-", 1)[0]
+        fallback = None
+        for lang, text in texts.items():
+            key = lang.lower()
+            if key == target:
+                return text
+            if fallback is None and key.split("-", 1)[0] == target_main:
+                fallback = text
+        if fallback is not None:
+            return fallback
+    for lang, text in texts.items():
+        if lang.lower() != source:
+            return text
+    return None
+
+
+class SubtitleForwarder:
+    """
+    翻訳ログ WebSocket の訳文を XSOverlay 通知（字幕）として流す。
+
+    - 有効なのは現在のプロファイルの xso_notification が true のときだけ
+    - 認識途中（Fixed=false）の更新は debounce_sec 待ってから出す。更新が続いても max_wait_sec で出す
+    - 新しいメッセージ（別 MessageID を含む）が来たら未送信のものは捨てて置き換える
+    - 送信は max_fps 回/秒まで。確定した文（Fixed=true）も間隔を空けて出す
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], None],
+        profile_provider: Callable[[], dict],
+        debounce_sec: float = 0.4,
+        max_wait_sec: float = 1.5,
+        max_fps: float = 1.0,
+    ) -> None:
+        self._send = send
+        self._profile_provider = profile_provider
+        self.debounce_sec = max(0.0, float(debounce_sec))
+        self.max_wait_sec = max(self.debounce_sec, float(max_wait_sec))
+        self.min_interval = 1.0 / float(max_fps) if max_fps and max_fps > 0 else 0.0
+
+        self._lock = threading.Lock()
+        # 未送信の字幕: (msg_id, text, deadline, 受付時刻 monotonic)
+        self._pending: Optional[tuple] = None
+        self._pending_since = 0.0
+        self._last_sent_at = float("-inf")
+        self._last_sent_text: Optional[str] = None
+        self._worker: Optional[DeadlineWorker] = None
+        self._waker: Optional[Callable[[], None]] = None
+
+        # 統計
+        self.offered = 0
+        self.superseded = 0
+        self.duplicates = 0
+        self.sent = 0
+        self._latency_total_ms = 0.0
+        self._latency_max_ms = 0.0
+
+    # -------------------------
+    # 公開 API
+    # -------------------------
+    def start(self, background: bool = True) -> None:
+        """送信スレッドを開始。background=False の場合は呼び出し側が poll() を駆動する"""
+        if self._worker is not None:
+            return
+        if background:
+            self._worker = DeadlineWorker("SubtitleForwarder", self.poll)
+            self.set_waker(self._worker.wake)
+            self._worker.start()
+
+    def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.stop()
+            self._worker = None
+
+    def set_waker(self, waker: Callable[[], None]) -> None:
+        self._waker = waker
+
+    def offer(self, msg: dict) -> None:
+        """
+        TranslationLogger の内部形式（MsgID / Fixed / Texts）のメッセージを受け取る。
+        受信スレッドから呼ばれるので、選別と置き換えだけして即座に戻る。
+        """
+        profile = self._profile_provider()
+        if not profile.get("xso_notification", False):
+            return
+        text = pick_translation(msg.get("Texts") or {}, profile)
+        if not text:
+            return
+
+        now = time.monotonic()
+        msg_id = msg.get("MsgID")
+        with self._lock:
+            self.offered += 1
+            pending = self._pending
+            if pending is not None:
+                self.superseded += 1
+                if pending[0] != msg_id:
+                    # 別の発話に切り替わったら待ち時間の起点もリセット
+                    self._pending_since = now
+            else:
+                if text == self._last_sent_text:
+                    self.duplicates += 1
+                    return
+                self._pending_since = now
+
+            if msg.get("Fixed"):
+                deadline = now
+            else:
+                deadline = min(now + self.debounce_sec, self._pending_since + self.max_wait_sec)
+            deadline = max(deadline, self._last_sent_at + self.min_interval)
+            self._pending = (msg_id, text, deadline, now)
+            wake = pending is None or deadline < pending[2]
+
+        if wake and self._waker is not None:
+            self._waker()
+
+    def poll(self) -> Optional[float]:
+        """期限が来た字幕を送り、次の期限（無ければ None）を返す"""
+        now = time.monotonic()
+        with self._lock:
+            pending = self._pending
+            if pending is None:
+                return None
+            _msg_id, text, deadline, received_at = pending
+            if now < deadline:
+                return deadline
+            self._pending = None
+            if text == self._last_sent_text:
+                self.duplicates += 1
+                return None
+            self._last_sent_text = text
+            self._last_sent_at = now
+
+        # 待っている間にプロファイルが切り替わった場合は出さない
+        if not self._profile_provider().get("xso_notification", False):
+            return None
+        try:
+            self._send(text)
+        except Exception as e:
+            logging.error(f"字幕の送信に失敗: {e}")
+            return None
+        elapsed_ms = (time.monotonic() - received_at) * 1000.0
+        with self._lock:
+            self.sent += 1
+            self._latency_total_ms += elapsed_ms
+            if elapsed_ms > self._latency_max_ms:
+                self._latency_max_ms = elapsed_ms
+        return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            avg = self._latency_total_ms / self.sent if self.sent else 0.0
+            return {
+                "offered": self.offered,
+                "superseded": self.superseded,
+                "duplicates": self.duplicates,
+                "sent": self.sent,
+                "latency_avg_ms": round(avg, 2),
+                "latency_max_ms": round(self._latency_max_ms, 2),
+            }
@@ -0,0 +1,181 @@
+# test_bridge.py
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import profile_switcher
+import yukacone_sequencer
+import YncneoXSOBridge as bridge
+from config_reload import ProfileTable
+
+
+@pytest.fixture
+def no_client(monkeypatch):
+    monkeypatch.setattr(bridge, "yukacone_client", None)
+    yield
+    if bridge.yukacone_client is not None:
+        bridge.yukacone_client.close()
+
+
+@pytest.mark.usefixtures("no_client")
+def test_call_without_client_is_skipped():
+    assert bridge.call_yukacone_api("http://127.0.0.1:1", "/mute-status", {}) == (False, None)
+
+
+@pytest.mark.usefixtures("no_client")
+def test_init_client_reuses_same_endpoint():
+    config = {"yukacone_endpoint": "http://127.0.0.1:1/", "YUKACONE_API_TIMEOUTS": {"/mute-on": 3}}
+    client = bridge.init_yukacone_client(config)
+    assert client.timeouts["/mute-on"] == (3.0, 3.0)
+    assert bridge.init_yukacone_client(config) is client
+    # 別のエンドポイントを指定したクライアントでは呼ばない
+    assert bridge.call_yukacone_api("http://127.0.0.1:2", "/mute-status", {}) == (False, None)
+
+
+class FakeYukacone:
+    """ゆかコネAPI の代わり: ignore_mute なら mute-on/off を受け付けても状態を変えない"""
+
+    def __init__(self, muted=True):
+        self.muted = muted
+        self.ignore_mute = False
+        self.calls = []
+
+    def call(self, base_url, path, params):
+        self.calls.append(path)
+        if path == "/mute-status":
+            return True, "true" if self.muted else "false"
+        if path in ("/mute-on", "/mute-off") and not self.ignore_mute:
+            self.muted = path == "/mute-on"
+        return True, "OK"
+
+
+class FakeSender:
+    def __init__(self):
+        self.titles = []
+
+    def submit_status(self, payload):
+        frame = json.loads(payload)
+        self.titles.append(json.loads(frame["jsonData"])["title"])
+
+
+@pytest.fixture
+def env(clock, monkeypatch):
+    """ブリッジの状態を起動直後（ミュート中・プロファイル0）にし、裏の処理は jobs に積んで手で実行する"""
+    config = {
+        "yukacone_endpoint": "http://127.0.0.1:1",
+        "PROFILE_SWITCH_DEBOUNCE_SEC": 0.35,
+        "YUKACONE_PARAM_SETTLE_SEC": 0.5,
+        "translation_profiles": [
+            {"name": f"P{i}", "recognition_language": "ja", "xso_notification": False,
+             "translation_param": {"slot": 1, "language": lang, "engine": "google"}}
+            for i, lang in enumerate(("en", "ko", "fr"))
+        ],
+    }
+    yukacone = FakeYukacone()
+    sender = FakeSender()
+    jobs = []
+    monkeypatch.setattr(yukacone_sequencer, "time", clock)
+    monkeypatch.setattr(profile_switcher, "time", clock)
+    monkeypatch.setattr(bridge, "call_yukacone_api", yukacone.call)
+    monkeypatch.setattr(bridge, "submit_background", lambda func, *args: jobs.append((func, args)))
+    monkeypatch.setattr(bridge, "xso_sender", sender)
+    monkeypatch.setattr(bridge, "profile_table", ProfileTable.from_config(config, "app"))
+    for name, value in (("runtime", None), ("yukacone_sequencer", None), ("mute_poller", None),
+                        ("profile_switcher", None), ("is_muted", True), ("mute_generation", 0),
+                        ("pending_mute_generation", None), ("last_mute_status_ok", True),
+                        ("current_translation_index", 0), ("last_recognition_language", "ja"),
+                        ("tray_status", bridge.tray_status)):
+        monkeypatch.setattr(bridge, name, value)
+
+    def run_jobs():
+        while jobs:
+            func, args = jobs.pop(0)
+            func(*args)
+
+    return SimpleNamespace(config=config, yukacone=yukacone, sender=sender, jobs=jobs, run_jobs=run_jobs)
+
+
+def test_toggle_mute_shows_new_state_before_api_call(env):
+    bridge.toggle_mute(env.config)
+    # 表示は API を呼ぶ前に切り替わる
+    assert env.sender.titles == ["Online"]
+    assert env.yukacone.calls == []
+    assert bridge.pending_mute_generation == bridge.mute_generation
+
+    env.run_jobs()
+    assert env.yukacone.calls[0] == "/mute-off"
+    assert env.yukacone.muted is False
+    assert bridge.is_muted is False
+    assert bridge.pending_mute_generation is None
+    assert env.sender.titles == ["Online"]
+
+
+def test_toggle_mute_rolls_back_when_not_applied(env):
+    env.yukacone.ignore_mute = True
+    bridge.toggle_mute(env.config)
+    env.run_jobs()
+    # 反映待ちの期限まで食い違ったままなら実際の状態へ戻す
+    assert bridge.is_muted is True
+    assert env.sender.titles == ["Online", "Mute"]
+
+
+def test_second_toggle_supersedes_first(env):
+    bridge.toggle_mute(env.config)
+    bridge.toggle_mute(env.config)
+    assert env.sender.titles == ["Online", "Mute"]
+    env.run_jobs()
+    # 古い操作は API を呼ばずに取り消され、最後の操作だけが反映・確認される
+    assert env.yukacone.calls == ["/mute-on", "/mute-status"]
+    assert bridge.is_muted is True and env.yukacone.muted is True
+
+
+def test_mute_sync_does_not_correct_pending_toggle(env):
+    bridge.toggle_mute(env.config)
+    # 反映前の mute-status（まだ true）で表示を戻さない
+    assert bridge.mute_sync_once(env.config) is False
+    assert bridge.is_muted is False
+    env.run_jobs()
+    env.yukacone.muted = True  # ゆかコネ側の UI で操作された
+    assert bridge.mute_sync_once(env.config) is True
+    assert env.sender.titles == ["Online", "Mute"]
+
+
+def test_profile_switch_unmutes_after_debounce(env, clock):
+    switcher = bridge.init_profile_switcher(env.config, background=False)
+    bridge.handle_media_action(env.config, "next")
+    assert env.sender.titles == ["Online"]
+    clock.advance(0.35)
+    switcher.poll()
+    assert env.yukacone.calls[:2] == ["/setTranslationParam", "/mute-status"]
+    assert "/mute-off" in env.yukacone.calls
+    assert bridge.is_muted is False and env.yukacone.muted is False
+    assert bridge.pending_mute_generation is None
+
+
+def test_toggle_inside_debounce_window_keeps_mute(env, clock):
+    switcher = bridge.init_profile_switcher(env.config, background=False)
+    bridge.handle_media_action(env.config, "next")
+    clock.advance(0.1)
+    bridge.handle_media_action(env.config, "toggle_mute")
+    assert env.sender.titles == ["Online", "Mute"]
+    env.run_jobs()  # トグルの mute-on が先に反映される
+    clock.advance(0.35)
+    switcher.poll()
+    # 切り替えの反映は後から来たミュート操作を取り消さない
+    assert "/setTranslationParam" in env.yukacone.calls
+    assert "/mute-off" not in env.yukacone.calls
+    assert bridge.is_muted is True and env.yukacone.muted is True
+    assert env.sender.titles[-1] == "Mute"
+
+
+def test_media_key_is_handled_on_loop_not_worker(env, monkeypatch):
+    calls = []
+    fake_runtime = SimpleNamespace(
+        call_soon=lambda func, *args: calls.append(("loop", func, args)),
+        submit=lambda func, *args: calls.append(("worker", func, args)),
+    )
+    monkeypatch.setattr(bridge, "runtime", fake_runtime)
+    bridge.dispatch_media_action(env.config, "toggle_mute")
+    # ワーカーがプロファイル反映で埋まっていてもキー操作を待たせない
+    assert calls == [("loop", bridge.handle_media_action, (env.config, "toggle_mute"))]
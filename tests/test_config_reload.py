@@ -0,0 +1,118 @@
+# test_config_reload.py
+import json
+import os
+
+import pytest
+
+import config_reload
+from config_reload import ConfigError, ConfigWatcher, ProfileTable, changed_keys, drop_invalid_optional, validate_config
+
+
+def profile(name="JA->EN", language="en", slot=1):
+    return {
+        "name": name,
+        "recognition_language": "ja",
+        "translation_param": {"slot": slot, "language": language, "engine": "google"},
+        "xso_notification": True,
+    }
+
+
+def base_config(**extra):
+    config = {"translation_profiles": [profile()], "XSO_RECONNECT_INTERVAL_SEC": 5}
+    config.update(extra)
+    return config
+
+
+def test_validate_config_accepts_valid():
+    validate_config(base_config(HEADLESS=True, YUKACONE_POLL_MAX=None))
+
+
+@pytest.mark.parametrize(
+    "extra",
+    [
+        {"translation_profiles": []},
+        {"XSO_RECONNECT_INTERVAL_SEC": "5"},
+        {"XSO_RECONNECT_INTERVAL_SEC": -1},
+        {"MUTE_SYNC_POLL_MAX": True},
+        {"HEADLESS": "false"},
+        {"debug": 1},
+        {"XSO_RECONNECT_HOTKEY": ["ctrl", "r"]},
+    ],
+)
+def test_validate_config_rejects(extra):
+    with pytest.raises(ConfigError):
+        validate_config(base_config(**extra))
+
+
+def test_startup_drops_invalid_optional_keys():
+    config = base_config(debug=1, FLUSH_INTERVAL_SEC="5", XSO_RECONNECT_INTERVAL_SEC=-1, HEADLESS=True)
+    warnings = drop_invalid_optional(config)
+    assert len(warnings) == 3
+    # 不正なキーだけ取り除いて既定値に任せる（起動は止めない）
+    assert config == {"translation_profiles": [profile()], "HEADLESS": True}
+    validate_config(config)
+    assert drop_invalid_optional(config) == []
+
+
+def test_profile_table_from_config():
+    table = ProfileTable.from_config(base_config(translation_profiles=[profile(), profile("JA->KO", "ko", 2)]), "app")
+    assert len(table) == 2
+    assert table[1].translation_params == {"slot": 2, "language": "ko", "engine": "google"}
+    assert table[1].api_key() == ("ja", 2, "ko", "google")
+    assert table[0].info()["name"] == "JA->EN"
+
+
+def test_profile_table_rejects_bad_profile():
+    bad = profile()
+    bad["translation_param"]["slot"] = "1"
+    with pytest.raises(ConfigError):
+        ProfileTable.from_config(base_config(translation_profiles=[bad]), "app")
+
+
+def test_changed_keys_splits_reloadable():
+    old = base_config(DEBUG_PORT=1, yukacone_endpoint="http://a")
+    new = base_config(DEBUG_PORT=2, XSO_RECONNECT_INTERVAL_SEC=10)
+    assert changed_keys(old, new) == (["XSO_RECONNECT_INTERVAL_SEC"], ["DEBUG_PORT"])
+    assert changed_keys(old, dict(old)) == ([], [])
+
+
+@pytest.fixture
+def watched(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(config_reload, "time", clock)
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(base_config()), encoding="utf-8")
+    loaded = []
+    watcher = ConfigWatcher(str(path), loaded.append, interval_sec=1.0, settle_sec=0.3)
+
+    def rewrite(text):
+        path.write_text(text, encoding="utf-8")
+        st = os.stat(path)
+        # 更新時刻の粒度に左右されないよう、書くたびに進める
+        rewrite.mtime_ns += 10**9
+        os.utime(path, ns=(st.st_atime_ns, rewrite.mtime_ns))
+
+    rewrite.mtime_ns = os.stat(path).st_mtime_ns
+    return watcher, rewrite, loaded
+
+
+def test_watcher_reloads_after_settle(watched, clock):
+    watcher, rewrite, loaded = watched
+    assert watcher.poll() == pytest.approx(clock.now + 1.0)
+    rewrite(json.dumps(base_config(XSO_RECONNECT_INTERVAL_SEC=7)))
+    assert watcher.poll() == pytest.approx(clock.now + 0.3)
+    assert loaded == []
+    clock.advance(0.31)
+    watcher.poll()
+    assert [c["XSO_RECONNECT_INTERVAL_SEC"] for c in loaded] == [7]
+    assert watcher.stats()["reloads"] == 1
+
+
+def test_watcher_rejects_invalid_json(watched, clock):
+    watcher, rewrite, loaded = watched
+    rewrite("{not json")
+    watcher.poll()
+    clock.advance(0.31)
+    watcher.poll()
+    assert loaded == []
+    stats = watcher.stats()
+    assert stats["rejected"] == 1 and stats["last_error"]
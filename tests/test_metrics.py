@@ -0,0 +1,75 @@
+# test_metrics.py
+import urllib.request
+
+from metrics import Counter, Gauge, Histogram, MetricsServer, Registry, family
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        h.observe(value)
+    assert h.snapshot() == (4, 3.65)
+    _, kind, _, samples = h.collect()
+    assert kind == "histogram"
+    assert [(s, l.get("le"), v) for s, l, v in samples] == [
+        ("_bucket", "0.1", 2),  # 上限ちょうどの値は含む
+        ("_bucket", "1", 3),
+        ("_bucket", "+Inf", 4),
+        ("_sum", None, 3.65),
+        ("_count", None, 4),
+    ]
+
+
+def test_labels_are_separate_series():
+    c = Counter("frames_total", "Frames", labelnames=("source",))
+    c.inc(source="ws")
+    c.inc(2, source="ws")
+    c.inc(source="http")
+    assert c.value(source="ws") == 3
+    assert c.value(source="http") == 1
+    assert c.value(source="other") == 0
+    g = Gauge("queue_depth", "Depth")
+    g.set(5)
+    g.set(2)
+    assert g.value() == 2
+
+
+def test_render_text_format():
+    registry = Registry()
+    h = registry.register(Histogram("settle_seconds", "Settle\ntime", labelnames=("step",), buckets=(0.5,)))
+    h.observe(0.25, step='a"b')
+    registry.add_collector(lambda: [family("uptime_seconds", "gauge", "Uptime", 12.5)])
+    assert registry.render() == (
+        "# HELP settle_seconds Settle\\ntime\n"
+        "# TYPE settle_seconds histogram\n"
+        'settle_seconds_bucket{step="a\\"b",le="0.5"} 1\n'
+        'settle_seconds_bucket{step="a\\"b",le="+Inf"} 1\n'
+        'settle_seconds_sum{step="a\\"b"} 0.25\n'
+        'settle_seconds_count{step="a\\"b"} 1\n'
+        "# HELP uptime_seconds Uptime\n"
+        "# TYPE uptime_seconds gauge\n"
+        "uptime_seconds 12.5\n"
+    )
+
+
+def test_failing_collector_is_skipped():
+    registry = Registry()
+    registry.register(Counter("ok_total", "Ok")).inc()
+
+    def broken():
+        raise RuntimeError("boom")
+
+    registry.add_collector(broken)
+    assert "ok_total 1" in registry.render()
+
+
+def test_metrics_server():
+    registry = Registry()
+    registry.register(Gauge("up", "Up")).set(1)
+    server = MetricsServer(registry, 0).start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as res:
+            assert res.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert "up 1" in res.read().decode("utf-8")
+    finally:
+        server.stop()
@@ -0,0 +1,121 @@
+# test_platform_backends.py
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+import platform_backends
+from platform_backends import (
+    ConfigPortSource,
+    ControlApiInput,
+    EnvPortSource,
+    NullStatus,
+    PynputInput,
+    TrayStatus,
+    create_inputs,
+    create_status_display,
+    discover_ports,
+    is_headless,
+)
+
+
+def test_config_port_source():
+    assert ConfigPortSource().read({"YUKACONE_HTTP_PORT": "15520", "YUKACONE_WS_PORT": 50000}) == (15520, 50000)
+
+
+def test_config_port_source_missing_or_invalid():
+    with pytest.raises(ValueError):
+        ConfigPortSource().read({"YUKACONE_HTTP_PORT": 15520})
+    with pytest.raises(ValueError):
+        ConfigPortSource().read({"YUKACONE_HTTP_PORT": "abc", "YUKACONE_WS_PORT": 1})
+
+
+def test_env_port_source(monkeypatch):
+    monkeypatch.setenv("YUKACONE_HTTP_PORT", "15520")
+    monkeypatch.setenv("YUKACONE_WS_PORT", "50001")
+    assert EnvPortSource().read({}) == (15520, 50001)
+    monkeypatch.delenv("YUKACONE_WS_PORT")
+    with pytest.raises(ValueError):
+        EnvPortSource().read({})
+
+
+def test_discover_ports_falls_back_in_order(monkeypatch):
+    monkeypatch.delenv("YUKACONE_HTTP_PORT", raising=False)
+    monkeypatch.delenv("YUKACONE_WS_PORT", raising=False)
+    config = {"PORT_SOURCE": ["env", "config"], "YUKACONE_HTTP_PORT": 1, "YUKACONE_WS_PORT": 2}
+    assert discover_ports(config) == (1, 2)
+    with pytest.raises(ValueError):
+        discover_ports({"PORT_SOURCE": "env"})
+
+
+@pytest.mark.parametrize("value, expected", [(True, True), (False, False), ("false", False), ("no", False), (1, False)])
+def test_is_headless_accepts_only_true(value, expected):
+    assert is_headless({"HEADLESS": value}) is expected
+
+
+def test_defaults_headless():
+    config = {"HEADLESS": True}
+    inputs = create_inputs(config, {})
+    assert [type(b) for b in inputs] == [ControlApiInput]
+    assert isinstance(create_status_display(config, "app", on_exit=lambda: None), NullStatus)
+
+
+def test_defaults_desktop():
+    inputs = create_inputs({}, {})
+    assert [type(b) for b in inputs] == [PynputInput]
+    assert isinstance(create_status_display({}, "app", on_exit=lambda: None), TrayStatus)
+
+
+def test_explicit_backends_override_headless():
+    config = {"HEADLESS": True, "INPUT_BACKEND": ["pynput", "control_api"], "STATUS_BACKEND": "none"}
+    assert [b.name for b in create_inputs(config, {})] == ["pynput", "control_api"]
+    assert create_inputs({"INPUT_BACKEND": "none"}, {}) == []
+
+
+@pytest.fixture
+def control_api():
+    calls = []
+    actions = {"toggle_mute": lambda source: calls.append(("toggle_mute", source))}
+    api = ControlApiInput({"CONTROL_API_PORT": 0}, actions, status_provider=lambda: {"muted": True})
+    api.start()
+    try:
+        yield api, calls
+    finally:
+        api.stop()
+
+
+def _request(api, path, method="GET", headers=None):
+    req = urllib.request.Request(f"http://127.0.0.1:{api.port}{path}", method=method, headers=headers or {})
+    with urllib.request.urlopen(req, timeout=5) as res:
+        return res.status, json.loads(res.read())
+
+
+def test_control_api_post_action(control_api):
+    api, calls = control_api
+    assert _request(api, "/toggle_mute", method="POST") == (200, {"ok": True, "action": "toggle_mute"})
+    assert calls == [("toggle_mute", "control_api")]
+
+
+def test_control_api_rejects_origin(control_api):
+    api, calls = control_api
+    with pytest.raises(urllib.error.HTTPError) as e:
+        _request(api, "/toggle_mute", method="POST", headers={"Origin": "http://example.com"})
+    assert e.value.code == 403
+    assert calls == []
+
+
+def test_control_api_unknown_action(control_api):
+    api, _ = control_api
+    with pytest.raises(urllib.error.HTTPError) as e:
+        _request(api, "/nope", method="POST")
+    assert e.value.code == 404
+
+
+def test_control_api_status(control_api):
+    api, _ = control_api
+    assert _request(api, "/status") == (200, {"muted": True})
+
+
+def test_to_pynput_hotkey():
+    assert platform_backends.to_pynput_hotkey("alt+ctrl+v") == "<alt>+<ctrl>+v"
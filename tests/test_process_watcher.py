@@ -0,0 +1,65 @@
+# test_process_watcher.py
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from process_watcher import ProcessWatcher
+
+pytestmark = pytest.mark.skipif(shutil.which("sleep") is None, reason="sleep コマンドが必要")
+
+
+@pytest.fixture
+def target(tmp_path):
+    """他と名前が重ならない監視対象プロセスを起動する"""
+    name = f"yxw{os.getpid() % 100000}"
+    exe = tmp_path / name
+    shutil.copy(shutil.which("sleep"), exe)
+    procs = []
+
+    def spawn():
+        p = subprocess.Popen([str(exe), "30"])
+        procs.append(p)
+        return p
+
+    spawn.name = name
+    yield spawn
+    for p in procs:
+        p.kill()
+        p.wait()
+
+
+def test_not_running(target):
+    watcher = ProcessWatcher(target.name)
+    assert watcher.is_alive() is False
+    assert watcher.wait_exit(timeout=0) is False
+    assert watcher.pid is None
+
+
+def test_pins_pid_and_detects_exit(target):
+    proc = target()
+    watcher = ProcessWatcher(target.name.upper())  # 大文字小文字は区別しない
+    assert watcher.is_alive() is True
+    assert watcher.pid == proc.pid
+    assert watcher.is_alive() is True
+    assert watcher.stats()["scans"] == 1  # 固定後は走査しない
+
+    assert watcher.wait_exit(timeout=0.05) is True
+    proc.kill()
+    assert watcher.wait_exit(timeout=5) is False
+    assert watcher.stats()["last_detect_method"] == "wait"
+    assert watcher.stats()["last_detect_latency_ms"] == 0.0
+
+
+def test_repins_new_process_with_same_name(target):
+    first = target()
+    watcher = ProcessWatcher(target.name)
+    assert watcher.is_alive() is True
+    first.kill()
+    first.wait()
+    second = target()
+    assert watcher.is_alive() is True
+    assert watcher.pid == second.pid
+    stats = watcher.stats()
+    assert (stats["repins"], stats["last_detect_method"]) == (1, "check")
@@ -0,0 +1,108 @@
+# test_profile_switcher.py
+import pytest
+
+import profile_switcher
+from profile_switcher import ProfileSwitchController
+
+
+@pytest.fixture
+def switcher(clock, monkeypatch):
+    monkeypatch.setattr(profile_switcher, "time", clock)
+    state = {"count": 4, "index": 0, "previews": [], "applied": [], "submitted": []}
+
+    def preview(index):
+        state["index"] = index
+        state["previews"].append(index)
+        return f"ctx{len(state['previews'])}"
+
+    def make(submit=False):
+        return ProfileSwitchController(
+            profile_count=lambda: state["count"],
+            current_index=lambda: state["index"],
+            preview=preview,
+            apply=lambda index, context: state["applied"].append((index, context)),
+            submit=(lambda func, *args: state["submitted"].append((func, args))) if submit else None,
+            debounce_sec=0.35,
+        )
+
+    return make, state
+
+
+def test_rapid_presses_apply_only_last(switcher, clock):
+    make, state = switcher
+    sw = make()
+    sw.step(+1)
+    clock.advance(0.2)
+    sw.step(+1)
+    clock.advance(0.2)
+    assert sw.poll() == pytest.approx(clock.now + 0.15)  # 最後のキーから待ち直している
+    sw.step(-1)
+    assert state["previews"] == [1, 2, 1]
+    clock.advance(0.35)
+    assert sw.poll() is None
+    # 最後の preview() の戻り値を反映に渡す
+    assert state["applied"] == [(1, "ctx3")]
+    assert sw.stats() == {"presses": 3, "applied": 1, "cancelled": 0}
+
+
+def test_wraps_around(switcher):
+    make, state = switcher
+    sw = make()
+    assert sw.step(-1) == 3
+    assert sw.step(+2) == 1
+
+
+def test_submitted_apply_cancelled_by_newer_press(switcher, clock):
+    make, state = switcher
+    sw = make(submit=True)
+    sw.step(+1)
+    clock.advance(0.35)
+    sw.poll()
+    sw.step(+1)  # 送る前に次の切り替え
+    func, args = state["submitted"][0]
+    func(*args)
+    assert state["applied"] == []
+    assert sw.stats()["cancelled"] == 1
+
+
+def test_discard_beyond_pending_target(switcher):
+    make, state = switcher
+    sw = make()
+    sw.step(+3)
+    assert sw.discard_beyond(4) is False
+    assert sw.discard_beyond(2) is True
+    assert sw.poll() is None
+    assert state["applied"] == []
+    assert sw.stats()["cancelled"] == 1
+
+
+def test_discard_beyond_submitted_target(switcher, clock):
+    make, state = switcher
+    sw = make(submit=True)
+    sw.step(+3)
+    clock.advance(0.35)
+    sw.poll()
+    assert sw.discard_beyond(2) is True
+    func, args = state["submitted"][0]
+    func(*args)
+    assert state["applied"] == []
+    assert sw.stats()["cancelled"] == 1
+
+
+def test_apply_waits_for_running_preview(clock, monkeypatch):
+    monkeypatch.setattr(profile_switcher, "time", clock)
+    applied = []
+    wakes = []
+    sw = ProfileSwitchController(
+        profile_count=lambda: 3,
+        current_index=lambda: 0,
+        preview=lambda index: sw.poll() or "ctx",  # 表示の切り替え中に期限が来た
+        apply=lambda index, context: applied.append((index, context)),
+        debounce_sec=0.0,
+    )
+    sw.set_waker(lambda: wakes.append(1))
+    sw.step(+1)
+    assert applied == []
+    assert wakes == [1]
+    sw.poll()
+    assert applied == [(1, "ctx")]
@@ -0,0 +1,80 @@
+# test_reconnect.py
+import pytest
+
+import reconnect
+from reconnect import LinkHealth, ReconnectPolicy
+
+
+@pytest.fixture
+def no_jitter(monkeypatch):
+    monkeypatch.setattr(reconnect.random, "random", lambda: 0.0)
+
+
+def test_backoff_doubles_until_max(no_jitter):
+    policy = ReconnectPolicy("t", base_delay_sec=1, max_delay_sec=5)
+    assert [policy.next_delay() for _ in range(5)] == [1, 2, 4, 5, 5]
+    assert policy.stats()["attempts"] == 5
+
+
+def test_jitter_only_shortens(monkeypatch):
+    monkeypatch.setattr(reconnect.random, "random", lambda: 1.0)
+    policy = ReconnectPolicy("t", base_delay_sec=10, jitter=0.3)
+    assert policy.next_delay() == pytest.approx(7.0)
+
+
+def test_stable_connection_resets_backoff(no_jitter, clock, monkeypatch):
+    monkeypatch.setattr(reconnect, "time", clock)
+    policy = ReconnectPolicy("t", base_delay_sec=1, max_delay_sec=60, stable_sec=30)
+    policy.disconnected()
+    for _ in range(3):
+        policy.next_delay()
+    clock.advance(7)
+    policy.connected()
+    assert policy.stats()["last_downtime_sec"] == 7.0
+
+    # すぐ切れた接続では待ち時間を戻さない
+    clock.advance(5)
+    policy.disconnected()
+    assert policy.next_delay() == 8
+
+    policy.connected()
+    clock.advance(30)
+    policy.disconnected()
+    assert policy.next_delay() == 1
+
+
+def test_from_config():
+    policy = ReconnectPolicy.from_config("t", {"WS_RECONNECT_DELAY_SEC": 2, "WS_MAX_RECONNECT_SEC": 9, "WS_STABLE_SEC": 3})
+    assert (policy.base_delay_sec, policy.max_delay_sec, policy.stable_sec) == (2, 9, 3)
+
+
+def test_link_health_reports_dead_once():
+    reasons = []
+    health = LinkHealth("t", max_send_failures=2, on_dead=reasons.append)
+    health.send_failed("e1")
+    health.send_ok()
+    health.send_failed("e2")
+    assert reasons == []
+    health.send_failed("e3")
+    health.send_failed("e4")
+    assert reasons == ["send_failures"]
+    # 接続し直したら再び通知する
+    health.opened()
+    health.send_failed("e5")
+    health.send_failed("e6")
+    assert reasons == ["send_failures", "send_failures"]
+
+
+def test_link_health_stats(clock, monkeypatch):
+    monkeypatch.setattr(reconnect, "time", clock)
+    health = LinkHealth("t")
+    assert health.stats()["sec_since_pong"] is None
+    health.opened()
+    health.pong()
+    clock.advance(2.5)
+    health.error("timeout")
+    health.closed()
+    stats = health.stats()
+    assert (stats["opens"], stats["closes"], stats["errors"], stats["pongs"]) == (1, 1, 1, 1)
+    assert stats["sec_since_pong"] == 2.5
+    assert stats["last_error"] == "timeout"
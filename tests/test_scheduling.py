@@ -0,0 +1,181 @@
+# test_scheduling.py
+import threading
+import time
+
+import pytest
+
+import scheduling
+from scheduling import AdaptivePoller, DeadlineWorker, IntervalJob
+
+
+@pytest.fixture
+def fake_time(clock, monkeypatch):
+    # DeadlineWorker のテストは実時間で動かすので、使うテストだけに付ける
+    monkeypatch.setattr(scheduling, "time", clock)
+
+
+def test_deadline_worker_sleeps_until_woken():
+    polled = threading.Event()
+    calls = []
+
+    def poll():
+        calls.append(time.monotonic())
+        polled.set()
+        return None
+
+    worker = DeadlineWorker("t", poll)
+    worker.start()
+    try:
+        assert polled.wait(2)
+        polled.clear()
+        # 期限が無い間は定期的に起きない
+        assert not polled.wait(0.2)
+        worker.wake()
+        assert polled.wait(2)
+        assert len(calls) == 2
+    finally:
+        worker.stop()
+
+
+def test_deadline_worker_runs_at_deadline():
+    calls = []
+    done = threading.Event()
+
+    def poll():
+        calls.append(time.monotonic())
+        if len(calls) == 2:
+            done.set()
+            return None
+        return time.monotonic() + 0.1
+
+    worker = DeadlineWorker("t", poll)
+    worker.start()
+    try:
+        assert done.wait(2)
+        assert calls[1] - calls[0] >= 0.09
+    finally:
+        worker.stop()
+
+
+def test_deadline_worker_survives_poll_exception():
+    calls = []
+    done = threading.Event()
+
+    def poll():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("x")
+        done.set()
+
+    worker = DeadlineWorker("t", poll)
+    worker.start()
+    try:
+        worker.wake()
+        assert done.wait(2)
+    finally:
+        worker.stop()
+
+
+def run_due(poller, clock):
+    """次の期限まで時間を進めて poll() する"""
+    deadline = poller.poll()
+    assert deadline is not None
+    clock.now = max(clock.now, deadline)
+    return poller.poll()
+
+
+@pytest.mark.usefixtures("fake_time")
+def test_poller_idle_until_first_boost(clock):
+    calls = []
+    poller = AdaptivePoller("p", lambda: calls.append(1) or False)
+    clock.advance(1000)
+    assert poller.poll() is None
+    assert calls == []
+
+
+@pytest.mark.usefixtures("fake_time")
+def test_poller_backs_off_after_fast_window(clock):
+    poller = AdaptivePoller("p", lambda: False, fast_sec=1, fast_window_sec=3, idle_sec=8)
+    poller.boost("test")
+    intervals = []
+    for _ in range(7):
+        run_due(poller, clock)
+        intervals.append(poller.stats()["interval_sec"])
+    assert intervals == [1, 1, 2, 4, 8, 8, 8]
+
+
+@pytest.mark.usefixtures("fake_time")
+def test_poller_drift_boosts_and_error_pauses(clock):
+    results = iter([True, None])
+    poller = AdaptivePoller("p", lambda: next(results), fast_sec=1, fast_window_sec=1, idle_sec=60)
+    poller.boost()
+    run_due(poller, clock)
+    stats = poller.stats()
+    assert stats["drift_corrections"] == 1
+    assert stats["interval_sec"] == 1  # ずれを見つけたので高速の期間を延ばす
+
+    run_due(poller, clock)
+    stats = poller.stats()
+    assert stats["paused"] is True
+    assert stats["errors"] == 1
+    assert stats["interval_sec"] == 60
+
+
+@pytest.mark.usefixtures("fake_time")
+def test_poller_check_exception_counts_as_error(clock):
+    def boom():
+        raise RuntimeError("x")
+
+    poller = AdaptivePoller("p", boom, fast_sec=1)
+    poller.boost()
+    run_due(poller, clock)
+    assert poller.stats()["errors"] == 1
+
+
+@pytest.mark.usefixtures("fake_time")
+def test_interval_job_runs_and_reschedules(clock):
+    runs = []
+    config = {"interval": 10}
+    job = IntervalJob("j", lambda: config["interval"], lambda: runs.append(clock.now))
+    start = clock.now
+    assert job.poll() == start + 10
+    clock.advance(10)
+    assert job.poll() == start + 20
+    assert runs == [start + 10]
+
+    # 間隔を変えたら次回から新しい間隔で数え直す
+    config["interval"] = 3
+    clock.advance(1)
+    assert job.poll() == clock.now + 3
+    config["interval"] = 0
+    assert job.poll() is None
+    clock.advance(100)
+    assert job.poll() is None
+    assert job.runs == 1
+
+
+@pytest.mark.usefixtures("fake_time")
+def test_interval_job_reschedule_and_submit(clock):
+    submitted = []
+    woken = []
+    job = IntervalJob("j", lambda: 5, lambda: None, submit=submitted.append)
+    job.set_waker(lambda: woken.append(1))
+    job.poll()
+    clock.advance(2)
+    job.reschedule()
+    assert woken == [1]
+    assert job.poll() == clock.now + 5
+    clock.advance(5)
+    job.poll()
+    assert len(submitted) == 1
+
+
+@pytest.mark.usefixtures("fake_time")
+def test_interval_job_survives_exception(clock):
+    def boom():
+        raise RuntimeError("x")
+
+    job = IntervalJob("j", lambda: 1, boom)
+    job.poll()
+    clock.advance(1)
+    assert job.poll() == clock.now + 1
@@ -0,0 +1,79 @@
+# test_startup.py
+import logging
+import threading
+
+import pytest
+
+import startup
+from startup import StartupTimeline, wait_until
+
+
+def test_phases_and_marks(clock, monkeypatch, caplog):
+    monkeypatch.setattr(startup, "time", clock)
+    timeline = StartupTimeline(origin=clock.now)
+    clock.advance(0.1)
+    with timeline.phase("config"):
+        clock.advance(0.05)
+    with pytest.raises(RuntimeError):
+        with timeline.phase("ports"):
+            clock.advance(0.02)
+            raise RuntimeError("x")
+    timeline.mark("xso_connected")
+    clock.advance(1)
+    timeline.mark("xso_connected")  # 再接続では最初の時刻のまま
+    assert timeline.elapsed("xso_connected") == pytest.approx(0.17)
+    assert timeline.elapsed("missing") is None
+
+    report = timeline.report().splitlines()
+    assert report[0] == "起動時間:"
+    assert report[1].split()[:3] == ["config", "+", "100"]
+    assert report[2].endswith("(失敗)")
+    assert report[3].split()[:2] == ["*", "xso_connected"]
+
+    with caplog.at_level(logging.INFO):
+        assert timeline.log_once() is True
+        assert timeline.log_once() is False
+    assert len([r for r in caplog.records if r.getMessage().startswith("起動時間:")]) == 1
+
+
+def test_run_parallel_runs_steps_concurrently():
+    timeline = StartupTimeline()
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fail():
+        barrier.wait()
+        raise ValueError("bad")
+
+    errors = timeline.run_parallel({"a": barrier.wait, "b": fail})
+    # 両方が同時に走らないと barrier を抜けられない
+    assert errors["a"] is None
+    assert isinstance(errors["b"], ValueError)
+    threads = {line.split()[0]: line for line in timeline.report().splitlines()[1:]}
+    assert "[startup-a]" in threads["a"] and threads["b"].endswith("(失敗)")
+
+
+def test_wait_until_retries_until_success(clock, monkeypatch):
+    monkeypatch.setattr(startup, "time", clock)
+    results = iter([OSError("not yet"), OSError("not yet"), "ready"])
+
+    def check():
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    start = clock.now
+    assert wait_until(check, timeout_sec=1.0, interval_sec=0.1) == "ready"
+    assert clock.now - start == pytest.approx(0.2)
+
+
+def test_wait_until_raises_last_error_at_timeout(clock, monkeypatch):
+    monkeypatch.setattr(startup, "time", clock)
+    calls = []
+
+    def check():
+        calls.append(clock.now)
+        raise OSError(f"attempt {len(calls)}")
+
+    with pytest.raises(OSError, match="attempt 5"):
+        wait_until(check, timeout_sec=0.45, interval_sec=0.1)
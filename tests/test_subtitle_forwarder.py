@@ -0,0 +1,85 @@
+# test_subtitle_forwarder.py
+import pytest
+
+import subtitle_forwarder
+from subtitle_forwarder import SubtitleForwarder, pick_translation
+
+PROFILE = {"recognition_language": "ja", "translation_param": {"language": "en-US"}, "xso_notification": True}
+
+
+@pytest.mark.parametrize(
+    "texts, expected",
+    [
+        ({"ja": "あ", "en": "a", "en-US": "a-us"}, "a-us"),
+        ({"ja": "あ", "EN": "a"}, "a"),  # 主言語の一致
+        ({"ja": "あ", "ko": "k"}, "k"),  # 認識言語以外の最初のキー
+        ({"ja": "あ"}, None),
+    ],
+)
+def test_pick_translation(texts, expected):
+    assert pick_translation(texts, PROFILE) == expected
+
+
+@pytest.fixture
+def forwarder(clock, monkeypatch):
+    monkeypatch.setattr(subtitle_forwarder, "time", clock)
+    sent = []
+    profile = dict(PROFILE)
+    fwd = SubtitleForwarder(sent.append, lambda: profile, debounce_sec=0.4, max_wait_sec=1.0, max_fps=2.0)
+    fwd.set_waker(lambda: None)
+    fwd.start(background=False)
+    return fwd, sent, profile
+
+
+def msg(msg_id, text, fixed=False):
+    return {"MsgID": msg_id, "Fixed": fixed, "Texts": {"ja": "原文", "en-US": text}}
+
+
+def test_partial_updates_are_debounced(forwarder, clock):
+    fwd, sent, _ = forwarder
+    fwd.offer(msg("a", "Hel"))
+    clock.advance(0.3)
+    fwd.offer(msg("a", "Hello"))
+    assert fwd.poll() == pytest.approx(clock.now + 0.4)
+    clock.advance(0.4)
+    assert fwd.poll() is None
+    assert sent == ["Hello"]
+    assert fwd.stats()["superseded"] == 1
+
+
+def test_continuous_updates_flush_at_max_wait(forwarder, clock):
+    fwd, sent, _ = forwarder
+    for i in range(6):
+        fwd.offer(msg("a", "x" * (i + 1)))
+        clock.advance(0.2)
+        fwd.poll()
+    assert sent == ["xxxxx"]  # 最初の更新から 1.0 秒で出す
+
+
+def test_fixed_is_sent_now_but_rate_limited(forwarder, clock):
+    fwd, sent, _ = forwarder
+    fwd.offer(msg("a", "one", fixed=True))
+    fwd.poll()
+    fwd.offer(msg("b", "two", fixed=True))
+    assert fwd.poll() == pytest.approx(clock.now + 0.5)  # max_fps=2
+    clock.advance(0.5)
+    fwd.poll()
+    assert sent == ["one", "two"]
+
+
+def test_duplicates_and_disabled_profile(forwarder, clock):
+    fwd, sent, profile = forwarder
+    fwd.offer(msg("a", "same", fixed=True))
+    fwd.poll()
+    clock.advance(1)
+    fwd.offer(msg("a", "same", fixed=True))
+    assert fwd.poll() is None
+    assert fwd.stats()["duplicates"] == 1
+
+    fwd.offer(msg("b", "waiting"))
+    profile["xso_notification"] = False  # 待っている間に通知なしのプロファイルへ切り替え
+    clock.advance(1)
+    fwd.poll()
+    fwd.offer(msg("c", "ignored", fixed=True))
+    assert fwd.poll() is None
+    assert sent == ["same"]
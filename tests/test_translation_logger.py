@@ -0,0 +1,127 @@
+# test_translation_logger.py
+import json
+import os
+
+import pytest
+
+import translation_logger
+from translation_logger import TranslationLogger
+
+
+@pytest.fixture
+def make_logger(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(translation_logger, "time", clock)
+    created = []
+
+    def make(**kwargs):
+        kwargs.setdefault("stable_sec", 10.0)
+        kwargs.setdefault("fixed_grace_sec", 1.0)
+        logger = TranslationLogger(base_dir=str(tmp_path), log_format="jsonl", frame_log_interval=0, **kwargs)
+        logger.start(background=False)
+        created.append(logger)
+        return logger
+
+    yield make
+    for logger in created:
+        logger.stop()
+
+
+def read_records(logger):
+    logger.stop()
+    path = os.path.join(logger.log_dir, logger.log_filename)
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def msg(msg_id, text, fixed=False, talker="A"):
+    return {"MessageID": msg_id, "textList": {"ja": text}, "fixedText": fixed, "talkerName": talker}
+
+
+def test_multiple_messages_in_flight(make_logger, clock):
+    logger = make_logger()
+    logger.add_yukacone_message(msg("a", "あ"))
+    clock.advance(1)
+    logger.add_yukacone_message(msg("b", "い", talker="B"))
+    clock.advance(1)
+    # 古い ID への遅れた訂正も取り込む
+    logger.add_yukacone_message(msg("a", "あいう"))
+    assert logger.pending_count() == 2
+
+    clock.advance(9)  # b は最後の更新から 10 秒、a は 9 秒
+    logger.poll()
+    assert logger.pending_count() == 1
+    clock.advance(1)
+    assert logger.poll() is None
+
+    records = read_records(logger)
+    assert [(r["msg_id"], r["texts"]["ja"], r["reason"]) for r in records] == [
+        ("b", "い", "stable_timeout"),
+        ("a", "あいう", "stable_timeout"),
+    ]
+
+
+def test_poll_returns_earliest_deadline(make_logger, clock):
+    logger = make_logger()
+    logger.add_yukacone_message(msg("a", "x"))
+    logger.add_yukacone_message(msg("b", "y", fixed=True))
+    assert logger.poll() == pytest.approx(clock.now + 1.0)
+
+
+def test_fixed_commits_after_grace(make_logger, clock):
+    logger = make_logger()
+    logger.add_yukacone_message(msg("a", "x", fixed=True))
+    clock.advance(0.5)
+    logger.poll()
+    assert logger.pending_count() == 1
+    clock.advance(0.5)
+    logger.poll()
+    assert [r["reason"] for r in read_records(logger)] == ["fixed"]
+
+
+def test_capacity_commits_earliest(make_logger, clock):
+    logger = make_logger(max_inflight=2)
+    logger.add_yukacone_message(msg("a", "1"))
+    clock.advance(1)
+    logger.add_yukacone_message(msg("b", "2"))
+    logger.add_yukacone_message(msg("c", "3"))
+    assert logger.pending_count() == 2
+    records = read_records(logger)
+    assert (records[0]["msg_id"], records[0]["reason"]) == ("a", "capacity")
+
+
+def test_resend_of_committed_message_is_dropped(make_logger, clock):
+    seen = []
+    logger = make_logger(fixed_grace_sec=0.0, message_listener=lambda m: seen.append(m["Texts"]["ja"]))
+    logger.add_yukacone_message(msg("a", "x", fixed=True))
+    logger.add_yukacone_message(msg("a", "x", fixed=True))  # 保持中の同一内容
+    logger.poll()
+    logger.add_yukacone_message(msg("a", "x", fixed=True))  # 確定済みへの同一内容の再送
+    assert logger.pending_count() == 0
+    # 確定済みでも内容が違えば新しく保持する
+    logger.add_yukacone_message(msg("a", "xy", fixed=True))
+    logger.poll()
+
+    assert [r["texts"]["ja"] for r in read_records(logger)] == ["x", "xy"]
+    assert seen == ["x", "xy"]
+
+
+def test_raw_frame_list_and_invalid_messages(make_logger):
+    logger = make_logger()
+    frame = json.dumps([msg("a", "x"), {"MessageID": "b", "textList": {}}, {"textList": {"ja": "no id"}}])
+    logger.add_raw_frame(frame.encode("utf-8"))
+    assert logger.pending_count() == 1
+    assert logger.frames_received == 1
+
+
+def test_raw_frame_bytes_with_invalid_utf8(make_logger):
+    logger = make_logger()
+    frame = json.dumps(msg("a", "x")).encode("utf-8").replace(b'"x"', b'"x\xff"')
+    logger.add_raw_frame(bytearray(frame))
+    assert logger.pending_count() == 1
+    assert logger.bytes_received == len(frame)
+
+
+def test_stop_commits_remaining(make_logger):
+    logger = make_logger()
+    logger.add_yukacone_message(msg("a", "x"))
+    assert [r["reason"] for r in read_records(logger)] == ["shutdown"]
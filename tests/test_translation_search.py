@@ -0,0 +1,92 @@
+# test_translation_search.py
+import json
+
+import pytest
+
+import translation_search
+from translation_search import ingest, open_db, parse_jsonl_line, parse_legacy_line, search
+
+
+def jsonl(first_seen, texts, talker="Alice", msg_id="m1"):
+    return json.dumps({"msg_id": msg_id, "first_seen": first_seen, "elapsed_ms": 1200, "reason": "fixed",
+                       "talker": talker, "fixed": True, "texts": texts, "profile": {"index": 0}},
+                      ensure_ascii=False) + "\n"
+
+
+@pytest.fixture
+def db(tmp_path):
+    conn = open_db(str(tmp_path / "index.sqlite3"))
+    yield conn
+    conn.close()
+
+
+def test_parse_legacy_line_keeps_commas_in_text():
+    rec = parse_legacy_line("20250101-12:34:56789,3,ja:こんにちは、元気,です,en:Hello, how are you")
+    assert rec["first_seen"] == "2025-01-01T12:34:56.789"
+    assert rec["elapsed_ms"] == 3000
+    assert rec["texts"] == {"ja": "こんにちは、元気,です", "en": "Hello, how are you"}
+    assert parse_legacy_line("broken") is None
+    assert parse_legacy_line("x,y,ja:a") is None
+
+
+def test_parse_jsonl_line():
+    rec = parse_jsonl_line(jsonl("2025-01-01T00:00:00.000", {"ja": "あ", "en": None}))
+    assert rec["texts"] == {"ja": "あ"}
+    assert rec["fixed"] == 1
+    assert json.loads(rec["profile"]) == {"index": 0}
+    assert parse_jsonl_line("{not json") is None
+    assert parse_jsonl_line('{"texts": {}}') is None
+
+
+def test_ingest_is_incremental(tmp_path, db):
+    log = tmp_path / "translation-20250101.jsonl"
+    log.write_text(jsonl("2025-01-01T10:00:00.000", {"ja": "おはよう", "en": "Good morning"}), encoding="utf-8")
+    assert ingest(db, str(tmp_path)) == 1
+    assert ingest(db, str(tmp_path)) == 0
+
+    # 書きかけの最終行は次回に回す
+    with open(log, "a", encoding="utf-8") as f:
+        f.write(jsonl("2025-01-02T10:00:00.000", {"ja": "こんばんは"}, talker="Bob"))
+        f.write('{"msg_id": "partial"')
+    assert ingest(db, str(tmp_path)) == 1
+    with open(log, "a", encoding="utf-8") as f:
+        f.write(', "first_seen": "2025-01-03T10:00:00.000", "texts": {"ja": "続き"}}\n')
+    assert ingest(db, str(tmp_path)) == 1
+    assert db.execute("SELECT COUNT(*) FROM lines").fetchone()[0] == 3
+
+
+def test_ingest_restarts_truncated_file(tmp_path, db):
+    log = tmp_path / "translation-20250101.log"
+    log.write_text("20250101-12:00:00000,1,ja:一行目\n20250101-12:00:01000,1,ja:二行目\n", encoding="utf-8")
+    assert ingest(db, str(tmp_path)) == 2
+    log.write_text("20250101-13:00:00000,1,ja:作り直し\n", encoding="utf-8")
+    assert ingest(db, str(tmp_path)) == 1
+    assert [r[3] for r in search(db, "行目")] == []
+    assert [r[3] for r in search(db, "作り直し")] == ["作り直し"]
+
+
+def test_search_filters(tmp_path, db):
+    (tmp_path / "translation-1.jsonl").write_text(
+        jsonl("2025-01-01T10:00:00.000", {"ja": "今日はいい天気", "en": "Nice weather today"}, msg_id="a")
+        + jsonl("2025-01-02T10:00:00.000", {"ja": "明日も天気", "en": "Weather tomorrow too"}, talker="Bob", msg_id="b"),
+        encoding="utf-8",
+    )
+    ingest(db, str(tmp_path))
+    # 新しい順
+    assert [r[3] for r in search(db, "天気")] == ["明日も天気", "今日はいい天気"]
+    assert [r[3] for r in search(db, "weather", lang="en")] == ["Weather tomorrow too", "Nice weather today"]
+    assert [r[1] for r in search(db, "天気", talker="Bob")] == ["Bob"]
+    assert [r[0][:10] for r in search(db, "天気", until="2025-01-01")] == ["2025-01-01"]
+    assert [r[0][:10] for r in search(db, "天気", since="2025-01-02")] == ["2025-01-02"]
+    assert search(db, "天気", limit=1)[0][3] == "明日も天気"
+    # % や _ は LIKE の記号として扱わない
+    assert search(db, "%") == []
+
+
+def test_main_search(tmp_path, capsys):
+    (tmp_path / "translation-1.jsonl").write_text(jsonl("2025-01-01T10:00:00.000", {"ja": "こんにちは世界"}),
+                                                  encoding="utf-8")
+    assert translation_search.main(["--log-dir", str(tmp_path), "search", "こんにちは"]) == 0
+    out = capsys.readouterr().out
+    assert out == "2025-01-01T10:00:00.000 [Alice] ja: こんにちは世界\n"
+    assert (tmp_path / translation_search.DEFAULT_DB_NAME).exists()
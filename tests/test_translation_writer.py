@@ -0,0 +1,33 @@
+# test_translation_writer.py
+import logging
+
+import translation_writer
+from translation_writer import TranslationLogWriter
+
+
+def test_writes_all_lines_on_close(tmp_path):
+    path = tmp_path / "log.jsonl"
+    writer = TranslationLogWriter(str(path), batch_size=2, batch_age_sec=0.01)
+    writer.start()
+    for i in range(5):
+        assert writer.write(f"line{i}")
+    writer.close()
+    assert path.read_text(encoding="utf-8").splitlines() == [f"line{i}" for i in range(5)]
+    assert writer.lines_written == 5
+
+
+def test_full_queue_drops_without_blocking(tmp_path, clock, monkeypatch, caplog):
+    monkeypatch.setattr(translation_writer, "time", clock)
+    path = tmp_path / "log.jsonl"
+    writer = TranslationLogWriter(str(path), queue_max=2)  # スレッドを起動しないのでキューは空かない
+    with caplog.at_level(logging.ERROR):
+        results = [writer.write(f"line{i}") for i in range(5)]
+        clock.advance(writer.DROP_LOG_INTERVAL_SEC)
+        writer.write("late")
+    assert results == [True, True, False, False, False]
+    assert writer.lines_dropped == 4
+    # 破棄のログは間隔ごとに1回だけ
+    assert len([r for r in caplog.records if "dropped" in r.getMessage()]) == 2
+
+    writer.close()  # 未起動でも残りを書き切る
+    assert path.read_text(encoding="utf-8").splitlines() == ["line0", "line1"]
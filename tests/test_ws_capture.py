@@ -0,0 +1,93 @@
+# test_ws_capture.py
+import json
+
+import pytest
+
+import ws_capture
+from ws_capture import CaptureWriter, iter_frames, replay
+
+
+@pytest.fixture
+def fake_time(clock, monkeypatch):
+    monkeypatch.setattr(ws_capture, "time", clock)
+    return clock
+
+
+def record(path, clock, frames):
+    """frames: [(前のフレームからの秒, メッセージ), ...] を記録する"""
+    writer = CaptureWriter(str(path))
+    for delay, message in frames:
+        clock.advance(delay)
+        writer.write(message)
+    writer.close()
+    return writer
+
+
+def test_round_trip_keeps_order_kind_and_timing(tmp_path, fake_time):
+    path = tmp_path / "log" / "a.yxcap"
+    writer = record(path, fake_time, [(0.5, '{"a": "日本語"}'), (0.25, b"\x00\x01"), (1.0, "last")])
+    assert writer.frames == 3
+    assert list(iter_frames(str(path))) == [
+        (500_000_000, '{"a": "日本語"}'),
+        (750_000_000, b"\x00\x01"),
+        (1_750_000_000, "last"),
+    ]
+
+
+def test_replay_speed(tmp_path, fake_time):
+    path = tmp_path / "a.yxcap"
+    record(path, fake_time, [(0, "x"), (2.0, "y")])
+    got = []
+    start = fake_time.now
+    result = replay(str(path), got.append, speed=4)
+    assert got == ["x", "y"]
+    assert fake_time.now - start == pytest.approx(0.5)
+    assert (result["frames"], result["bytes"], result["recorded_sec"]) == (2, 2, 2.0)
+
+    start = fake_time.now
+    replay(str(path), got.append, speed=None)
+    assert fake_time.now == start
+
+
+def test_flush_keeps_frames_readable_while_recording(tmp_path, fake_time):
+    path = tmp_path / "a.yxcap"
+    writer = CaptureWriter(str(path), flush_interval_sec=1.0, flush_bytes=1 << 20)
+    try:
+        writer.write("first")
+        assert [m for _, m in iter_frames(str(path))] == []
+        fake_time.advance(1.0)
+        writer.write("second")
+        # 落ちても flush 済みの分は残る
+        assert [m for _, m in iter_frames(str(path))] == ["first", "second"]
+    finally:
+        writer.close()
+
+
+def test_truncated_frame_is_dropped(tmp_path, fake_time):
+    path = tmp_path / "a.yxcap"
+    record(path, fake_time, [(0, "complete"), (0, "cut off")])
+    data = path.read_bytes()
+    path.write_bytes(data[:-3])
+    assert [m for _, m in iter_frames(str(path))] == ["complete"]
+
+    (tmp_path / "bad.yxcap").write_bytes(b"nope")
+    with pytest.raises(ValueError):
+        list(iter_frames(str(tmp_path / "bad.yxcap")))
+
+
+def test_main_info_and_replay(tmp_path, capsys):
+    path = tmp_path / "a.yxcap"
+    writer = CaptureWriter(str(path))
+    message = {"MessageID": "m1", "textList": {"ja": "こんにちは"}, "fixedText": True, "talkerName": "A"}
+    writer.write(json.dumps(message, ensure_ascii=False))
+    writer.close()
+
+    assert ws_capture.main(["info", str(path)]) == 0
+    assert capsys.readouterr().out.startswith("frames=1 ")
+
+    out_dir = tmp_path / "out"
+    assert ws_capture.main(["replay", str(path), "--fast", "--format", "jsonl", "--out-dir", str(out_dir)]) == 0
+    logs = list(out_dir.rglob("translation-*.jsonl"))
+    assert len(logs) == 1
+    records = [json.loads(line) for line in logs[0].read_text(encoding="utf-8").splitlines()]
+    assert [r["texts"]["ja"] for r in records] == ["こんにちは"]
@@ -0,0 +1,47 @@
+# test_xso_frames.py
+import json
+
+import pytest
+
+import xso_frames
+from xso_frames import XsoFrameCache
+
+PROFILES = [
+    {"name": "JA->EN", "translation_param": {"engine": "google"}},
+    {"name": "JA->KO", "translation_param": {"engine": "deepl"}},
+]
+
+
+def test_status_frames_per_profile_and_mute():
+    cache = XsoFrameCache("app", PROFILES)
+    assert len(cache) == 4
+    frame = json.loads(cache.status(1, True))
+    assert frame["command"] == "UpdateMediaPlayerInformation"
+    assert json.loads(frame["jsonData"]) == {
+        "artist": "JA->KO (deepl)", "title": "Mute", "album": "app", "sourceApp": "ゆかコネ",
+    }
+    assert json.loads(json.loads(cache.status(0, 0))["jsonData"])["title"] == "Online"
+    with pytest.raises(KeyError):
+        cache.status(2, False)
+
+
+@pytest.mark.parametrize("content", ["hello", "改行\nと\"引用符\" \\ 😀\t", "", 42])
+def test_notification_matches_plain_serialization(content):
+    cache = XsoFrameCache("app", PROFILES)
+    assert cache.notification(content) == xso_frames._notification_frame("app", content)
+
+
+def test_notification_falls_back_when_split_is_unusable(monkeypatch):
+    # content の位置が切り出せないフレーム形式なら毎回シリアライズする
+    monkeypatch.setattr(xso_frames, "_notification_frame",
+                        lambda app_name, content: json.dumps({"sender": app_name, "n": len(str(content))}))
+    cache = XsoFrameCache("app", PROFILES)
+    assert cache.notification("abc") == json.dumps({"sender": "app", "n": 3})
+
+
+def test_template_without_content_marker_is_not_split(monkeypatch):
+    # 目印が見つからない場合は自己テストに頼らず使わない
+    monkeypatch.setattr(xso_frames, "_notification_frame", lambda app_name, content: "{}")
+    cache = XsoFrameCache("app", PROFILES)
+    assert cache._note_split_ok is False
+    assert cache.notification("x") == "{}"
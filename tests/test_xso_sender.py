@@ -0,0 +1,78 @@
+# test_xso_sender.py
+import pytest
+
+from reconnect import LinkHealth
+from xso_sender import XsoSender
+
+
+class FakeWs:
+    def __init__(self, fail=False):
+        self.sent = []
+        self.fail = fail
+
+    def send(self, payload):
+        if self.fail:
+            raise OSError("broken pipe")
+        self.sent.append(payload)
+
+
+@pytest.fixture
+def link():
+    state = {"ws": None}
+    sender = XsoSender(lambda: state["ws"], notification_max=2)
+    wakes = []
+    sender.set_waker(lambda: wakes.append(1))
+    sender.start(background=False)
+    return sender, state, wakes
+
+
+def test_status_is_latest_wins(link):
+    sender, state, wakes = link
+    for payload in ("s1", "s2", "s3"):
+        sender.submit_status(payload)
+    assert len(wakes) == 3
+    assert sender.depth() == 1
+    state["ws"] = ws = FakeWs()
+    assert sender.poll() is None
+    assert ws.sent == ["s3"]
+    stats = sender.stats()
+    assert (stats["status_submitted"], stats["status_coalesced"], stats["sent"]) == (3, 2, 1)
+
+
+def test_notifications_fifo_drop_oldest(link):
+    sender, state, _ = link
+    for payload in ("n1", "n2", "n3"):
+        sender.submit_notification(payload)
+    sender.submit_status("s")
+    state["ws"] = ws = FakeWs()
+    sender.poll()
+    # ステータスを先に送り、通知は上限を超えた古いものから捨てる
+    assert ws.sent == ["s", "n2", "n3"]
+    assert sender.stats()["notifications_dropped"] == 1
+    assert sender.stats()["max_depth"] == 3
+
+
+def test_held_while_disconnected(link):
+    sender, state, _ = link
+    sender.submit_status("s")
+    sender.poll()
+    sender.poll()
+    assert sender.depth() == 1
+    assert sender.stats()["skipped"] == 2
+    state["ws"] = ws = FakeWs()
+    sender.wake()
+    sender.poll()
+    assert ws.sent == ["s"] and sender.depth() == 0
+
+
+def test_send_failures_reported_to_health():
+    dead = []
+    health = LinkHealth("xso", max_send_failures=2, on_dead=dead.append)
+    ws = FakeWs(fail=True)
+    sender = XsoSender(lambda: ws, health=health)
+    sender.submit_notification("n1")
+    sender.submit_notification("n2")
+    sender.poll()
+    assert sender.stats()["failed"] == 2
+    assert sender.depth() == 0  # 送れなかったものは再送しない
+    assert dead == ["send_failures"]
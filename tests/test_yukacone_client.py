@@ -0,0 +1,88 @@
+# test_yukacone_client.py
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from yukacone_client import DEFAULT_TIMEOUTS, FALLBACK_TIMEOUT, YukaconeClient, parse_timeouts
+
+
+@pytest.fixture
+def yukacone():
+    """ゆかコネAPI の代わり（keep-alive あり）。受けたリクエストと接続元ポートを記録する"""
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            requests_seen.append((self.path, self.client_address[1]))
+            if self.path.startswith("/slow"):
+                time.sleep(0.5)
+            status, body = (500, b"error") if self.path.startswith("/fail") else (200, b" true\n")
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.handle_error = lambda request, client_address: None  # タイムアウトで切られた応答の書き込み失敗
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/", requests_seen
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_call_reuses_connection(yukacone):
+    base_url, seen = yukacone
+    client = YukaconeClient(base_url)
+    try:
+        assert client.base_url == base_url.rstrip("/")
+        assert client.call("/mute-status") == (True, "true")
+        assert client.call("/setTranslationParam", {"slot": 1, "language": "en"}) == (True, "true")
+    finally:
+        client.close()
+    assert seen[1][0] == "/setTranslationParam?slot=1&language=en"
+    # 2回目は同じ接続（同じ接続元ポート）を使う
+    assert seen[0][1] == seen[1][1]
+    stats = client.stats()
+    assert stats["/mute-status"]["count"] == 1 and stats["/mute-status"]["errors"] == 0
+    assert client.latency.snapshot(path="/mute-status", ok="true")[0] == 1
+
+
+def test_call_failure_and_timeout(yukacone):
+    base_url, _ = yukacone
+    client = YukaconeClient(base_url, timeouts={"/slow": (0.5, 0.1)})
+    try:
+        assert client.call("/fail") == (False, None)
+        started = time.perf_counter()
+        assert client.call("/slow") == (False, None)
+        assert time.perf_counter() - started < 0.45  # パス別の read タイムアウトで打ち切る
+    finally:
+        client.close()
+    stats = client.stats()
+    assert stats["/fail"]["errors"] == 1
+    assert stats["/slow"]["errors"] == 1
+
+
+def test_timeouts_default_per_path():
+    client = YukaconeClient("http://127.0.0.1:1", timeouts={"/mute-on": (1, 2)})
+    try:
+        assert client.timeouts["/mute-on"] == (1, 2)
+        assert client.timeouts["/mute-status"] == DEFAULT_TIMEOUTS["/mute-status"]
+        assert client.timeouts.get("/other", FALLBACK_TIMEOUT) == FALLBACK_TIMEOUT
+    finally:
+        client.close()
+
+
+def test_parse_timeouts():
+    raw = {"/mute-status": [0.5, 2], "/setTranslationParam": 10, "/bad": "x", "/short": [1]}
+    assert parse_timeouts(raw) == {"/mute-status": (0.5, 2.0), "/setTranslationParam": (10.0, 10.0)}
+    assert parse_timeouts(None) == {}
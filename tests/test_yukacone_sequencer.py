@@ -0,0 +1,103 @@
+# test_yukacone_sequencer.py
+import pytest
+
+import yukacone_sequencer
+from yukacone_sequencer import ANY, Command, CommandSequencer
+
+
+@pytest.fixture
+def api(clock, monkeypatch):
+    monkeypatch.setattr(yukacone_sequencer, "time", clock)
+    calls = []
+    failing = set()
+
+    def call(path, params):
+        calls.append(path)
+        return path not in failing, None
+
+    call.calls = calls
+    call.failing = failing
+    return call
+
+
+def settles_after(clock, seconds, value="on"):
+    """呼び出しから seconds 経つと value を返す probe"""
+    ready_at = []
+
+    def probe():
+        if not ready_at:
+            ready_at.append(clock.now + seconds)
+        return value if clock.now >= ready_at[0] else "off"
+
+    return probe
+
+
+def test_probe_settles_and_records(api, clock):
+    seq = CommandSequencer(api, settle_timeout_sec=2.0, poll_sec=0.02, max_poll_sec=0.25)
+    result = seq.run([Command("/a", probe=settles_after(clock, 0.1), expect="on", name="a"), Command("/b")])
+    assert result.ok
+    assert api.calls == ["/a", "/b"]
+    step = result.steps[0]
+    # 0.02, 0.04, 0.08 と待って 0.14 秒で確認できる
+    assert step.probes == 4
+    assert step.settle_ms == pytest.approx(140.0)
+    assert seq.stats()["a"]["count"] == 1
+    assert "b" not in seq.stats()  # probe の無いステップは集計しない
+
+
+def test_timeout_moves_on(api, clock):
+    seq = CommandSequencer(api, settle_timeout_sec=0.5)
+    result = seq.run([Command("/a", probe=lambda: "off", expect="on", name="a"), Command("/b")])
+    assert not result.ok
+    assert api.calls == ["/a", "/b"]
+    assert not result.steps[0].settled
+    assert result.steps[0].settle_ms == pytest.approx(500.0)
+    assert seq.stats()["a"]["timeouts"] == 1
+
+
+def test_call_failure_stops_sequence(api):
+    api.failing.add("/a")
+    result = CommandSequencer(api).run([Command("/a", probe=lambda: 1), Command("/b")])
+    assert api.calls == ["/a"]
+    assert not result.ok and not result.last.ok
+
+
+def test_cancelled_between_steps(api):
+    state = {"cancel": False}
+
+    def probe():
+        state["cancel"] = True
+        return None
+
+    result = CommandSequencer(api).run(
+        [Command("/a", probe=probe), Command("/b")], cancelled=lambda: state["cancel"]
+    )
+    assert result.cancelled
+    assert api.calls == ["/a"]
+
+
+def test_cancelled_while_waiting_is_not_recorded(api):
+    seq = CommandSequencer(api, settle_timeout_sec=2.0)
+    result = seq.run([Command("/a", probe=lambda: "off", expect="on", name="a")], cancelled=lambda: len(api.calls) > 0)
+    assert result.cancelled
+    assert seq.stats() == {}
+
+
+def test_deadline_skips_remaining_steps(api):
+    seq = CommandSequencer(api, settle_timeout_sec=5.0, deadline_sec=1.0)
+    seq.run([Command("/a", probe=lambda: "off", expect="on"), Command("/b")])
+    assert api.calls == ["/a"]
+
+
+def test_min_wait_is_recorded_as_fixed_wait(api, clock):
+    seq = CommandSequencer(api)
+    result = seq.run([Command("/a", probe=lambda: {"ok": True}, expect=ANY, name="a", min_wait_sec=0.5),
+                      Command("/b", name="b", min_wait_sec=0.25)])
+    assert result.ok
+    assert result.steps[0].wait_ms == pytest.approx(500.0)
+    assert result.steps[0].settle_ms == pytest.approx(0.0)
+    stats = seq.stats()
+    assert stats["a"]["fixed_wait_ms"] == 500.0
+    assert stats["b"]["fixed_wait_ms"] == 250.0  # probe が無くても固定待ちは集計する
+    assert seq.settle_time.snapshot(step="a", settled="true", kind="fixed_wait") == (1, pytest.approx(0.5))
+    assert seq.settle_time.snapshot(step="a", settled="true", kind="probe") == (0, 0.0)
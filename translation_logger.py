@@ -1,10 +1,42 @@
 import os
 import time
+import heapq
 import threading
 import logging
 import json
+from collections import OrderedDict
 from datetime import datetime
 
+from scheduling import DeadlineWorker
+
+try:
+    # あれば高速な JSON デコーダを使う（bytes をそのまま受け取れる）
+    import orjson
+    _json_loads = orjson.loads
+    _JSON_DECODE_ERRORS = (orjson.JSONDecodeError, UnicodeDecodeError)
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+    _JSON_DECODE_ERRORS = (json.JSONDecodeError, UnicodeDecodeError)
+from translation_writer import TranslationLogWriter
+from metrics import Counter, Histogram
+from profiling import span
+
+
+class _Pending:
+    """確定待ちメッセージ1件分（MessageID ごと）"""
+
+    __slots__ = ("msg_id", "first_seen", "last_update", "data", "deadline", "version", "profile")
+
+    def __init__(self, msg_id: str, now: float, data: dict, profile: dict | None = None):
+        self.msg_id = msg_id
+        self.first_seen = now        # MessageID を最初に見た時刻（epoch秒）
+        self.last_update = now       # 最終更新時刻（epoch秒）
+        self.data = data             # 最新受信データ（内部形式）
+        self.deadline = 0.0          # 確定予定時刻（monotonic秒）
+        self.version = 0             # ヒープ上の古い期限を見分けるための世代番号
+        self.profile = profile       # MessageID を最初に見た時点の翻訳プロファイル（JSONL用）
+
 
 class TranslationLogger:
     """
@@ -21,56 +53,183 @@ class TranslationLogger:
 
     仕様:
     - MessageID は更新中同じIDが来る（確定まで同じ）
-    - MessageID が変わったら、保持中の旧MessageIDを確定ログ出力
-    - 一定時間更新が止まったら確定ログ出力（stable_sec）
+    - 複数の MessageID を同時に保持する（話者の割り込みや古いIDへの遅れた訂正に対応）
+    - MessageID ごとに、一定時間更新が止まったら確定ログ出力（stable_sec）
+    - fixedText=true を受けたら fixed_grace_sec 後に確定（直後に届く翻訳の追記を取り込むため）
+    - 確定チェックは最も早い確定予定時刻まで眠って行う（保持が空なら一切起きない）
+    - 同時保持数が max_inflight を超えたら、確定予定が最も早いものから確定（capacity）
+    - 確定済みIDに同一内容が再送された場合は重複として捨てる
+    - ファイル書き込みは TranslationLogWriter に任せ、受信側のロック外で行う
+    - 出力形式は log_format で選択
+        "legacy": ts,elapsed,lang:text,...（従来形式、translation-*.log）
+        "jsonl" : 1行1 JSON（translation-*.jsonl）。取得開始/確定時刻、経過ms、確定理由、
+                  話者、fixed、Texts 全体、翻訳プロファイルを持つ
     - textList の言語キーは不定（ja/en/ko/cn...）。1個以上あれば保持対象
     - DEBUG 時は受信データをテキスト化してログ出力
     - 確定ログ行には「取得開始時刻（MessageIDを初めて見た時刻）」と「経過秒」を入れる
     """
 
-    def __init__(self, base_dir: str, stable_sec: float = 10.0, flush_interval: float = 5.0):
+    # 再送の重複判定用に覚えておく確定済み MessageID の数
+    RECENT_COMMITTED_MAX = 64
+    LOG_FORMATS = ("legacy", "jsonl")
+
+    def __init__(
+        self,
+        base_dir: str,
+        stable_sec: float = 10.0,
+        flush_interval: float = 5.0,
+        max_inflight: int = 16,
+        fixed_grace_sec: float = 1.0,
+        writer_options: dict | None = None,
+        log_format: str = "legacy",
+        profile_provider=None,
+        frame_log_interval: float = 10.0,
+        message_listener=None,
+    ):
         # ./log 固定
         self.log_dir = os.path.join(base_dir, "log")
         os.makedirs(self.log_dir, exist_ok=True)
 
+        log_format = str(log_format).lower()
+        if log_format not in self.LOG_FORMATS:
+            logging.warning("TranslationLogger: 不明な log_format=%s のため legacy を使用します", log_format)
+            log_format = "legacy"
+        self.log_format = log_format
+        # 確定時に記録する翻訳プロファイルを返す関数（例: {"name":..., "engine":..., "language":...}）
+        self.profile_provider = profile_provider
+        # 変換後の内部形式メッセージを受け取る関数（字幕転送など）。受信スレッドで呼ばれる
+        self.message_listener = message_listener
+
         ts = datetime.now().strftime("%Y-%m-%d-%H%M%S")
-        self.log_filename = f"translation-{ts}.log"
+        ext = "jsonl" if log_format == "jsonl" else "log"
+        self.log_filename = f"translation-{ts}.{ext}"
 
         self.stable_sec = float(stable_sec)
         self.flush_interval = float(flush_interval)
-
-        # 1件ずつ保持する前提（あなたの仕様に合わせる）
-        self.current_id = None
-        self.first_seen_time = None      # MessageID を最初に見た時刻（epoch秒）
-        self.last_update_time = None     # 最終更新時刻（epoch秒）
-        self.last_data = None            # 最新受信データ（内部形式）
+        self.max_inflight = max(1, int(max_inflight))
+        self.fixed_grace_sec = max(0.0, float(fixed_grace_sec))
+
+        # batch_size / batch_age_sec / durability / queue_max を TranslationLogWriter へ渡す
+        self._writer = TranslationLogWriter(
+            os.path.join(self.log_dir, self.log_filename),
+            **(writer_options or {}),
+        )
+
+        # MessageID -> _Pending（参照 O(1)）と、(deadline, version, MessageID) の最小ヒープ（期限切れ O(log n)）
+        self._inflight = {}
+        self._heap = []
+        # 確定済み MessageID -> Texts（再送の重複判定用、古いものから捨てる）
+        self._recent_committed = OrderedDict()
+
+        # 受信フレームの集計（INFO ログはフレーム毎ではなく frame_log_interval 秒ごとの要約）
+        self.frames_received = 0
+        self.bytes_received = 0
+        self.frame_log_interval = max(0.0, float(frame_log_interval))
+        self._frames_since_log = 0
+        self._bytes_since_log = 0
+        self._next_frame_log = 0.0
+
+        # 確定理由別の件数と、最初の受信から確定までの時間（metrics.Registry に登録すると /metrics に出る）
+        self.commits = Counter("translation_commits_total", "Committed translation messages", labelnames=("reason",))
+        self.commit_latency = Histogram(
+            "translation_commit_latency_seconds", "Time from first seen to commit",
+            labelnames=("reason",), buckets=(0.5, 1, 2, 5, 10, 15, 20, 30, 60, 120),
+        )
 
         self._lock = threading.Lock()
-        self._stop = False
-        self._thread = None
+        self._worker = None
+        # 最早の確定予定時刻が早まったときに呼ぶ（スレッドモードは DeadlineWorker.wake）
+        self._waker = None
 
     # ----------------------------------------
     # 公開API
     # ----------------------------------------
-    def start(self):
-        """バックグラウンドで安定チェック用スレッドを開始"""
-        if self._thread is not None:
+    def start(self, background: bool = True):
+        """
+        バックグラウンドで確定チェック用スレッドを開始。
+        background=False の場合はスレッドを作らず、呼び出し側が poll() の戻り値の時刻に
+        poll() を呼び直す（asyncio モード。set_waker() で起床通知を受け取る）。
+
+        flush_interval は互換のため受け取るだけで、確定チェックには使わない。
+        """
+        if self._worker is not None:
             return
-        self._stop = False
-        self._thread = threading.Thread(target=self._periodic_flush_loop, daemon=True)
-        self._thread.start()
-        logging.info("TranslationLogger started (stable=%ss, flush=%ss, dir=%s)",
-                     int(self.stable_sec), int(self.flush_interval), self.log_dir)
+        self._writer.start()
+        if background:
+            self._worker = DeadlineWorker("TranslationLogger", self.poll)
+            self.set_waker(self._worker.wake)
+            self._worker.start()
+        logging.info("TranslationLogger started (stable=%ss, dir=%s, format=%s, durability=%s)",
+                     self.stable_sec, self.log_dir, self.log_format, self._writer.durability)
+
+    def set_waker(self, waker):
+        """最早の確定予定時刻が早まったときに呼ばれるコールバックを設定する"""
+        self._waker = waker
 
     def stop(self):
         """スレッド停止＆残りのメッセージを強制フラッシュ"""
-        self._stop = True
-        if self._thread is not None:
-            self._thread.join(timeout=2.0)
+        if self._worker is not None:
+            self._worker.stop(timeout=2.0)
         with self._lock:
-            self._flush_locked(reason="shutdown")
+            # 取得開始順に全件確定
+            now = time.time()
+            committed = [
+                self._commit_locked(p.msg_id, reason="shutdown", flush_now=now)
+                for p in sorted(self._inflight.values(), key=lambda x: x.first_seen)
+            ]
+            self._heap.clear()
+        self._emit(committed)
+        self._writer.close()
         logging.info("TranslationLogger stopped.")
 
+    def add_raw_frame(self, message):
+        """
+        Yukacone WebSocket の1フレーム（str / bytes、JSON オブジェクトまたは配列）を取り込む。
+        WebSocket 受信時とキャプチャ再生時（ws_capture.py）の共通入口。
+
+        受信頻度が高い経路なので、ログは有効なレベルのときだけ組み立てる。
+        bytes はデコードせずにそのまま JSON デコーダへ渡す。
+        """
+        size = len(message)
+        self.frames_received += 1
+        self.bytes_received += size
+
+        root = logging.getLogger()
+        if root.isEnabledFor(logging.DEBUG):
+            logging.debug("WS raw head (len=%d): %r", size, message[:300])
+        elif self.frame_log_interval > 0:
+            self._log_frame_summary(root, size)
+
+        if isinstance(message, bytearray):
+            message = bytes(message)
+        try:
+            data = _json_loads(message)
+        except _JSON_DECODE_ERRORS:
+            if not isinstance(message, bytes):
+                raise
+            # 不正な UTF-8 を含む場合だけ置換デコードして読み直す
+            data = json.loads(message.decode("utf-8", errors="replace"))
+
+        if isinstance(data, list):
+            for item in data:
+                self.add_yukacone_message(item)
+        else:
+            self.add_yukacone_message(data)
+
+    def _log_frame_summary(self, root, size: int):
+        """フレーム受信の INFO ログを frame_log_interval 秒に1回の要約にまとめる"""
+        self._frames_since_log += 1
+        self._bytes_since_log += size
+        now = time.monotonic()
+        if now < self._next_frame_log:
+            return
+        if root.isEnabledFor(logging.INFO):
+            logging.info("TranslationLog WS received: %d frames, %d bytes (total %d frames)",
+                         self._frames_since_log, self._bytes_since_log, self.frames_received)
+        self._frames_since_log = 0
+        self._bytes_since_log = 0
+        self._next_frame_log = now + self.frame_log_interval
+
     def add_yukacone_message(self, data: dict):
         """
         Yukacone WebSocket から受け取った JSON を内部形式へ変換し、バッファに追加する。
@@ -83,11 +242,12 @@ class TranslationLogger:
             except Exception:
                 logging.debug("TranslationLogger RAW WS message (repr): %r", data)
 
-        converted = self._convert_to_internal_format(data)
-        if not converted:
-            return
+        with span("logger.add_message"):
+            converted = self._convert_to_internal_format(data)
+            if not converted:
+                return
 
-        self._add_message_internal(converted)
+            self._add_message_internal(converted)
 
     # ----------------------------------------
     # 内部処理
@@ -124,13 +284,12 @@ class TranslationLogger:
         talker = data.get("talkerName") or data.get("talkerID") or ""
         fixed = bool(data.get("fixedText", False))
 
-        # 値を文字列化＆改行つぶし（ログ1行化）
+        # 値を文字列化（改行のエスケープは legacy 形式の整形時に行う）
         cleaned = {}
         for lang, txt in text_map.items():
             if txt is None:
                 continue
-            s = str(txt).replace("\r", "\\r").replace("\n", "\\n")
-            cleaned[str(lang)] = s
+            cleaned[str(lang)] = str(txt)
 
         if not cleaned:
             return None
@@ -149,85 +308,185 @@ class TranslationLogger:
             return
 
         now = time.time()
+        mono = time.monotonic()
+        committed = []
         with self._lock:
-            if self.current_id is None:
-                # 初回MessageID
-                self.current_id = msg_id
-                self.first_seen_time = now
-                self.last_update_time = now
-                self.last_data = msg
-                return
-
-            if msg_id != self.current_id:
-                # 別IDが来た → 旧IDを確定してから新IDへ
-                self._flush_locked(reason="mid_changed", flush_now=now)
-
-                self.current_id = msg_id
-                self.first_seen_time = now
-                self.last_update_time = now
-                self.last_data = msg
+            pending = self._inflight.get(msg_id)
+            if pending is None:
+                prev_texts = self._recent_committed.get(msg_id)
+                if prev_texts is not None and prev_texts == msg.get("Texts"):
+                    # 確定済みIDへの同一内容の再送 → 重複なので捨てる
+                    return
+
+                # 上限超過なら確定予定が最も早いものを先に確定
+                while len(self._inflight) >= self.max_inflight:
+                    oldest = self._peek_locked()
+                    if oldest is None:
+                        break
+                    committed.append(self._commit_locked(oldest.msg_id, reason="capacity", flush_now=now))
+
+                pending = _Pending(msg_id, now, msg, self._current_profile())
+                self._inflight[msg_id] = pending
+                changed = True
             else:
                 # 同じID更新 → 最新保持
-                self.last_update_time = now
-                self.last_data = msg
-
-    def _periodic_flush_loop(self):
-        while not self._stop:
-            time.sleep(self.flush_interval)
-            with self._lock:
-                if self.current_id is None or self.last_update_time is None:
-                    continue
-                now = time.time()
-                if (now - self.last_update_time) >= self.stable_sec:
-                    self._flush_locked(reason="stable_timeout", flush_now=now)
-
-    def _flush_locked(self, reason: str, flush_now: float | None = None):
+                changed = pending.data != msg
+                pending.last_update = now
+                pending.data = msg
+
+            delay = self.fixed_grace_sec if msg.get("Fixed") else self.stable_sec
+            earliest = self._peek_locked()
+            deadline = mono + delay
+            self._schedule_locked(pending, deadline)
+            # 最早期限が早まった場合だけ起こす（既存IDの延長では起こさない）
+            wake = earliest is None or deadline < earliest.deadline
+
+        if committed:
+            self._emit(committed)
+        if wake and self._waker is not None:
+            self._waker()
+        # 重複チェックを通ったものだけ（確定済みIDの再送・同一内容の再送は通知しない）
+        if changed and self.message_listener is not None:
+            try:
+                self.message_listener(msg)
+            except Exception:
+                logging.exception("TranslationLogger: message_listener failed")
+
+    def poll(self):
         """
-        保持中のメッセージを「確定」として1行ログに出す。
-        - 先頭時刻: MessageID を最初に取得した時刻（first_seen）
-        - 追加項目: 経過秒（flush_now - first_seen、整数秒）
+        確定予定時刻を過ぎたメッセージをすべて確定する。
+        戻り値: 次の確定予定時刻（time.monotonic() 基準）。保持が空なら None。
         """
-        if not self.last_data or not self.current_id or self.first_seen_time is None:
-            # 状態が揃ってない場合は何もしない
-            self.current_id = None
-            self.first_seen_time = None
-            self.last_update_time = None
-            self.last_data = None
-            return
+        committed = []
+        with self._lock:
+            mono = time.monotonic()
+            now = time.time()
+            while True:
+                p = self._peek_locked()
+                if p is None:
+                    next_deadline = None
+                    break
+                if p.deadline > mono:
+                    next_deadline = p.deadline
+                    break
+                reason = "fixed" if p.data.get("Fixed") else "stable_timeout"
+                committed.append(self._commit_locked(p.msg_id, reason=reason, flush_now=now))
+        if committed:
+            with span("logger.commit"):
+                self._emit(committed)
+        return next_deadline
+
+    def pending_count(self) -> int:
+        """確定待ちの MessageID 数"""
+        with self._lock:
+            return len(self._inflight)
+
+    def writer_queue_size(self) -> int:
+        """書き込み待ちの行数"""
+        return self._writer.queue_size()
+
+    def _schedule_locked(self, pending: _Pending, deadline: float):
+        """確定予定時刻を更新する。古いヒープ要素は version 不一致で読み飛ばされる"""
+        pending.version += 1
+        pending.deadline = deadline
+        heapq.heappush(self._heap, (deadline, pending.version, pending.msg_id))
+
+    def _peek_locked(self):
+        """確定予定が最も早い保持中メッセージを返す（無効になったヒープ要素はここで捨てる）"""
+        heap = self._heap
+        while heap:
+            deadline, version, msg_id = heap[0]
+            p = self._inflight.get(msg_id)
+            if p is not None and p.version == version:
+                return p
+            heapq.heappop(heap)
+        return None
+
+    def _commit_locked(self, msg_id: str, reason: str, flush_now: float | None = None):
+        """
+        保持中のメッセージを「確定」として取り出す。
+        ログ行の組み立てと書き込みはロック外の _emit() で行う。
+        戻り値: (_Pending, reason, flush_now)。該当IDが無ければ None。
+        """
+        pending = self._inflight.pop(msg_id, None)
+        if pending is None:
+            return None
 
         if flush_now is None:
             flush_now = time.time()
 
-        elapsed_sec = int(max(0.0, flush_now - self.first_seen_time))
+        self._recent_committed[msg_id] = pending.data.get("Texts")
+        self._recent_committed.move_to_end(msg_id)
+        while len(self._recent_committed) > self.RECENT_COMMITTED_MAX:
+            self._recent_committed.popitem(last=False)
+
+        return pending, reason, flush_now
+
+    def _current_profile(self):
+        if self.profile_provider is None:
+            return None
+        try:
+            return self.profile_provider()
+        except Exception as e:
+            logging.debug("TranslationLogger: profile_provider failed: %s", e)
+            return None
+
+    def _emit(self, committed):
+        """確定したメッセージをログ行にして書き込みキューへ渡す（ロック外で呼ぶ）"""
+        for item in committed:
+            if item is None:
+                continue
+            pending, reason, flush_now = item
+            self.commits.inc(reason=reason)
+            self.commit_latency.observe(max(0.0, flush_now - pending.first_seen), reason=reason)
+            if self.log_format == "jsonl":
+                line = self._format_jsonl(*item)
+            else:
+                line = self._format_line(*item)
+            self._writer.write(line)
+            logging.info("[TranslationLog] %s", line)
+
+    def _format_line(self, pending: _Pending, reason: str, flush_now: float) -> str:
+        """
+        確定メッセージを1行ログに整形する。
+        - 先頭時刻: MessageID を最初に取得した時刻（first_seen）
+        - 追加項目: 経過秒（flush_now - first_seen、整数秒）
+        """
+        elapsed_sec = int(max(0.0, flush_now - pending.first_seen))
 
         # first_seen をログ行の先頭時刻に採用（ミリ秒まで）
-        ts_first = datetime.fromtimestamp(self.first_seen_time).strftime("%Y%m%d-%H:%M:%S%f")[:-3]
+        ts_first = datetime.fromtimestamp(pending.first_seen).strftime("%Y%m%d-%H:%M:%S%f")[:-3]
 
-        talker = self.last_data.get("Talker", "")
-        fixed = 1 if self.last_data.get("Fixed", False) else 0
-        texts = self.last_data.get("Texts", {}) or {}
+        talker = pending.data.get("Talker", "")
+        fixed = 1 if pending.data.get("Fixed", False) else 0
+        texts = pending.data.get("Texts", {}) or {}
 
         # 言語キー ja優先 + 残りは昇順（jaが無ければ全体昇順）
         keys = sorted(texts.keys())
         if "ja" in texts:
             keys = ["ja"] + [k for k in keys if k != "ja"]
-        parts = [f"{lang}:{texts.get(lang, '')}" for lang in keys]
+        # 値の改行つぶし（ログ1行化）
+        parts = [
+            f"{lang}:" + texts.get(lang, "").replace("\r", "\\r").replace("\n", "\\n")
+            for lang in keys
+        ]
 
         # ここが「1行フォーマット」（必要なら後で調整）
         # 先頭: first_seen_time / 次: elapsed_sec（整数秒）/ 次: reason / talker / fixed / 本文
         #line = f"{ts_first},{elapsed_sec},{reason},{talker},fixed={fixed}," + ",".join(parts)
-        line = f"{ts_first},{elapsed_sec}," + ",".join(parts)
-
-        log_path = os.path.join(self.log_dir, self.log_filename)
-        try:
-            with open(log_path, "a", encoding="utf-8") as f:
-                f.write(line + "\n")
-            logging.info("[TranslationLog] %s", line)
-        except Exception as e:
-            logging.error("Translation log write error: %s", e)
-
-        # 状態リセット
-        self.current_id = None
-        self.first_seen_time = None
-        self.last_update_time = None
-        self.last_data = None
+        return f"{ts_first},{elapsed_sec}," + ",".join(parts)
+
+    def _format_jsonl(self, pending: _Pending, reason: str, flush_now: float) -> str:
+        """確定メッセージを1行の JSON（JSONL）に整形する"""
+        record = {
+            "msg_id": pending.msg_id,
+            "first_seen": datetime.fromtimestamp(pending.first_seen).isoformat(timespec="milliseconds"),
+            "committed": datetime.fromtimestamp(flush_now).isoformat(timespec="milliseconds"),
+            "elapsed_ms": int(max(0.0, flush_now - pending.first_seen) * 1000),
+            "reason": reason,
+            "talker": pending.data.get("Talker", ""),
+            "fixed": bool(pending.data.get("Fixed", False)),
+            "texts": pending.data.get("Texts", {}) or {},
+            "profile": pending.profile,
+        }
+        return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,347 @@
+# translation_search.py
+"""
+翻訳ログ（log/translation-*.log / *.jsonl）の検索ツール。
+
+TranslationLogger の出力を SQLite へ差分取り込みし、言語ごとの本文に FTS5 インデックス、
+時刻・話者に通常インデックスを張って検索する。取り込み済みのファイル位置（バイトオフセット）を
+記録するので、再実行時は新しく追記された行だけを処理する。
+
+使い方:
+  python translation_search.py ingest
+  python translation_search.py search "こんにちは"
+  python translation_search.py search "hello" --lang en --since 2026-01-01 --until 2026-01-31
+  python translation_search.py search "hello" --talker Alice --limit 20
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+LOG_PATTERNS = ("translation-*.log", "translation-*.jsonl")
+DEFAULT_DB_NAME = "translation-index.sqlite3"
+
+# legacy 形式の "lang:text" 要素（言語キーは ja / en / zh-TW / pt-PT など）
+_LANG_PART = re.compile(r"^([A-Za-z]{2,3}(?:-[A-Za-z0-9]+)*):(.*)$", re.S)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path   TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lines (
+    id         INTEGER PRIMARY KEY,
+    file       TEXT NOT NULL,
+    offset     INTEGER NOT NULL,
+    first_seen TEXT NOT NULL,
+    elapsed_ms INTEGER,
+    reason     TEXT,
+    talker     TEXT,
+    fixed      INTEGER,
+    msg_id     TEXT,
+    profile    TEXT
+);
+CREATE INDEX IF NOT EXISTS lines_first_seen ON lines(first_seen);
+CREATE INDEX IF NOT EXISTS lines_talker ON lines(talker, first_seen);
+CREATE INDEX IF NOT EXISTS lines_file ON lines(file);
+CREATE TABLE IF NOT EXISTS texts (
+    id      INTEGER PRIMARY KEY,
+    line_id INTEGER NOT NULL REFERENCES lines(id),
+    lang    TEXT NOT NULL,
+    text    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS texts_lang ON texts(lang, line_id);
+CREATE INDEX IF NOT EXISTS texts_line ON texts(line_id);
+"""
+
+
+def default_log_dir() -> str:
+    if getattr(sys, "frozen", False):
+        base_dir = os.path.dirname(sys.executable)
+    else:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_dir, "log")
+
+
+def open_db(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    # 日本語など空白区切りでない言語も部分一致できるよう trigram を優先（SQLite 3.34+）
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='texts_fts'"
+    ).fetchone()
+    if not exists:
+        try:
+            conn.execute(
+                "CREATE VIRTUAL TABLE texts_fts USING fts5("
+                "text, content='texts', content_rowid='id', tokenize='trigram')"
+            )
+        except sqlite3.OperationalError:
+            conn.execute(
+                "CREATE VIRTUAL TABLE texts_fts USING fts5("
+                "text, content='texts', content_rowid='id')"
+            )
+    return conn
+
+
+# ----------------------------------------
+# 行の解析
+# ----------------------------------------
+def _legacy_ts_to_iso(ts: str) -> str:
+    """'20250101-12:34:56789'（ミリ秒3桁つき）を ISO 形式へ"""
+    dt = datetime.strptime(ts[:17], "%Y%m%d-%H:%M:%S")
+    ms = ts[17:20] or "000"
+    return dt.strftime("%Y-%m-%dT%H:%M:%S") + f".{ms}"
+
+
+def parse_legacy_line(line: str):
+    """legacy 形式 'ts,elapsed,lang:text,...' を辞書へ。本文中の ',' は直前の言語の本文に戻す"""
+    fields = line.split(",")
+    if len(fields) < 3:
+        return None
+    try:
+        first_seen = _legacy_ts_to_iso(fields[0])
+        elapsed_ms = int(fields[1]) * 1000
+    except ValueError:
+        return None
+
+    texts = {}
+    last_lang = None
+    for part in fields[2:]:
+        m = _LANG_PART.match(part)
+        if m and m.group(1) not in texts:
+            last_lang = m.group(1)
+            texts[last_lang] = m.group(2)
+        elif last_lang is not None:
+            texts[last_lang] += "," + part
+    if not texts:
+        return None
+    return {
+        "first_seen": first_seen,
+        "elapsed_ms": elapsed_ms,
+        "reason": None,
+        "talker": None,
+        "fixed": None,
+        "msg_id": None,
+        "profile": None,
+        "texts": texts,
+    }
+
+
+def parse_jsonl_line(line: str):
+    try:
+        rec = json.loads(line)
+    except ValueError:
+        return None
+    texts = rec.get("texts")
+    if not isinstance(texts, dict) or not rec.get("first_seen"):
+        return None
+    profile = rec.get("profile")
+    return {
+        "first_seen": rec["first_seen"],
+        "elapsed_ms": rec.get("elapsed_ms"),
+        "reason": rec.get("reason"),
+        "talker": rec.get("talker"),
+        "fixed": None if rec.get("fixed") is None else int(bool(rec.get("fixed"))),
+        "msg_id": rec.get("msg_id"),
+        "profile": json.dumps(profile, ensure_ascii=False) if profile is not None else None,
+        "texts": {str(k): str(v) for k, v in texts.items() if v is not None},
+    }
+
+
+# ----------------------------------------
+# 取り込み
+# ----------------------------------------
+def ingest(conn: sqlite3.Connection, log_dir: str) -> int:
+    """log_dir の翻訳ログを差分取り込みする。戻り値: 追加した行数"""
+    paths = []
+    for pattern in LOG_PATTERNS:
+        paths.extend(glob.glob(os.path.join(log_dir, pattern)))
+
+    total = 0
+    for path in sorted(paths):
+        total += _ingest_file(conn, path)
+    return total
+
+
+def _ingest_file(conn: sqlite3.Connection, path: str) -> int:
+    key = os.path.abspath(path)
+    row = conn.execute("SELECT offset FROM files WHERE path=?", (key,)).fetchone()
+    offset = row[0] if row else 0
+    size = os.path.getsize(path)
+    if size == offset:
+        return 0
+
+    with conn:
+        if size < offset:
+            # 切り詰め・作り直されたファイルは最初から取り込み直す
+            _delete_file_rows(conn, key)
+            offset = 0
+
+        parse = parse_jsonl_line if path.endswith(".jsonl") else parse_legacy_line
+        added = 0
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read(size - offset)
+            # 書き込み途中の最終行は次回に回す
+            end = data.rfind(b"\n") + 1
+            pos = 0
+            while pos < end:
+                nl = data.index(b"\n", pos)
+                raw = data[pos:nl].decode("utf-8", errors="replace").rstrip("\r")
+                line_offset = offset + pos
+                pos = nl + 1
+                if not raw:
+                    continue
+                rec = parse(raw)
+                if rec is None:
+                    continue
+                _insert(conn, key, line_offset, rec)
+                added += 1
+
+        conn.execute(
+            "INSERT INTO files(path, offset) VALUES(?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET offset=excluded.offset",
+            (key, offset + end),
+        )
+    return added
+
+
+def _insert(conn: sqlite3.Connection, file_key: str, offset: int, rec: dict) -> None:
+    cur = conn.execute(
+        "INSERT INTO lines(file, offset, first_seen, elapsed_ms, reason, talker, fixed, msg_id, profile) "
+        "VALUES(?,?,?,?,?,?,?,?,?)",
+        (file_key, offset, rec["first_seen"], rec["elapsed_ms"], rec["reason"],
+         rec["talker"], rec["fixed"], rec["msg_id"], rec["profile"]),
+    )
+    line_id = cur.lastrowid
+    for lang, text in rec["texts"].items():
+        tcur = conn.execute(
+            "INSERT INTO texts(line_id, lang, text) VALUES(?,?,?)", (line_id, lang, text)
+        )
+        conn.execute("INSERT INTO texts_fts(rowid, text) VALUES(?, ?)", (tcur.lastrowid, text))
+
+
+def _delete_file_rows(conn: sqlite3.Connection, file_key: str) -> None:
+    rows = conn.execute(
+        "SELECT t.id, t.text FROM texts t JOIN lines l ON l.id = t.line_id WHERE l.file=?",
+        (file_key,),
+    ).fetchall()
+    for text_id, text in rows:
+        conn.execute(
+            "INSERT INTO texts_fts(texts_fts, rowid, text) VALUES('delete', ?, ?)", (text_id, text)
+        )
+    conn.execute(
+        "DELETE FROM texts WHERE line_id IN (SELECT id FROM lines WHERE file=?)", (file_key,)
+    )
+    conn.execute("DELETE FROM lines WHERE file=?", (file_key,))
+
+
+# ----------------------------------------
+# 検索
+# ----------------------------------------
+def _normalize_bound(value: str | None, end: bool) -> str | None:
+    """'YYYY-MM-DD' / ISO 日時を first_seen と比較できる文字列へ（日付のみの until は当日末まで）"""
+    if not value:
+        return None
+    value = value.strip().replace(" ", "T")
+    if len(value) == 10 and end:
+        return value + "T23:59:59.999"
+    return value
+
+
+def search(
+    conn: sqlite3.Connection,
+    query: str,
+    lang: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    talker: str | None = None,
+    limit: int = 50,
+):
+    """本文に query を含む行を新しい順に返す: [(first_seen, talker, lang, text, file), ...]"""
+    where = []
+    params = []
+    if len(query) >= 3:
+        # FTS5 のフレーズ検索（" はエスケープ）
+        where.append("t.id IN (SELECT rowid FROM texts_fts WHERE texts_fts MATCH ?)")
+        params.append('"' + query.replace('"', '""') + '"')
+    else:
+        # trigram は3文字未満を引けないため LIKE にフォールバック
+        where.append("t.text LIKE ? ESCAPE '\\'")
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        params.append(f"%{escaped}%")
+    if lang:
+        where.append("t.lang = ?")
+        params.append(lang)
+    since = _normalize_bound(since, end=False)
+    until = _normalize_bound(until, end=True)
+    if since:
+        where.append("l.first_seen >= ?")
+        params.append(since)
+    if until:
+        where.append("l.first_seen <= ?")
+        params.append(until)
+    if talker:
+        where.append("l.talker = ?")
+        params.append(talker)
+
+    sql = (
+        "SELECT l.first_seen, l.talker, t.lang, t.text, l.file "
+        "FROM texts t JOIN lines l ON l.id = t.line_id "
+        f"WHERE {' AND '.join(where)} "
+        "ORDER BY l.first_seen DESC LIMIT ?"
+    )
+    params.append(int(limit))
+    return conn.execute(sql, params).fetchall()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="翻訳ログの取り込みと全文検索")
+    parser.add_argument("--log-dir", default=default_log_dir(), help="翻訳ログのフォルダ（既定: ./log）")
+    parser.add_argument("--db", default=None, help=f"インデックスDB（既定: <log-dir>/{DEFAULT_DB_NAME}）")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("ingest", help="新しく追記された行を取り込む")
+
+    sp = sub.add_parser("search", help="本文を検索する（先に差分取り込みを行う）")
+    sp.add_argument("query")
+    sp.add_argument("--lang", help="言語キー（例: ja, en）")
+    sp.add_argument("--since", help="開始日時（YYYY-MM-DD または ISO 形式）")
+    sp.add_argument("--until", help="終了日時（YYYY-MM-DD または ISO 形式）")
+    sp.add_argument("--talker", help="話者名")
+    sp.add_argument("--limit", type=int, default=50)
+    sp.add_argument("--no-ingest", action="store_true", help="検索前の差分取り込みをしない")
+
+    args = parser.parse_args(argv)
+    db_path = args.db or os.path.join(args.log_dir, DEFAULT_DB_NAME)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = open_db(db_path)
+
+    try:
+        if args.command == "ingest" or not args.no_ingest:
+            start = time.perf_counter()
+            added = ingest(conn, args.log_dir)
+            if args.command == "ingest" or added:
+                print(f"取り込み: {added} 行 ({(time.perf_counter() - start) * 1000:.1f}ms)", file=sys.stderr)
+
+        if args.command == "search":
+            start = time.perf_counter()
+            rows = search(conn, args.query, args.lang, args.since, args.until, args.talker, args.limit)
+            for first_seen, talker, lang, text, _file in rows:
+                who = f" [{talker}]" if talker else ""
+                print(f"{first_seen}{who} {lang}: {text}")
+            print(f"{len(rows)} 件 ({(time.perf_counter() - start) * 1000:.1f}ms)", file=sys.stderr)
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+# translation_writer.py
+import os
+import time
+import queue
+import threading
+import logging
+
+from profiling import span
+
+
+class TranslationLogWriter:
+    """
+    翻訳ログ専用の書き込みスレッド。
+
+    - ファイルハンドルは開いたまま保持（1行ごとの open/close をしない）
+    - write() は有界キューに積むだけで戻る（呼び出し側のロック中にファイルI/Oをしない）。
+      キューが満杯なら待たずに破棄して数える（ログは DROP_LOG_INTERVAL_SEC に1回まで）
+    - batch_size 行たまるか、先頭行から batch_age_sec 経過したらまとめて書き込む（グループコミット）
+    - durability: 書き込み後の永続化方針
+        "none"  : write のみ（バッファリングは Python/OS 任せ）
+        "flush" : バッチごとに flush（プロセスが落ちても OS まで届く）
+        "fsync" : バッチごとに flush + os.fsync（OS クラッシュにも耐える）
+    """
+
+    DURABILITY_MODES = ("none", "flush", "fsync")
+    DROP_LOG_INTERVAL_SEC = 10.0
+    _STOP = object()
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 32,
+        batch_age_sec: float = 0.5,
+        durability: str = "flush",
+        queue_max: int = 1024,
+    ):
+        self.path = path
+        self.batch_size = max(1, int(batch_size))
+        self.batch_age_sec = max(0.0, float(batch_age_sec))
+        durability = str(durability).lower()
+        if durability not in self.DURABILITY_MODES:
+            logging.warning("TranslationLogWriter: 不明な durability=%s のため flush を使用します", durability)
+            durability = "flush"
+        self.durability = durability
+
+        self._queue = queue.Queue(maxsize=max(1, int(queue_max)))
+        self._file = None
+        self._thread = None
+
+        # 統計
+        self.lines_written = 0
+        self.batches_written = 0
+        self.lines_dropped = 0
+        self._drops_unlogged = 0
+        self._last_drop_log = None  # monotonic
+
+    # ----------------------------------------
+    # 公開API
+    # ----------------------------------------
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="TranslationLogWriter", daemon=True)
+        self._thread.start()
+
+    def write(self, line: str) -> bool:
+        """1行をキューへ積む。キューが満杯なら待たずに破棄して False（呼び出し側を止めない）"""
+        try:
+            self._queue.put_nowait(line)
+            return True
+        except queue.Full:
+            self._record_drop(line)
+            return False
+
+    def queue_size(self) -> int:
+        return self._queue.qsize()
+
+    def close(self, timeout: float = 5.0):
+        """キューに残った行を書き切ってからファイルを閉じる"""
+        if self._thread is not None:
+            thread = self._thread
+            self._thread = None
+            try:
+                self._queue.put(self._STOP, timeout=timeout)
+            except queue.Full:
+                logging.error("Translation log writer: キューが空かないため停止を指示できませんでした")
+                return
+            thread.join(timeout=timeout)
+            if thread.is_alive():
+                # 書き込み中のファイルは閉じない（スレッドが書き切った後に自分で閉じる）
+                logging.warning("Translation log writer: %.1f 秒以内に書き込みが終わりませんでした", timeout)
+                return
+        else:
+            # スレッド未起動（start() 前に stop された等）の場合はここで書き切る
+            batch = []
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch:
+                self._write_batch(batch)
+        self._close_file()
+
+    # ----------------------------------------
+    # 内部処理
+    # ----------------------------------------
+    def _run(self):
+        try:
+            self._run_batches()
+        finally:
+            self._close_file()
+
+    def _run_batches(self):
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.batch_age_sec
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining <= 0:
+                        item = self._queue.get_nowait()
+                    else:
+                        item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._write_batch(batch)
+            if stop:
+                return
+
+    def _write_batch(self, batch):
+        with span("writer.write_batch"):
+            try:
+                if self._file is None:
+                    self._file = open(self.path, "a", encoding="utf-8")
+                self._file.write("".join(line + "\n" for line in batch))
+                if self.durability != "none":
+                    self._file.flush()
+                    if self.durability == "fsync":
+                        os.fsync(self._file.fileno())
+                self.lines_written += len(batch)
+                self.batches_written += 1
+            except Exception as e:
+                logging.error("Translation log write error: %s", e)
+                # 次のバッチで開き直す
+                self._close_file()
+
+    def _record_drop(self, line: str):
+        self.lines_dropped += 1
+        self._drops_unlogged += 1
+        now = time.monotonic()
+        if self._last_drop_log is not None and now - self._last_drop_log < self.DROP_LOG_INTERVAL_SEC:
+            return
+        logging.error("Translation log queue full, %d line(s) dropped (total %d), latest: %s",
+                      self._drops_unlogged, self.lines_dropped, line)
+        self._drops_unlogged = 0
+        self._last_drop_log = now
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception as e:
+                logging.error("Translation log close error: %s", e)
+            self._file = None
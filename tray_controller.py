@@ -2,10 +2,9 @@
 import os
 import sys
 import logging
-from typing import Callable, Optional
+from typing import Callable, List, Optional, Tuple
 
-import pystray
-from PIL import Image
+# pystray / PIL は読み込みに時間がかかるので start() で初めて読み込む（起動を待たせない）
 
 
 def resource_path(relative_path: str) -> str:
@@ -24,6 +23,7 @@ class TrayController:
     - icon.ico を使ったタスクトレイアイコン表示
     - ホバー時タイトル（ツールチップ）更新
     - メニューから Exit を選んだときにコールバック呼び出し
+    - extra_items: Exit の前に並べる (表示名, コールバック) のリスト
     """
 
     def __init__(
@@ -31,20 +31,26 @@ class TrayController:
         app_name: str,
         on_exit_callback: Optional[Callable[[], None]],
         icon_filename: str = "icon.ico",
+        extra_items: Optional[List[Tuple[str, Callable[[], None]]]] = None,
     ) -> None:
         self.app_name = app_name
         self.on_exit_callback = on_exit_callback
         self.icon_filename = icon_filename
-        self.icon: Optional[pystray.Icon] = None
+        self.extra_items = list(extra_items or [])
+        self.icon = None  # pystray.Icon
 
     # -------------------------
     # 公開 API
     # -------------------------
     def start(self, initial_tooltip: str) -> None:
         """トレイアイコンを作成して非ブロッキングで表示する"""
+        import pystray
+
         image = self._create_tray_image()
 
+        items = [pystray.MenuItem(label, self._wrap_item(label, callback)) for label, callback in self.extra_items]
         menu = pystray.Menu(
+            *items,
             pystray.MenuItem("Exit", self._on_tray_exit)
         )
 
@@ -71,8 +77,10 @@ class TrayController:
     # -------------------------
     # 内部ヘルパ
     # -------------------------
-    def _create_tray_image(self) -> Image.Image:
-        """タスクトレイ用アイコン画像を返す"""
+    def _create_tray_image(self):
+        """タスクトレイ用アイコン画像（PIL.Image）を返す"""
+        from PIL import Image
+
         try:
             icon_path = resource_path(self.icon_filename)
             if os.path.exists(icon_path):
@@ -87,6 +95,15 @@ class TrayController:
         # フォールバック: 透明 64x64
         return Image.new("RGBA", (64, 64), (0, 0, 0, 0))
 
+    @staticmethod
+    def _wrap_item(label: str, callback: Callable[[], None]):
+        def on_click(icon, item) -> None:
+            try:
+                callback()
+            except Exception as e:
+                logging.error(f"トレイメニュー「{label}」の実行中にエラー: {e}")
+        return on_click
+
     def _on_tray_exit(self, icon, item) -> None:
         """タスクトレイメニューから Exit が選択されたとき"""
         logging.info("タスクトレイメニューから終了が選択されました。")
@@ -0,0 +1,183 @@
+# ws_capture.py
+"""
+Yukacone 翻訳ログ WebSocket の記録・再生ツール。
+
+記録: config.json の DATA_WS_CAPTURE を true にすると、受信した生フレームを
+      log/capture-YYYY-MM-DD-hhmmss.yxcap へ単調時計のタイムスタンプ付きで保存する。
+再生: 記録したファイルを TranslationLogger.add_raw_frame() へ流し込む（ゆかコネ不要・Linux 可）。
+
+  python ws_capture.py info  log/capture-....yxcap
+  python ws_capture.py replay log/capture-....yxcap              # 元のタイミングで再生
+  python ws_capture.py replay log/capture-....yxcap --speed 10   # 10倍速
+  python ws_capture.py replay log/capture-....yxcap --fast       # 待ち時間なし
+
+ファイル形式（リトルエンディアン）:
+  先頭: b"YXCAP1\\n"
+  各フレーム: uint64 記録開始からの経過ns / uint8 種別(0=text, 1=binary) / uint32 長さ / 本体
+"""
+import argparse
+import logging
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+MAGIC = b"YXCAP1\n"
+_HEADER = struct.Struct("<QBI")
+KIND_TEXT = 0
+KIND_BINARY = 1
+
+
+class CaptureWriter:
+    """
+    受信フレームをキャプチャファイルへ追記する（任意のスレッドから write 可能）。
+
+    途中で落ちても記録が残るよう、前回の flush から flush_interval_sec 経つか
+    flush_bytes 以上たまった時点で flush する（読み出し側は途中までのフレームを捨てる）。
+    """
+
+    def __init__(self, path: str, flush_interval_sec: float = 1.0, flush_bytes: int = 64 * 1024):
+        self.path = path
+        self.flush_interval_ns = int(max(0.0, float(flush_interval_sec)) * 1e9)
+        self.flush_bytes = max(1, int(flush_bytes))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._file.flush()
+        self._start_ns = time.monotonic_ns()
+        self._lock = threading.Lock()
+        self._unflushed = 0
+        self._last_flush_ns = self._start_ns
+        self.frames = 0
+
+    def write(self, message) -> None:
+        t_ns = time.monotonic_ns() - self._start_ns
+        if isinstance(message, (bytes, bytearray)):
+            kind, payload = KIND_BINARY, bytes(message)
+        else:
+            kind, payload = KIND_TEXT, str(message).encode("utf-8")
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(_HEADER.pack(t_ns, kind, len(payload)))
+            self._file.write(payload)
+            self.frames += 1
+            self._unflushed += _HEADER.size + len(payload)
+            now_ns = t_ns + self._start_ns
+            if self._unflushed >= self.flush_bytes or now_ns - self._last_flush_ns >= self.flush_interval_ns:
+                self._file.flush()
+                self._unflushed = 0
+                self._last_flush_ns = now_ns
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        logging.info("キャプチャ終了: %s (%d frames)", self.path, self.frames)
+
+
+def _frame_size(message) -> int:
+    return len(message) if isinstance(message, (bytes, bytearray)) else len(message.encode("utf-8"))
+
+
+def iter_frames(path: str):
+    """キャプチャファイルのフレームを (経過ns, str または bytes) で順に返す"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"キャプチャファイルではありません: {path}")
+        while True:
+            head = f.read(_HEADER.size)
+            if len(head) < _HEADER.size:
+                return
+            t_ns, kind, length = _HEADER.unpack(head)
+            payload = f.read(length)
+            if len(payload) < length:
+                # 記録中断などで途中までしか無いフレームは捨てる
+                return
+            yield t_ns, (payload.decode("utf-8") if kind == KIND_TEXT else payload)
+
+
+def replay(path: str, sink, speed: float | None = 1.0) -> dict:
+    """
+    キャプチャを sink(message) へ流す。
+    speed: 1.0 = 元のタイミング、N = N倍速、None = 待ち時間なし
+    戻り値: frames / bytes / 実経過秒 / 記録上の経過秒
+    """
+    frames = 0
+    total_bytes = 0
+    first_ns = None
+    start = time.perf_counter()
+    for t_ns, message in iter_frames(path):
+        if first_ns is None:
+            first_ns = t_ns
+        if speed:
+            target = (t_ns - first_ns) / 1e9 / speed
+            delay = target - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+        sink(message)
+        frames += 1
+        total_bytes += _frame_size(message)
+    elapsed = time.perf_counter() - start
+    recorded = 0.0 if first_ns is None else (t_ns - first_ns) / 1e9
+    return {"frames": frames, "bytes": total_bytes, "elapsed_sec": elapsed, "recorded_sec": recorded}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="翻訳ログ WebSocket キャプチャの確認・再生")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ip = sub.add_parser("info", help="フレーム数と記録時間を表示")
+    ip.add_argument("capture")
+
+    rp = sub.add_parser("replay", help="TranslationLogger へ再生する")
+    rp.add_argument("capture")
+    group = rp.add_mutually_exclusive_group()
+    group.add_argument("--speed", type=float, default=1.0, help="再生倍率（既定 1.0）")
+    group.add_argument("--fast", action="store_true", help="待ち時間なしで再生")
+    rp.add_argument("--out-dir", default=None, help="翻訳ログの出力先（既定: 一時フォルダ）")
+    rp.add_argument("--stable-sec", type=float, default=10.0, help="確定待ち秒（PROCESS_STABLE_SEC 相当）")
+    rp.add_argument("--format", default="legacy", choices=("legacy", "jsonl"))
+    rp.add_argument("--verbose", action="store_true", help="フレームごとのログも表示")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        frames = 0
+        total = 0
+        last_ns = 0
+        for t_ns, message in iter_frames(args.capture):
+            frames += 1
+            total += _frame_size(message)
+            last_ns = t_ns
+        print(f"frames={frames} bytes={total} duration={last_ns / 1e9:.3f}s")
+        return 0
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+    )
+    from translation_logger import TranslationLogger
+
+    out_dir = args.out_dir or tempfile.mkdtemp(prefix="yxcap-replay-")
+    logger = TranslationLogger(base_dir=out_dir, stable_sec=args.stable_sec, log_format=args.format)
+    logger.start()
+    try:
+        result = replay(args.capture, logger.add_raw_frame, None if args.fast else args.speed)
+    finally:
+        logger.stop()
+
+    print(
+        f"frames={result['frames']} bytes={result['bytes']} "
+        f"elapsed={result['elapsed_sec']:.3f}s recorded={result['recorded_sec']:.3f}s "
+        f"rate={result['frames'] / max(result['elapsed_sec'], 1e-9):.0f} frames/s"
+    )
+    print(f"translation log: {os.path.join(logger.log_dir, logger.log_filename)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
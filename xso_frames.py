@@ -0,0 +1,80 @@
+# xso_frames.py
+import json
+import logging
+from typing import Dict, Tuple
+
+_CONTENT_MARK = "@@XSO_CONTENT@@"
+# 前後の切り出しが元の二重 json.dumps と一致するかの確認用（引用符・改行・非ASCII を含める）
+_SELF_TEST_CONTENT = 'テスト "quote" \\ back\nline\t😀'
+
+
+def _status_frame(app_name: str, profile: dict, muted: bool) -> str:
+    return json.dumps({
+        "sender": app_name,
+        "target": "xsoverlay",
+        "command": "UpdateMediaPlayerInformation",
+        "jsonData": json.dumps({
+            "artist": f'{profile["name"]} ({profile["translation_param"]["engine"]})',
+            "title": f"{'Mute' if muted else 'Online'}",
+            "album": app_name,
+            "sourceApp": "ゆかコネ"
+        })
+    })
+
+
+def _notification_frame(app_name: str, content) -> str:
+    return json.dumps({
+        "sender": app_name,
+        "target": "xsoverlay",
+        "command": "SendNotification",
+        "jsonData": json.dumps({
+            "type": 1,
+            "title": "ゆかコネ翻訳",
+            "opacity": 0.5,
+            "volume": 0,
+            "content": content
+        })
+    })
+
+
+class XsoFrameCache:
+    """
+    XSOverlay へ送るフレームの事前シリアライズ結果。
+
+    - ステータス（UpdateMediaPlayerInformation）は (プロファイル index, ミュート) ごとに文字列を保持
+    - 通知（SendNotification）は content 以外の前後を保持し、content だけをエスケープして挟む
+    設定が変わったら作り直す（インスタンスは作成後に変更しない）。
+    """
+
+    def __init__(self, app_name: str, profiles: list) -> None:
+        self.app_name = app_name
+        self._status: Dict[Tuple[int, bool], str] = {}
+        for index, profile in enumerate(profiles):
+            for muted in (True, False):
+                self._status[(index, muted)] = _status_frame(app_name, profile, muted)
+
+        template = _notification_frame(app_name, _CONTENT_MARK)
+        self._note_head, sep, self._note_tail = template.partition(_CONTENT_MARK)
+        self._note_split_ok = (
+            sep == _CONTENT_MARK
+            and self._notification_split(_SELF_TEST_CONTENT)
+            == _notification_frame(app_name, _SELF_TEST_CONTENT)
+        )
+        if not self._note_split_ok:
+            logging.warning("通知フレームの事前シリアライズが使えないため、毎回シリアライズします")
+
+    def status(self, index: int, muted: bool) -> str:
+        """事前シリアライズ済みのステータスフレーム（範囲外の index は KeyError）"""
+        return self._status[(index, bool(muted))]
+
+    def notification(self, content) -> str:
+        if self._note_split_ok and isinstance(content, str):
+            return self._notification_split(content)
+        return _notification_frame(self.app_name, content)
+
+    def _notification_split(self, content: str) -> str:
+        # jsonData 内の文字列化（1回目）と外側の文字列化（2回目）のエスケープを content だけに適用する
+        return self._note_head + json.dumps(json.dumps(content)[1:-1])[1:-1] + self._note_tail
+
+    def __len__(self) -> int:
+        return len(self._status)
@@ -0,0 +1,165 @@
+# xso_sender.py
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from profiling import span
+from scheduling import DeadlineWorker
+
+
+class XsoSender:
+    """
+    XSOverlay への送信キュー。
+
+    - submit_status() / submit_notification() はキューに積むだけで即座に戻る
+    - ステータス（UpdateMediaPlayerInformation）は最新勝ち: 未送信のものは新しいもので置き換える
+    - 通知（SendNotification）は FIFO。notification_max を超えたら古いものから捨てる
+    - 実際の送信は専用スレッド（asyncio モードではループ上のタスク）が行う
+    - 送信先が未接続の間は保持し、wake() された時点（再接続時など）で送る
+    """
+
+    def __init__(self, get_ws: Callable[[], object], notification_max: int = 32, health=None) -> None:
+        self._get_ws = get_ws
+        self.notification_max = max(1, int(notification_max))
+        # 送信結果を知らせる先（reconnect.LinkHealth、送信失敗が続いたら接続を張り直す）
+        self._health = health
+
+        self._lock = threading.Lock()
+        self._status: Optional[tuple] = None  # (payload, 受付時刻 perf_counter)
+        self._notifications: deque = deque()
+        self._worker: Optional[DeadlineWorker] = None
+        self._waker: Optional[Callable[[], None]] = None
+
+        # 統計
+        self.status_submitted = 0
+        self.status_coalesced = 0
+        self.notifications_submitted = 0
+        self.notifications_dropped = 0
+        self.sent = 0
+        self.skipped = 0
+        self.failed = 0
+        self.max_depth = 0
+        self._latency_total_ms = 0.0
+        self._latency_max_ms = 0.0
+        self._skip_logged = False
+
+    # -------------------------
+    # 公開 API
+    # -------------------------
+    def start(self, background: bool = True) -> None:
+        """送信スレッドを開始。background=False の場合は呼び出し側が poll() を駆動する"""
+        if self._worker is not None:
+            return
+        if background:
+            self._worker = DeadlineWorker("XsoSender", self.poll)
+            self.set_waker(self._worker.wake)
+            self._worker.start()
+
+    def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.stop()
+            self._worker = None
+
+    def set_waker(self, waker: Callable[[], None]) -> None:
+        self._waker = waker
+
+    def wake(self) -> None:
+        """保持中のメッセージの送信を試みさせる（再接続時など）"""
+        if self._waker is not None:
+            self._waker()
+
+    def submit_status(self, payload: str) -> None:
+        """ステータス更新を積む（未送信のステータスがあれば置き換える）"""
+        with self._lock:
+            self.status_submitted += 1
+            if self._status is not None:
+                self.status_coalesced += 1
+            self._status = (payload, time.perf_counter())
+            self._update_depth_locked()
+        self.wake()
+
+    def submit_notification(self, payload: str) -> None:
+        """通知を積む（上限を超えたら最も古い未送信通知を捨てる）"""
+        with self._lock:
+            self.notifications_submitted += 1
+            if len(self._notifications) >= self.notification_max:
+                self._notifications.popleft()
+                self.notifications_dropped += 1
+            self._notifications.append((payload, time.perf_counter()))
+            self._update_depth_locked()
+        self.wake()
+
+    def depth(self) -> int:
+        """未送信のメッセージ数"""
+        with self._lock:
+            return len(self._notifications) + (1 if self._status is not None else 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            avg = self._latency_total_ms / self.sent if self.sent else 0.0
+            return {
+                "depth": len(self._notifications) + (1 if self._status is not None else 0),
+                "max_depth": self.max_depth,
+                "status_submitted": self.status_submitted,
+                "status_coalesced": self.status_coalesced,
+                "notifications_submitted": self.notifications_submitted,
+                "notifications_dropped": self.notifications_dropped,
+                "sent": self.sent,
+                "skipped": self.skipped,
+                "failed": self.failed,
+                "latency_avg_ms": round(avg, 2),
+                "latency_max_ms": round(self._latency_max_ms, 2),
+            }
+
+    def poll(self) -> Optional[float]:
+        """保持中のメッセージをすべて送る。期限付きの仕事は無いので常に None を返す"""
+        while True:
+            ws = self._get_ws()
+            with self._lock:
+                if self._status is None and not self._notifications:
+                    return None
+                if ws is None:
+                    # 未接続: 捨てずに保持し、再接続時の wake() を待つ
+                    self.skipped += 1
+                    if not self._skip_logged:
+                        logging.warning("XSO未接続のため送信を保留します")
+                        self._skip_logged = True
+                    return None
+                self._skip_logged = False
+                if self._status is not None:
+                    payload, queued_at = self._status
+                    self._status = None
+                else:
+                    payload, queued_at = self._notifications.popleft()
+
+            self._send(ws, payload, queued_at)
+
+    # -------------------------
+    # 内部ヘルパ
+    # -------------------------
+    def _send(self, ws, payload: str, queued_at: float) -> None:
+        try:
+            with span("xso.send"):
+                ws.send(payload)
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            logging.error(f"XSOverlayへの送信失敗: {e}")
+            if self._health is not None:
+                self._health.send_failed(e)
+            return
+        if self._health is not None:
+            self._health.send_ok()
+        elapsed_ms = (time.perf_counter() - queued_at) * 1000.0
+        with self._lock:
+            self.sent += 1
+            self._latency_total_ms += elapsed_ms
+            if elapsed_ms > self._latency_max_ms:
+                self._latency_max_ms = elapsed_ms
+
+    def _update_depth_locked(self) -> None:
+        depth = len(self._notifications) + (1 if self._status is not None else 0)
+        if depth > self.max_depth:
+            self.max_depth = depth
@@ -0,0 +1,161 @@
+# yukacone_client.py
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import Histogram
+from profiling import span
+
+
+# パス別の (connect, read) タイムアウト秒。ローカル 127.0.0.1 宛なので connect は短くてよい
+DEFAULT_TIMEOUTS: Dict[str, Tuple[float, float]] = {
+    "/mute-status": (0.5, 2.0),
+    "/mute-on": (0.5, 5.0),
+    "/mute-off": (0.5, 5.0),
+    "/setTranslationParam": (0.5, 10.0),
+    "/setRecognitionParam": (0.5, 10.0),
+}
+FALLBACK_TIMEOUT: Tuple[float, float] = (1.0, 10.0)
+
+
+class PathStats:
+    """1パス分のレイテンシ集計（呼び出し回数・失敗回数・合計/最大/直近ミリ秒）"""
+
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "last_ms")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def record(self, elapsed_ms: float, ok: bool) -> None:
+        self.count += 1
+        if not ok:
+            self.errors += 1
+        self.total_ms += elapsed_ms
+        self.last_ms = elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+
+    def as_dict(self) -> dict:
+        avg = self.total_ms / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(avg, 2),
+            "max_ms": round(self.max_ms, 2),
+            "last_ms": round(self.last_ms, 2),
+        }
+
+
+class YukaconeClient:
+    """
+    ゆかコネNEO HTTP API 用の共有クライアント。
+
+    - requests.Session + HTTPAdapter で 127.0.0.1 への keep-alive 接続をプールして再利用
+    - パスごとに (connect, read) タイムアウトを分ける（状態確認が 20 秒待つことはない）
+    - パスごとのレイテンシを集計（stats() で参照）
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeouts: Optional[Dict[str, Tuple[float, float]]] = None,
+        pool_maxsize: int = 4,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeouts: Dict[str, Tuple[float, float]] = dict(DEFAULT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+
+        self._session = requests.Session()
+        # ローカル API なので再送はしない（失敗は呼び出し側で扱う）
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0)
+        self._session.mount("http://", adapter)
+        # 環境変数のプロキシ設定を読まない（127.0.0.1 宛にプロキシは不要）
+        self._session.trust_env = False
+
+        self._stats: Dict[str, PathStats] = {}
+        self._stats_lock = threading.Lock()
+        # パス別レイテンシ分布（metrics.Registry に登録すると /metrics に出る）
+        self.latency = Histogram(
+            "yukacone_api_request_duration_seconds", "Yukacone HTTP API latency", labelnames=("path", "ok")
+        )
+
+    # -------------------------
+    # 公開 API
+    # -------------------------
+    def call(self, path: str, params: Optional[dict] = None) -> Tuple[bool, Optional[str]]:
+        """ゆかコネAPIを呼び出す。戻り値: (成功bool, response_text or None)"""
+        url = f"{self.base_url}{path}"
+        timeout = self.timeouts.get(path, FALLBACK_TIMEOUT)
+        logging.info(f"{path} 実行: {params}")
+
+        start = time.perf_counter()
+        try:
+            with span("api" + path):
+                response = self._session.get(url, params=params or {}, timeout=timeout)
+                response.raise_for_status()
+                text = (response.text or "").strip()
+        except Exception as e:
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            self._record(path, elapsed_ms, False)
+            logging.error(f"{path} 失敗: {e} ({elapsed_ms:.1f}ms)")
+            return False, None
+
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        self._record(path, elapsed_ms, True)
+        # "Stay" も成功としてログに出す
+        logging.info(f"{path} 成功: {text} ({elapsed_ms:.1f}ms)")
+        return True, text
+
+    def stats(self) -> Dict[str, dict]:
+        """パス別レイテンシ集計のスナップショットを返す"""
+        with self._stats_lock:
+            return {path: s.as_dict() for path, s in self._stats.items()}
+
+    def close(self) -> None:
+        """プール中の接続を閉じる"""
+        try:
+            self._session.close()
+        except Exception as e:
+            logging.warning(f"YukaconeClient クローズ中にエラー: {e}")
+
+    # -------------------------
+    # 内部ヘルパ
+    # -------------------------
+    def _record(self, path: str, elapsed_ms: float, ok: bool) -> None:
+        with self._stats_lock:
+            s = self._stats.get(path)
+            if s is None:
+                s = self._stats[path] = PathStats()
+            s.record(elapsed_ms, ok)
+        self.latency.observe(elapsed_ms / 1000.0, path=path, ok="true" if ok else "false")
+
+
+def parse_timeouts(raw) -> Dict[str, Tuple[float, float]]:
+    """
+    config.json の YUKACONE_API_TIMEOUTS を (connect, read) タプルの辞書へ変換する。
+
+    例: {"/mute-status": [0.5, 2.0], "/setTranslationParam": 10}
+    数値1つの場合は connect/read の両方に使う。不正な値は無視する。
+    """
+    result: Dict[str, Tuple[float, float]] = {}
+    if not isinstance(raw, dict):
+        return result
+    for path, value in raw.items():
+        try:
+            if isinstance(value, (list, tuple)) and len(value) == 2:
+                result[str(path)] = (float(value[0]), float(value[1]))
+            else:
+                v = float(value)
+                result[str(path)] = (v, v)
+        except (TypeError, ValueError):
+            logging.warning(f"YUKACONE_API_TIMEOUTS の値が不正なため無視します: {path}={value}")
+    return result
@@ -0,0 +1,249 @@
+# yukacone_sequencer.py
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from metrics import Histogram
+
+# 反映確認で「応答さえあればよい」ことを表す expect の値
+ANY = object()
+
+SETTLE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0)
+
+
+class Command:
+    """
+    シーケンスの1ステップ: path を params で呼び、probe() の結果が expect になるまで待つ。
+
+    - probe を省略すると呼び出しの成功だけで次へ進む
+    - expect が ANY なら probe() が例外を出さずに返った時点（API が応答した時点）で反映済みとみなす
+    - min_wait_sec: 反映を確かめる手段が無いコマンド用の固定の待ち時間。probe はこの後に呼び、
+      集計では「固定待ち」として反映確認とは分けて扱う
+    """
+
+    __slots__ = ("path", "params", "probe", "expect", "name", "min_wait_sec")
+
+    def __init__(
+        self,
+        path: str,
+        params: Optional[dict] = None,
+        probe: Optional[Callable[[], object]] = None,
+        expect: object = ANY,
+        name: Optional[str] = None,
+        min_wait_sec: float = 0.0,
+    ) -> None:
+        self.path = path
+        self.params = params or {}
+        self.probe = probe
+        self.expect = expect
+        self.name = name or path
+        self.min_wait_sec = max(0.0, float(min_wait_sec or 0))
+
+
+class StepResult:
+    __slots__ = ("name", "ok", "settled", "call_ms", "wait_ms", "settle_ms", "probes", "observed")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.ok = False  # API 呼び出しが成功したか
+        self.settled = False  # 期待した状態を確認できたか
+        self.call_ms = 0.0
+        self.wait_ms = 0.0  # Command.min_wait_sec による固定待ち
+        self.settle_ms = 0.0  # 固定待ちの後、probe() で確認できるまで
+        self.probes = 0
+        self.observed = None  # 最後に probe() が返した値
+
+
+class SequenceResult:
+    __slots__ = ("steps", "cancelled", "elapsed_ms")
+
+    def __init__(self) -> None:
+        self.steps: List[StepResult] = []
+        self.cancelled = False
+        self.elapsed_ms = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """全ステップを呼び出せて、反映も確認できたか"""
+        return not self.cancelled and bool(self.steps) and all(s.ok and s.settled for s in self.steps)
+
+    @property
+    def last(self) -> Optional[StepResult]:
+        return self.steps[-1] if self.steps else None
+
+
+class SettleStats:
+    """ステップ名ごとの反映待ち時間の集計"""
+
+    __slots__ = ("count", "timeouts", "total_ms", "max_ms", "last_ms", "fixed_wait_ms")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.timeouts = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+        self.fixed_wait_ms = 0.0  # 反映確認の代わりに入れた固定待ち（最後の値）
+
+    def record(self, settle_ms: float, settled: bool, wait_ms: float = 0.0) -> None:
+        self.count += 1
+        self.fixed_wait_ms = wait_ms
+        if not settled:
+            self.timeouts += 1
+        self.total_ms += settle_ms
+        self.last_ms = settle_ms
+        if settle_ms > self.max_ms:
+            self.max_ms = settle_ms
+
+    def as_dict(self) -> dict:
+        avg = self.total_ms / self.count if self.count else 0.0
+        d = {
+            "count": self.count,
+            "timeouts": self.timeouts,
+            "avg_ms": round(avg, 1),
+            "max_ms": round(self.max_ms, 1),
+            "last_ms": round(self.last_ms, 1),
+        }
+        if self.fixed_wait_ms:
+            d["fixed_wait_ms"] = round(self.fixed_wait_ms, 1)
+        return d
+
+
+class CommandSequencer:
+    """
+    ゆかコネAPI のコマンドを順に実行する（固定の sleep の代わり）。
+
+    - 各コマンドの後は probe() を poll_sec から backoff 倍ずつ（max_poll_sec まで）間隔を延ばして呼び、
+      期待した状態が見えたら次へ進む。settle_timeout_sec までに見えなければ諦めて次へ進む
+    - シーケンス全体にも deadline_sec の期限を設け、超えたら残りのステップは実行しない
+    - cancelled() が True を返したら（後から別の操作が来たなど）その時点でやめる
+    - 実際にかかった反映待ち時間をステップ名ごとに集計してログに出す（待ち時間の調整の根拠にする）
+    """
+
+    def __init__(
+        self,
+        call: Callable[[str, dict], Tuple[bool, Optional[str]]],
+        settle_timeout_sec: float = 2.0,
+        deadline_sec: float = 10.0,
+        poll_sec: float = 0.02,
+        max_poll_sec: float = 0.25,
+        backoff: float = 2.0,
+    ) -> None:
+        self._call = call
+        self.settle_timeout_sec = max(0.0, float(settle_timeout_sec))
+        self.deadline_sec = max(0.0, float(deadline_sec))
+        self.poll_sec = max(0.001, float(poll_sec))
+        self.max_poll_sec = max(self.poll_sec, float(max_poll_sec))
+        self.backoff = max(1.0, float(backoff))
+
+        self._lock = threading.Lock()
+        self._stats: Dict[str, SettleStats] = {}
+        self.settle_time = Histogram(
+            "yukacone_settle_seconds", "Time until a Yukacone command was observed to take effect",
+            labelnames=("step", "settled", "kind"), buckets=SETTLE_BUCKETS,
+        )
+
+    @classmethod
+    def from_config(cls, call, config: dict) -> "CommandSequencer":
+        """config.json の YUKACONE_SETTLE_* / YUKACONE_SEQUENCE_DEADLINE_SEC から作る"""
+        return cls(
+            call,
+            settle_timeout_sec=config.get("YUKACONE_SETTLE_TIMEOUT_SEC", 2.0),
+            deadline_sec=config.get("YUKACONE_SEQUENCE_DEADLINE_SEC", 10.0),
+            poll_sec=config.get("YUKACONE_SETTLE_POLL_SEC", 0.02),
+            max_poll_sec=config.get("YUKACONE_SETTLE_MAX_POLL_SEC", 0.25),
+        )
+
+    def run(
+        self,
+        commands: Sequence[Command],
+        cancelled: Optional[Callable[[], bool]] = None,
+    ) -> SequenceResult:
+        """commands を順に実行する。呼び出しに失敗したステップで止まる"""
+        result = SequenceResult()
+        started = time.monotonic()
+        deadline = started + self.deadline_sec
+        for command in commands:
+            if cancelled is not None and cancelled():
+                result.cancelled = True
+                break
+            if result.steps and time.monotonic() >= deadline:
+                logging.warning("Yukacone シーケンス期限切れ: %s 以降を実行しません", command.name)
+                break
+            step = self._run_step(command, deadline, cancelled)
+            result.steps.append(step)
+            if not step.ok:
+                break
+            if not step.settled and cancelled is not None and cancelled():
+                result.cancelled = True
+                break
+        result.elapsed_ms = (time.monotonic() - started) * 1000.0
+        return result
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {name: s.as_dict() for name, s in self._stats.items()}
+
+    # -------------------------
+    # 内部処理
+    # -------------------------
+    def _run_step(self, command: Command, deadline: float, cancelled) -> StepResult:
+        step = StepResult(command.name)
+        t0 = time.perf_counter()
+        step.ok, _text = self._call(command.path, command.params)
+        step.call_ms = (time.perf_counter() - t0) * 1000.0
+        if step.ok and command.min_wait_sec > 0:
+            # 反映を確かめられないので、最低限これだけは待つ（期限は越えない）
+            wait = min(command.min_wait_sec, max(0.0, deadline - time.monotonic()))
+            time.sleep(wait)
+            step.wait_ms = wait * 1000.0
+        if not step.ok or command.probe is None:
+            step.settled = step.ok
+            if step.wait_ms:
+                self._record(step)
+            return step
+
+        settle_deadline = min(deadline, time.monotonic() + self.settle_timeout_sec)
+        t1 = time.perf_counter()
+        interval = self.poll_sec
+        while True:
+            step.probes += 1
+            try:
+                step.observed = command.probe()
+                if command.expect is ANY or step.observed == command.expect:
+                    step.settled = True
+                    break
+            except Exception as e:
+                logging.debug("%s: 反映確認失敗（再試行）: %s", command.name, e)
+            if cancelled is not None and cancelled():
+                # 後から来た操作に任せる（待ち時間の集計にも入れない）
+                return step
+            remaining = settle_deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+            interval = min(interval * self.backoff, self.max_poll_sec)
+        step.settle_ms = (time.perf_counter() - t1) * 1000.0
+
+        self._record(step)
+        if step.settled and step.wait_ms:
+            logging.info("%s: 固定待ち %.0f ms + 応答確認 %.0f ms（反映そのものは確認できません）",
+                         command.name, step.wait_ms, step.settle_ms)
+        elif step.settled:
+            logging.info("%s: 反映確認 %.0f ms（確認 %d 回）", command.name, step.settle_ms, step.probes)
+        else:
+            logging.warning("%s: %.0f ms 待っても反映を確認できませんでした（最後の値: %r）",
+                            command.name, step.settle_ms, step.observed)
+        return step
+
+    def _record(self, step: StepResult) -> None:
+        with self._lock:
+            s = self._stats.get(step.name)
+            if s is None:
+                s = self._stats[step.name] = SettleStats()
+            s.record(step.settle_ms, step.settled, step.wait_ms)
+        # 固定待ちのステップは、待った時間込みで kind="fixed_wait" として分けて出す
+        kind = "fixed_wait" if step.wait_ms else "probe"
+        self.settle_time.observe((step.wait_ms + step.settle_ms) / 1000.0,
+                                 step=step.name, settled=str(step.settled).lower(), kind=kind)